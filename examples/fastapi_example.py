@@ -6,6 +6,7 @@ from fastapi import FastAPI
 # 从我们的库中导入
 from yai_nexus_logger import (
     LoggerConfigurator,
+    TraceIDMiddleware,
     get_logger,
     init_logging,
 )
@@ -25,6 +26,8 @@ def create_app() -> FastAPI:
 
     logger = get_logger(__name__)
     app = FastAPI()
+    # 从 X-Trace-ID/X-Request-ID/traceparent 请求头读取或生成 trace_id，并在 X-Trace-ID 响应头中返回
+    app.add_middleware(TraceIDMiddleware)
 
     @app.get("/")
     def read_root():
@@ -1,14 +1,12 @@
 """An example of using yai-nexus-logger with trace_id in a FastAPI application."""
 
-import uuid
-from typing import Callable
-
 import uvicorn
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 
 # 从我们的库中导入
 from yai_nexus_logger import (
     LoggerConfigurator,
+    TraceIDMiddleware,
     get_logger,
     init_logging,
     trace_context,
@@ -33,25 +31,8 @@ def create_app() -> FastAPI:
     logger = get_logger(__name__)
     app = FastAPI()
 
-    @app.middleware("http")
-    async def trace_id_middleware(request: Request, call_next: Callable) -> Response:
-        """
-        中间件：为每个请求注入一个唯一的 trace_id。
-        """
-        trace_id = request.headers.get("X-Trace-ID", str(uuid.uuid4()))
-        token = trace_context.set_trace_id(trace_id)
-        logger.info(f"Request started for trace_id: {trace_id}")
-        # 验证 trace_id 是否正确设置
-        trace_id_get = trace_context.get_trace_id()
-        logger.info(f"trace_id_get: {trace_id_get or 'None'}")
-
-        response = await call_next(request)
-
-        # 将 trace_id 添加到响应头中，以便客户端可以获取
-        response.headers["X-Trace-ID"] = trace_id
-
-        trace_context.reset_trace_id(token)
-        return response
+    # 中间件：从 X-Trace-ID 请求头读取 trace_id（没有时自动生成），并在响应头中返回
+    app.add_middleware(TraceIDMiddleware)
 
     @app.get("/")
     def read_root():
@@ -59,6 +40,7 @@ def create_app() -> FastAPI:
         根路由，记录一条普通信息。
         """
         logger.info("This is an info message from the root endpoint.")
+        logger.info(f"trace_id_get: {trace_context.get_trace_id() or 'None'}")
         return {"message": "Hello World"}
 
     return app
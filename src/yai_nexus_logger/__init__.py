@@ -8,18 +8,28 @@ YAI Nexus Logger.
 
 __version__ = "0.4.1"
 
+# 从 .bound_logger 模块导入预先计算级别的 logger 包装
+from .bound_logger import BoundLogger
+
 # 从 .configurator 模块导入 LoggerConfigurator 类
 from .configurator import LoggerConfigurator
 
 # 从 .core 模块导入核心函数
-from .core import get_logger, init_logging
+from .core import get_bound_logger, get_logger, init_logging
+
+# 从 .middleware 模块导入 ASGI 中间件，为每个请求设置 trace_id 和记录访问日志
+from .middleware import AccessLogMiddleware, TraceIDMiddleware
 
 # 从 .trace_context 模块导入 trace_context，用于追踪ID
 from .trace_context import trace_context
 
 # 定义对外暴露的公共接口
 __all__ = [
+    "AccessLogMiddleware",
+    "BoundLogger",
     "LoggerConfigurator",
+    "TraceIDMiddleware",
+    "get_bound_logger",
     "get_logger",
     "init_logging",
     "trace_context",
@@ -0,0 +1,163 @@
+# src/yai_nexus_logger/aggregator.py
+
+"""
+集中式日志聚合进程。
+
+多 worker 部署时，各 worker 通过 `LoggerConfigurator.with_aggregator()` 把日志批量发送到
+Unix domain socket，由一个聚合进程统一写入文件和 SLS，避免每个 worker 各自持有一份
+SLS producer 和文件句柄。
+"""
+
+import contextlib
+import logging
+import os
+import socket
+import sys
+import threading
+import traceback
+
+from .configurator import LoggerConfigurator
+from .internal.internal_record_codec import decode_records
+from .internal.internal_socket_handler import FRAME_HEADER, MAX_FRAME_SIZE
+
+
+def _recv_exact(conn: socket.socket, size: int) -> bytearray | None:
+    """读取恰好 size 个字节，连接在读完之前关闭时返回 None。"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = conn.recv_into(view[received:])
+        if n == 0:
+            return None
+        received += n
+    return buffer
+
+
+class LogAggregator:
+    """
+    监听 Unix domain socket，接收各 worker 发来的日志批次，交给 configurator 构建的 handler 处理。
+
+    用法：
+        aggregator = LogAggregator(
+            "/tmp/app-log.sock",
+            LoggerConfigurator().with_file_handler().with_sls_handler(...),
+        )
+        aggregator.serve_forever()
+
+    每个连接由一个独立线程读取；还原出的 LogRecord 保留原始的 logger 名称、级别、
+    调用位置、trace_id 和 extra 字段，由聚合进程中的 formatter 统一渲染。
+    """
+
+    def __init__(self, socket_path: str, configurator: LoggerConfigurator):
+        self.socket_path = socket_path
+        self._configurator = configurator
+        self._logger: logging.Logger | None = None
+        self._server: socket.socket | None = None
+        self._accept_thread: threading.Thread | None = None
+        self._connections: list[socket.socket] = []
+        self._readers: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self) -> "LogAggregator":
+        """配置 handler 并开始在后台线程中接受连接。"""
+        self._logger = self._configurator.configure()
+
+        # 上一次运行遗留的 socket 文件会导致 bind 失败
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen()
+        self._server = server
+
+        self._accept_thread = threading.Thread(
+            target=self._accept_loop, name="yai-nexus-logger-aggregator", daemon=True
+        )
+        self._accept_thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """启动并阻塞当前线程，直到 stop() 被调用（例如在信号处理函数中）。"""
+        if self._server is None:
+            self.start()
+        self._stopped.wait()
+
+    def _accept_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            reader = threading.Thread(
+                target=self._read_loop, args=(conn,), name="yai-nexus-logger-aggregator-reader", daemon=True
+            )
+            with self._lock:
+                self._connections.append(conn)
+                self._readers.append(reader)
+            reader.start()
+
+    def _read_loop(self, conn: socket.socket) -> None:
+        logger = self._logger
+        try:
+            while True:
+                header = _recv_exact(conn, FRAME_HEADER.size)
+                if header is None:
+                    return
+                (size,) = FRAME_HEADER.unpack(header)
+                if size > MAX_FRAME_SIZE:
+                    raise ValueError(f"Log batch of {size} bytes exceeds the limit of {MAX_FRAME_SIZE} bytes.")
+                payload = _recv_exact(conn, size)
+                if payload is None:
+                    return
+                for record in decode_records(payload):
+                    logger.handle(record)
+        except OSError:
+            # stop() 关闭连接时读取会失败
+            return
+        except ValueError:
+            # 批次过大或无法解码，说明数据已损坏，断开该连接
+            if logging.raiseExceptions:
+                traceback.print_exc(file=sys.stderr)
+        finally:
+            conn.close()
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+
+    def stop(self) -> None:
+        """停止接受连接，等待已收到的日志处理完毕，并关闭所有 handler。"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        if self._server is not None:
+            # shutdown 才能唤醒阻塞在 accept 上的线程
+            with contextlib.suppress(OSError):
+                self._server.shutdown(socket.SHUT_RDWR)
+            self._server.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+        if self._accept_thread is not None:
+            self._accept_thread.join()
+
+        with self._lock:
+            connections = list(self._connections)
+            readers = list(self._readers)
+        for conn in connections:
+            # 只关闭读方向，让 reader 处理完已收到的批次后自然退出
+            with contextlib.suppress(OSError):
+                conn.shutdown(socket.SHUT_RD)
+        for reader in readers:
+            reader.join()
+
+        if self._logger is not None:
+            for handler in self._logger.handlers:
+                handler.close()
+            self._logger.handlers.clear()
+
+    def __enter__(self) -> "LogAggregator":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,101 @@
+# src/yai_nexus_logger/bound_logger.py
+
+"""
+轻量的 logger 包装：预先计算各级别是否启用，未启用的级别直接返回，不创建 LogRecord。
+"""
+
+import logging
+from typing import Any
+
+# 放入 logger 级别缓存中的标记。
+#
+# 这里依赖 CPython logging 的内部实现（3.7 起）：`Logger._cache` 是 isEnabledFor 使用的级别缓存字典，
+# 任意 logger 的级别变化（Logger.setLevel、logging.disable、Manager 修改 disable 等）都会通过
+# `Manager._clear_cache` 清空所有 logger 的该字典，标记随之消失，BoundLogger 据此重新计算。
+# logging 没有公开的“级别已变化”通知；若 `_cache` 不存在（其他实现或自定义 Logger），
+# 退回为每次调用 isEnabledFor，行为不变，只是没有预计算的收益。
+_LEVELS_MARKER = object()
+
+
+class BoundLogger:
+    """
+    包装一个 `logging.Logger`，接口与之相同（debug/info/warning/error/exception/critical/log）。
+
+    - 构造时计算 DEBUG 到 CRITICAL 各级别是否启用，每次调用只需一次缓存有效性检查和一次布尔判断；
+      未启用的级别不会调用 isEnabledFor，也不会创建 LogRecord。
+    - 级别变化后自动重新计算，依赖 logging 自身的级别缓存失效机制。
+    - 启用的级别调用 `Logger.log`，并修正 stacklevel，日志中的文件名和行号仍然指向调用方。
+    """
+
+    __slots__ = ("logger", "name", "_levels_cache", "_tracked", "_debug", "_info", "_warning", "_error", "_critical")
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.name = logger.name
+        cache = getattr(logger, "_cache", None)
+        # 非标准的 Logger 没有级别缓存时，使用一个永远不含标记的空字典，每次调用都重新计算
+        self._tracked = isinstance(cache, dict)
+        self._levels_cache = cache if self._tracked else {}
+        self._refresh()
+
+    def _refresh(self) -> None:
+        # 与 isEnabledFor 的判断一致：logger.disabled、logging.disable 和有效级别都会被考虑
+        logger = self.logger
+        enabled = not logger.disabled
+        self._debug = enabled and logger.isEnabledFor(logging.DEBUG)
+        self._info = enabled and logger.isEnabledFor(logging.INFO)
+        self._warning = enabled and logger.isEnabledFor(logging.WARNING)
+        self._error = enabled and logger.isEnabledFor(logging.ERROR)
+        self._critical = enabled and logger.isEnabledFor(logging.CRITICAL)
+        if self._tracked:
+            self._levels_cache[_LEVELS_MARKER] = True
+
+    def debug(self, msg: Any, *args, **kwargs) -> None:
+        if _LEVELS_MARKER not in self._levels_cache:
+            self._refresh()
+        if self._debug:
+            self._log(logging.DEBUG, msg, args, **kwargs)
+
+    def info(self, msg: Any, *args, **kwargs) -> None:
+        if _LEVELS_MARKER not in self._levels_cache:
+            self._refresh()
+        if self._info:
+            self._log(logging.INFO, msg, args, **kwargs)
+
+    def warning(self, msg: Any, *args, **kwargs) -> None:
+        if _LEVELS_MARKER not in self._levels_cache:
+            self._refresh()
+        if self._warning:
+            self._log(logging.WARNING, msg, args, **kwargs)
+
+    def error(self, msg: Any, *args, **kwargs) -> None:
+        if _LEVELS_MARKER not in self._levels_cache:
+            self._refresh()
+        if self._error:
+            self._log(logging.ERROR, msg, args, **kwargs)
+
+    def exception(self, msg: Any, *args, exc_info: Any = True, **kwargs) -> None:
+        if _LEVELS_MARKER not in self._levels_cache:
+            self._refresh()
+        if self._error:
+            self._log(logging.ERROR, msg, args, exc_info=exc_info, **kwargs)
+
+    def critical(self, msg: Any, *args, **kwargs) -> None:
+        if _LEVELS_MARKER not in self._levels_cache:
+            self._refresh()
+        if self._critical:
+            self._log(logging.CRITICAL, msg, args, **kwargs)
+
+    def log(self, level: int, msg: Any, *args, **kwargs) -> None:
+        if self.logger.isEnabledFor(level):
+            self._log(level, msg, args, **kwargs)
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def _log(self, level: int, msg: Any, args: tuple, stacklevel: int = 1, **kwargs) -> None:
+        # 跳过 BoundLogger 自身的两层调用（公开方法和 _log）；Logger.log 内部的帧由 logging 自行跳过
+        self.logger.log(level, msg, *args, stacklevel=stacklevel + 2, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<BoundLogger {self.name}>"
@@ -1,34 +1,61 @@
 # src/yai_nexus_logger/logger_builder.py
 
 import logging
-from typing import List
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
 
+from .internal.internal_async_handler import AsyncDispatchHandler
+from .internal.internal_backpressure import BackpressurePolicy
 from .internal.internal_formatter import InternalFormatter
 from .internal.internal_handlers import (
     get_console_handler,
     get_file_handler,
 )
+from .internal.internal_id_generators import get_id_generator
+from .internal.internal_json_formatter import JsonFormatter
+from .internal.internal_sampling import TraceSamplingFilter, UpstreamSampledFilter
 from .internal.internal_settings import settings
 from .internal.internal_sls_handler import SLS_SDK_AVAILABLE, get_sls_handler
-from .uvicorn_support import configure_uvicorn_logging
+from .internal.internal_socket_handler import SocketShipperHandler
+from .internal.internal_tail_buffer import TailBufferHandler
+from .internal.internal_utils import resolve_level
+from .trace_context import trace_context
+from .uvicorn_support import UVICORN_ACCESS_LOG_MODES, UVICORN_ACCESS_LOGGER, configure_uvicorn_logging
 
 LOGGING_FORMAT = (
     "%(asctime)s.%(msecs)03d | %(levelname)-7s | "
     "%(module)s:%(lineno)d | [%(trace_id)s] | %(message)s"
 )
 
+# iso8601 / epoch_ns 时间戳自带亚秒精度，不再拼接 msecs
+PRECISE_TIME_LOGGING_FORMAT = (
+    "%(asctime)s | %(levelname)-7s | "
+    "%(module)s:%(lineno)d | [%(trace_id)s] | %(message)s"
+)
+
 
 class LoggerConfigurator:
     """
     一个采用流式 API 的 logger 构建器。
     """
 
-    def __init__(self, level: str = "INFO"):
-        self._name = settings.APP_NAME
+    def __init__(self, level: str = "INFO", timestamp_format: str = "local"):
         self._level = level.upper()
-        self._handlers: List[logging.Handler] = []
-        self._formatter = InternalFormatter(LOGGING_FORMAT)
+        self._handlers: list[logging.Handler] = []
+        # 自带异步队列的 handler（如 SLS），不经过 async dispatch
+        self._direct_handlers: list[logging.Handler] = []
+        self._formatter = InternalFormatter(
+            LOGGING_FORMAT if timestamp_format == "local" else PRECISE_TIME_LOGGING_FORMAT,
+            timestamp_format=timestamp_format,
+        )
         self._uvicorn_integration = False
+        self._uvicorn_access_log = "console"
+        self._async_dispatch: dict[str, Any] | None = None
+        self._backpressure: dict[str, Any] | None = None
+        self._id_generator: Callable[[], str] | None = None
+        self._filters: list[logging.Filter] = []
+        self._tail_buffering: dict[str, Any] | None = None
+        self._logger_levels: dict[str, int] = {}
 
     def with_console_handler(self) -> "LoggerConfigurator":
         self._handlers.append(get_console_handler(self._formatter))
@@ -40,7 +67,30 @@ class LoggerConfigurator:
         when: str = "midnight",
         interval: int = 1,
         backup_count: int = 30,
+        buffered: bool = False,
+        buffer_size: int = 64 * 1024,
+        flush_interval_ms: int = 200,
+        durability: str = "none",
+        max_bytes: int = 0,
+        rotation: str = "inline",
+        compression: str | None = None,
+        multiprocess: bool = False,
     ) -> "LoggerConfigurator":
+        """
+        添加按时间分割的文件输出。
+
+        buffered 为 True 时启用批量写入：日志先进入大小为 buffer_size 的缓冲区，
+        写满或超过 flush_interval_ms 后一次性写入文件；durability 可选
+        "none"、"interval"（定期 fsync）或 "error"（ERROR 及以上立即 fsync）。
+
+        max_bytes 大于 0 时，文件超过该大小也会分割。rotation="background" 时，
+        分割只在日志线程中切换文件，压缩（compression 可选 "gzip"/"zstd"）和
+        过期文件清理交给后台线程完成。
+
+        multiprocess 为 True 时，多个 worker 进程（uvicorn/gunicorn）可以写同一个文件：
+        每条日志以 O_APPEND 单次写入，分割由抢到文件锁的进程完成，其余进程自动切换到新文件。
+        不能与 buffered 同时使用。
+        """
         self._handlers.append(
             get_file_handler(
                 formatter=self._formatter,
@@ -48,6 +98,14 @@ class LoggerConfigurator:
                 when=when,
                 interval=interval,
                 backup_count=backup_count,
+                buffered=buffered,
+                buffer_size=buffer_size,
+                flush_interval_ms=flush_interval_ms,
+                durability=durability,
+                max_bytes=max_bytes,
+                rotation=rotation,
+                compression=compression,
+                multiprocess=multiprocess,
             )
         )
         return self
@@ -71,7 +129,7 @@ class LoggerConfigurator:
 
         sls_handler = get_sls_handler(
             formatter=self._formatter,
-            app_name=self._name,
+            app_name=settings.APP_NAME,
             endpoint=endpoint,
             access_key_id=access_key_id,
             access_key_secret=access_key_secret,
@@ -81,27 +139,272 @@ class LoggerConfigurator:
             source=source,
         )
         self._handlers.append(sls_handler)
+        self._direct_handlers.append(sls_handler)
+        return self
+
+    def with_aggregator(
+        self,
+        socket_path: str,
+        batch_size: int = 256,
+        flush_interval_ms: int = 100,
+        max_pending: int = 10000,
+        send_timeout: float = 1.0,
+    ) -> "LoggerConfigurator":
+        """
+        把日志按批次发送到 Unix domain socket 上的聚合进程（见 `yai_nexus_logger.aggregator.LogAggregator`），
+        由聚合进程统一写入文件和 SLS。多 worker 部署时，worker 只需配置此项（以及可选的控制台输出）。
+
+        Args:
+            socket_path (str): 聚合进程监听的 socket 路径。
+            batch_size (int): 攒够多少条日志发送一次。
+            flush_interval_ms (int): 日志最长等待多少毫秒后发送。
+            max_pending (int): 聚合进程不可用时最多在内存中保留的日志条数，超出时丢弃最早的日志。
+            send_timeout (float): 发送一个批次的超时秒数，超时后断开连接并在重连后重发。
+        """
+        shipper = SocketShipperHandler(
+            socket_path,
+            batch_size=batch_size,
+            flush_interval_ms=flush_interval_ms,
+            max_pending=max_pending,
+            send_timeout=send_timeout,
+        )
+        self._handlers.append(shipper)
+        # 自带批量发送线程，不需要再经过 async dispatch
+        self._direct_handlers.append(shipper)
+        return self
+
+    def with_json_output(
+        self, timestamp_format: str = "iso8601", backend: str | None = None
+    ) -> "LoggerConfigurator":
+        """
+        使用结构化 JSON 输出（每条日志一行 JSON），替换默认的文本格式。
+        已添加和之后添加的 handler 都会使用 JSON formatter。
+
+        Args:
+            timestamp_format (str): 时间字段格式，默认 "iso8601"。
+            backend (str | None): JSON 序列化实现，默认自动选择 orjson/msgspec/json。
+        """
+        json_formatter = JsonFormatter(timestamp_format=timestamp_format, backend=backend)
+        for handler in self._handlers:
+            if handler.formatter is self._formatter:
+                handler.setFormatter(json_formatter)
+        self._formatter = json_formatter
+        return self
+
+    def with_async_dispatch(self, queue_size: int = 10000, workers: int = 1) -> "LoggerConfigurator":
+        """
+        在除 SLS 以外的所有 handler 前放置一个有界队列，由后台线程完成实际写入，
+        业务线程中的日志调用不再阻塞在 stdout/磁盘 I/O 上。进程退出时会自动排空队列。
+
+        Args:
+            queue_size (int): 队列容量，队列满时日志调用会阻塞等待。
+            workers (int): 后台分发线程数量，大于 1 时不保证日志顺序。
+        """
+        self._async_dispatch = {"queue_size": queue_size, "workers": workers}
+        return self
+
+    def with_backpressure(
+        self,
+        policy: str = "block",
+        timeout: float | None = None,
+        min_level: str = "WARNING",
+        sample_rate: float = 0.1,
+        include_sls: bool = False,
+    ) -> "LoggerConfigurator":
+        """
+        设置队列写满时的背压策略：block、drop_newest、drop_oldest、drop_below_level 或 sample。
+        未调用 with_async_dispatch 时会以默认参数启用异步分发。
+
+        Args:
+            policy (str): 背压策略名称。
+            timeout (float | None): block 类策略的最长等待秒数，None 表示一直等待。
+            min_level (str): drop_below_level 策略下，低于此级别的日志在队列满时被丢弃。
+            sample_rate (float): sample 策略下，队列满时保留的日志比例。
+            include_sls (bool): 是否让 SLS handler 也经过一个使用相同策略的独立队列。
+
+        每个队列 handler 持有独立的计数器，可通过 `AsyncDispatchHandler.get_stats()` 查看。
+        """
+        BackpressurePolicy(policy, timeout, min_level, sample_rate)  # 提前校验参数
+        self._backpressure = {
+            "policy": policy,
+            "timeout": timeout,
+            "min_level": min_level,
+            "sample_rate": sample_rate,
+            "include_sls": include_sls,
+        }
+        if self._async_dispatch is None:
+            self.with_async_dispatch()
+        return self
+
+    def with_trace_id_generator(self, generator: str | Callable[[], str]) -> "LoggerConfigurator":
+        """
+        设置 `trace_context.get_or_create_trace_id()` 生成新 trace_id 的方式，在 configure() 时生效。
+
+        Args:
+            generator: "uuid4"（默认）、"hex128"、"hex64"、"w3c"、"ulid"、"uuid7"，
+                或者一个返回字符串的无参函数。内置生成器共用一个预取的随机数池，
+                不会为每个 id 调用一次 urandom。
+        """
+        self._id_generator = get_id_generator(generator) if isinstance(generator, str) else generator
+        return self
+
+    def with_upstream_sampling(self, min_level: str = "WARNING") -> "LoggerConfigurator":
+        """
+        遵循上游 W3C traceparent 的 sampled 标志：sampled=0 的链路只保留 min_level 及以上的日志，
+        其余日志在格式化之前就被丢弃。需要配合 `TraceIDMiddleware` 或 `trace_context.set_span_context` 使用。
+
+        Args:
+            min_level (str): 未采样链路中仍然保留的最低级别，默认 "WARNING"。
+        """
+        self._filters.append(UpstreamSampledFilter(min_level))
+        return self
+
+    def with_trace_sampling(
+        self,
+        rate: float,
+        min_level: str = "WARNING",
+        logger_rates: dict[str, float] | None = None,
+    ) -> "LoggerConfigurator":
+        """
+        按 trace_id 确定性采样：同一条链路的日志要么全部保留，要么（低于 min_level 的部分）全部丢弃。
+
+        Args:
+            rate (float): 保留的链路比例，取值 [0, 1]。
+            min_level (str): 不参与采样、始终保留的最低级别，默认 "WARNING"。
+            logger_rates (dict | None): 按 logger 名称（前缀匹配）单独设置的采样率，
+                例如 {"app.db": 0.01}。
+        """
+        self._filters.append(TraceSamplingFilter(rate, min_level, logger_rates))
+        return self
+
+    def with_tail_buffering(
+        self,
+        buffer_level: str = "WARNING",
+        flush_level: str = "ERROR",
+        max_records: int = 10000,
+        max_records_per_trace: int = 1000,
+        exempt_loggers: Iterable[str] = (),
+    ) -> "LoggerConfigurator":
+        """
+        尾部采样：同一 trace_id 下低于 buffer_level 的日志先缓存在内存中，
+        该链路出现 flush_level 及以上的日志时连同缓存一起写出，链路正常结束时丢弃。
+
+        链路结束以 `trace_context.reset_trace_id`（`TraceIDMiddleware` 会在请求结束时调用）或根 span 退出为准。
+        访问日志（"uvicorn.access" 和 "<app>.access"）始终直接写出，不参与缓冲。
+
+        Args:
+            buffer_level (str): 低于此级别的日志会被缓存，默认 "WARNING"。
+            flush_level (str): 触发写出缓存的级别，默认 "ERROR"。
+            max_records (int): 所有链路缓存日志的总条数上限，超出时按 LRU 淘汰整条链路。
+            max_records_per_trace (int): 单条链路最多缓存的日志条数。
+            exempt_loggers (Iterable[str]): 其他不参与缓冲的 logger 名称（含其子 logger），
+                例如 `AccessLogMiddleware` 使用了自定义 logger_name 时传入该名称。
+        """
+        if max_records <= 0 or max_records_per_trace <= 0:
+            raise ValueError("max_records and max_records_per_trace must be positive.")
+        self._tail_buffering = {
+            "buffer_level": resolve_level(buffer_level),
+            "flush_level": resolve_level(flush_level),
+            "max_records": max_records,
+            "max_records_per_trace": max_records_per_trace,
+            "exempt_loggers": tuple(exempt_loggers),
+        }
         return self
 
-    def with_uvicorn_integration(self) -> "LoggerConfigurator":
+    def with_logger_levels(self, levels: Mapping[str, int | str]) -> "LoggerConfigurator":
+        """
+        为指定的 logger 单独设置级别，在 configure() 时生效。
+
+        Args:
+            levels: logger 名称（完整名称，如 "app.db"、"httpx"）到级别的映射，
+                例如 {"app.db": "WARNING", "httpx": "ERROR"}。
+        """
+        self._logger_levels.update({name: resolve_level(level) for name, level in levels.items()})
+        return self
+
+    def with_uvicorn_integration(self, access_log: str = "console") -> "LoggerConfigurator":
+        """
+        接管 uvicorn 的访问日志。
+
+        Args:
+            access_log (str): "console"（默认）只复制控制台/文件 handler 的 stream，用 uvicorn 的 AccessFormatter 输出；
+                "pipeline" 需显式开启，让访问日志与应用日志共用同一条 handler 管道，
+                包括异步分发、文件分割和 SLS，消息整理为 "GET /path 200" 并附带 method、path、status 等字段。
+        """
+        if access_log not in UVICORN_ACCESS_LOG_MODES:
+            raise ValueError(
+                f"Unsupported uvicorn access log mode: {access_log!r}. Expected one of {UVICORN_ACCESS_LOG_MODES}."
+            )
         self._uvicorn_integration = True
+        self._uvicorn_access_log = access_log
         return self
 
+    def _build_pipeline(self) -> list[logging.Handler]:
+        """返回最终挂载到 logger 上的 handler 列表。"""
+        if self._async_dispatch is None:
+            return list(self._handlers)
+
+        backpressure = dict(self._backpressure or {})
+        include_sls = backpressure.pop("include_sls", False)
+
+        def make_dispatcher(handlers: list[logging.Handler]) -> AsyncDispatchHandler:
+            policy = BackpressurePolicy(**backpressure)
+            return AsyncDispatchHandler(handlers, backpressure=policy, **self._async_dispatch)
+
+        queued = [h for h in self._handlers if h not in self._direct_handlers]
+        pipeline: list[logging.Handler] = []
+        if queued:
+            pipeline.append(make_dispatcher(queued))
+        for handler in self._direct_handlers:
+            # SLS handler 自带队列；include_sls 时在其前面再放一个带背压策略的独立队列
+            pipeline.append(make_dispatcher([handler]) if include_sls else handler)
+        return pipeline
+
     def configure(self) -> logging.Logger:
-        logger = logging.getLogger(self._name)
+        # 应用名在配置时才从配置快照中读取，init_logging 先 reload 再调用 configure
+        logger = logging.getLogger(settings.APP_NAME)
         logger.setLevel(self._level)
         logger.propagate = False
 
         if logger.hasHandlers():
+            # 旧的分发线程和尾部缓冲由我们创建，需要排空并停止
+            for handler in logger.handlers:
+                nested = handler.handlers if isinstance(handler, TailBufferHandler) else [handler]
+                if isinstance(handler, TailBufferHandler):
+                    handler.close()
+                for inner in nested:
+                    if isinstance(inner, AsyncDispatchHandler):
+                        inner.close()
             logger.handlers.clear()
 
         if not self._handlers:
             self._handlers.append(get_console_handler(self._formatter))
 
-        for handler in self._handlers:
+        pipeline = self._build_pipeline()
+        if self._tail_buffering is not None:
+            # 尾部缓冲放在最前面，缓冲的日志写出时再经过异步分发等后续环节；访问日志不参与缓冲
+            tail_buffering = dict(self._tail_buffering)
+            access_loggers = (UVICORN_ACCESS_LOGGER, f"{settings.APP_NAME}.access")
+            tail_buffering["exempt_loggers"] = access_loggers + tail_buffering["exempt_loggers"]
+            pipeline = [TailBufferHandler(pipeline, **tail_buffering)]
+
+        for handler in pipeline:
+            # 过滤器挂在 handler 上，子 logger 传播上来的日志同样会被过滤
+            for log_filter in self._filters:
+                handler.addFilter(log_filter)
             logger.addHandler(handler)
 
+        for name, level in self._logger_levels.items():
+            logging.getLogger(name).setLevel(level)
+
+        if self._id_generator is not None:
+            trace_context.set_id_generator(self._id_generator)
+
         if self._uvicorn_integration:
-            configure_uvicorn_logging(handlers=self._handlers, level=self._level)
+            configure_uvicorn_logging(
+                handlers=pipeline if self._uvicorn_access_log == "pipeline" else self._handlers,
+                level=self._level,
+                access_log=self._uvicorn_access_log,
+            )
 
         return logger
@@ -1,37 +1,76 @@
 import logging
+import os
 import warnings
-from typing import Optional
+from collections.abc import Mapping
+from typing import Any
 
+from .bound_logger import BoundLogger
 from .configurator import LoggerConfigurator
 from .internal.internal_settings import settings
 
+# (settings.generation, 名称 -> Logger, 名称 -> BoundLogger)。
+# 读取不加锁，也不读环境变量，只比较 generation；settings.reload()（init_logging 也会调用）
+# 后 generation 变化，整个元组被替换，旧的缓存随之失效。
+_logger_cache: tuple[int, dict[str | None, logging.Logger], dict[str | None, BoundLogger]] = (-1, {}, {})
 
-def init_logging(builder: Optional[LoggerConfigurator] = None) -> None:
+
+def init_logging(
+    builder: LoggerConfigurator | None = None,
+    config_file: str | os.PathLike | None = None,
+    overrides: Mapping[str, Any] | None = None,
+) -> None:
     """
     初始化应用日志系统。
 
-    此函数应在应用程序启动时显式调用一次。
-    如果未提供 builder，将尝试从环境变量进行配置。
+    此函数应在应用程序启动时显式调用一次，日志尚未配置时会重新解析一次配置（见 `settings.reload`）。
+    如果未提供 builder，将按 默认值 < 配置文件 < 环境变量 < overrides 的优先级进行配置。
+
+    Args:
+        builder: 自定义的 LoggerConfigurator，提供时忽略配置中的 handler 设置。
+        config_file: TOML 配置文件或带 [tool.yai_nexus_logger] 段的 pyproject.toml，
+            默认使用环境变量 LOG_CONFIG_FILE 指定的文件。
+        overrides: 显式指定的配置，例如 {"app_name": "orders", "loggers": {"orders.db": "WARNING"}}。
     """
-    if logging.getLogger(settings.APP_NAME).hasHandlers():
+    # 先只解析不替换：日志已配置时直接返回，不改变当前生效的配置
+    app_name = settings.resolve(path=config_file, overrides=overrides).APP_NAME
+    if logging.getLogger(app_name).hasHandlers():
         warnings.warn(
-            f"Logger '{settings.APP_NAME}' seems to be already configured. "
+            f"Logger '{app_name}' seems to be already configured. "
             "Skipping initialization."
         )
         return
 
+    settings.reload(path=config_file, overrides=overrides)
+
     if builder:
         builder.configure()
         return
 
     # 从 settings.py 读取配置并构建 logger
+    handler_options = settings.HANDLER_OPTIONS
     configurator = LoggerConfigurator(level=settings.LOG_LEVEL)
+    configurator.with_trace_id_generator(settings.TRACE_ID_GENERATOR)
+
+    if settings.LOGGER_LEVELS:
+        configurator.with_logger_levels(settings.LOGGER_LEVELS)
+
+    if settings.TRACE_SAMPLE_RATE < 1.0:
+        configurator.with_trace_sampling(settings.TRACE_SAMPLE_RATE)
+
+    if settings.JSON_ENABLED:
+        configurator.with_json_output(**handler_options.get("json_output", {}))
 
     if settings.CONSOLE_ENABLED:
         configurator.with_console_handler()
 
     if settings.FILE_ENABLED:
-        configurator.with_file_handler(path=settings.FILE_PATH)
+        configurator.with_file_handler(
+            **{
+                **handler_options.get("file", {}),
+                "path": settings.FILE_PATH,
+                "multiprocess": settings.FILE_MULTIPROCESS,
+            }
+        )
 
     if settings.SLS_ENABLED:
         required_vars = [
@@ -57,21 +96,62 @@ def init_logging(builder: Optional[LoggerConfigurator] = None) -> None:
                 source=settings.SLS_SOURCE,
             )
 
+    if settings.AGGREGATOR_SOCKET:
+        configurator.with_aggregator(settings.AGGREGATOR_SOCKET, **handler_options.get("aggregator", {}))
+
+    if settings.ASYNC_ENABLED:
+        configurator.with_async_dispatch(**handler_options.get("async_dispatch", {}))
+
+    # 背压和尾部缓冲没有单独的开关，配置了参数即启用
+    if "backpressure" in handler_options:
+        configurator.with_backpressure(**handler_options["backpressure"])
+
+    if "tail_buffering" in handler_options:
+        configurator.with_tail_buffering(**handler_options["tail_buffering"])
+
     if settings.UVICORN_INTEGRATION_ENABLED:
-        configurator.with_uvicorn_integration()
+        configurator.with_uvicorn_integration(access_log=settings.UVICORN_ACCESS_LOG)
 
     configurator.configure()
 
 
-def get_logger(name: Optional[str] = None) -> logging.Logger:
+def _current_cache() -> tuple[int, dict[str | None, logging.Logger], dict[str | None, BoundLogger]]:
+    global _logger_cache
+    cache = _logger_cache
+    generation = settings.generation
+    if cache[0] != generation:
+        cache = _logger_cache = (generation, {}, {})
+    return cache
+
+
+def get_logger(name: str | None = None) -> logging.Logger:
     """
     获取一个 logger 实例。
 
     此函数假设日志系统已通过 init_logging() 初始化，它本身不执行任何配置。
+    结果按名称缓存，重复调用（例如在请求处理函数中调用 `get_logger(__name__)`）只需一次字典查找，
+    不再拼接名称，也不会获取 logging 模块的全局锁；`settings.reload()` 后缓存自动失效。
     """
-    if name:
-        logger_name = f"{settings.APP_NAME}.{name}"
-    else:
-        logger_name = settings.APP_NAME
+    cache = _current_cache()
+    logger = cache[1].get(name)
+    if logger is None:
+        if name:
+            logger_name = f"{settings.APP_NAME}.{name}"
+        else:
+            logger_name = settings.APP_NAME
+        logger = cache[1][name] = logging.getLogger(logger_name)
+    return logger
 
-    return logging.getLogger(logger_name)
+
+def get_bound_logger(name: str | None = None) -> BoundLogger:
+    """
+    获取 get_logger(name) 的 `BoundLogger` 包装，同样按名称缓存。
+
+    BoundLogger 预先计算各级别是否启用，未启用级别的调用（例如生产环境中的 debug 日志）
+    直接返回，不创建 LogRecord。
+    """
+    cache = _current_cache()
+    bound = cache[2].get(name)
+    if bound is None:
+        bound = cache[2][name] = BoundLogger(get_logger(name))
+    return bound
@@ -0,0 +1,115 @@
+"""异步分发：在调用线程中只做入队，由后台线程把日志写入真正的 handler。"""
+
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler
+
+from .internal_backpressure import BackpressurePolicy
+from .internal_utils import inject_trace_id
+
+# 通知后台线程退出的哨兵对象
+_SENTINEL = None
+
+
+class AsyncDispatchHandler(QueueHandler):
+    """
+    把日志放入有界队列，由后台线程分发给目标 handler（控制台、文件等）。
+
+    调用线程只负责捕获 trace_id、合并 msg/args 并入队，阻塞的 stdout/磁盘写入都在后台线程中完成。
+    close() 会先排空队列再退出后台线程，`logging.shutdown()` 在进程退出时会自动调用它。
+    workers 大于 1 时，多个线程并发消费同一队列，日志之间不再保证先后顺序。
+    队列写满时的行为由 backpressure 策略决定，默认阻塞等待。
+    """
+
+    def __init__(
+        self,
+        handlers: list[logging.Handler],
+        queue_size: int = 10000,
+        workers: int = 1,
+        backpressure: BackpressurePolicy | None = None,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.handlers = list(handlers)
+        self.backpressure = backpressure or BackpressurePolicy()
+        self._workers = [
+            threading.Thread(
+                target=self._dispatch_loop,
+                name=f"yai-nexus-logger-dispatch-{i}",
+                daemon=True,
+            )
+            for i in range(workers)
+        ]
+        self._closed = False
+        for worker in self._workers:
+            worker.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        在调用线程中固定依赖上下文或可变参数的字段，格式化留给后台线程。
+        """
+        inject_trace_id(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._closed:
+            # 已关闭（例如进程退出过程中）时直接同步写出，避免日志滞留在无人消费的队列中
+            self._dispatch(record)
+            return
+        self.backpressure.offer(self.queue, record)
+
+    def _dispatch(self, record: logging.LogRecord) -> None:
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _dispatch_loop(self) -> None:
+        q = self.queue
+        while True:
+            record = q.get()
+            try:
+                if record is _SENTINEL:
+                    return
+                self._dispatch(record)
+            except Exception:
+                self.handleError(record)
+            finally:
+                q.task_done()
+
+    def get_stats(self) -> dict[str, str | int]:
+        """返回背压统计：策略名称、丢弃数、阻塞数以及当前队列长度。"""
+        return {**self.backpressure.stats(), "queued": self.queue.qsize()}
+
+    def flush(self) -> None:
+        """等待队列中已有的日志全部写出，再刷新目标 handler。"""
+        if not self._closed:
+            self.queue.join()
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self) -> None:
+        """排空队列并停止后台线程。"""
+        with self.lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        for _ in self._workers:
+            self.queue.put(_SENTINEL)
+        for worker in self._workers:
+            worker.join()
+        # 与 close 并发入队、落在哨兵之后的日志，同步写出
+        while True:
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not _SENTINEL:
+                self._dispatch(record)
+        for handler in self.handlers:
+            handler.flush()
+        super().close()
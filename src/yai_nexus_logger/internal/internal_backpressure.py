@@ -0,0 +1,117 @@
+"""队列背压策略：队列写满时如何处理新的日志。"""
+
+import logging
+import queue
+import threading
+
+from .internal_utils import resolve_level
+
+# 支持的背压策略
+BACKPRESSURE_POLICIES = ("block", "drop_newest", "drop_oldest", "drop_below_level", "sample")
+
+
+class BackpressurePolicy:
+    """
+    队列写满时的处理策略，每个队列 handler 持有独立的实例和计数器。
+
+    - block：阻塞等待队列空位，超过 timeout（None 表示一直等待）后丢弃。
+    - drop_newest：丢弃当前这条新日志。
+    - drop_oldest：丢弃队列中最早的一条日志，为新日志腾出位置。
+    - drop_below_level：低于 min_level 的日志直接丢弃，其余按 block 处理。
+    - sample：只保留约 sample_rate 比例的日志（按 block 处理），其余丢弃。
+
+    队列未满时所有策略都只是一次 put_nowait，不产生额外开销。
+    """
+
+    def __init__(
+        self,
+        policy: str = "block",
+        timeout: float | None = None,
+        min_level: int | str = logging.WARNING,
+        sample_rate: float = 0.1,
+    ):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unsupported backpressure policy: {policy!r}. "
+                f"Expected one of {BACKPRESSURE_POLICIES}."
+            )
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1].")
+
+        self.policy = policy
+        self.timeout = timeout
+        self.min_level = resolve_level(min_level)
+        self._sample_every = max(1, round(1 / sample_rate))
+        self._sample_counter = 0
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.blocked = 0
+
+    def _count(self, dropped: int = 0, blocked: int = 0) -> None:
+        with self._lock:
+            self.dropped += dropped
+            self.blocked += blocked
+
+    def _put_blocking(self, q: queue.Queue, record: logging.LogRecord) -> None:
+        self._count(blocked=1)
+        try:
+            q.put(record, timeout=self.timeout)
+        except queue.Full:
+            self._count(dropped=1)
+
+    def offer(self, q: queue.Queue, record: logging.LogRecord) -> None:
+        """按策略把 record 放入队列。"""
+        try:
+            q.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        policy = self.policy
+        if policy == "block":
+            self._put_blocking(q, record)
+        elif policy == "drop_newest":
+            self._count(dropped=1)
+        elif policy == "drop_oldest":
+            self._replace_oldest(q, record)
+        elif policy == "drop_below_level":
+            if record.levelno < self.min_level:
+                self._count(dropped=1)
+            else:
+                self._put_blocking(q, record)
+        else:  # sample
+            with self._lock:
+                self._sample_counter += 1
+                keep = self._sample_counter % self._sample_every == 0
+            if keep:
+                self._put_blocking(q, record)
+            else:
+                self._count(dropped=1)
+
+    def _replace_oldest(self, q: queue.Queue, record: logging.LogRecord) -> None:
+        while True:
+            try:
+                oldest = q.get_nowait()
+                q.task_done()
+                if oldest is None:
+                    # 取到的是停止后台线程的哨兵，放回队列并丢弃新日志
+                    self._count(dropped=1)
+                    try:
+                        q.put_nowait(oldest)
+                    except queue.Full:
+                        # 空位已被其他线程的日志占用；后台线程仍在消费，阻塞等待空位，保证哨兵不丢失
+                        q.put(oldest)
+                    return
+                self._count(dropped=1)
+            except queue.Empty:
+                pass
+            try:
+                q.put_nowait(record)
+                return
+            except queue.Full:
+                continue
+
+    def stats(self) -> dict[str, str | int]:
+        """返回策略名称以及丢弃、阻塞的日志计数。"""
+        with self._lock:
+            return {"policy": self.policy, "dropped": self.dropped, "blocked": self.blocked}
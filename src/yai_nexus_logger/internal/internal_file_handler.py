@@ -0,0 +1,546 @@
+"""文件 handler 的扩展实现：后台分割/压缩、批量写入（group commit）等。"""
+
+import contextlib
+import gzip
+import logging
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import TimedRotatingFileHandler
+
+# 多进程文件模式依赖 fcntl 文件锁（仅 POSIX 平台可用）
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# 尝试导入 zstd 压缩库
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# 支持的持久化策略：不主动 fsync、按时间间隔 fsync、遇到 ERROR 及以上级别时 fsync
+DURABILITY_POLICIES = ("none", "interval", "error")
+
+# 支持的分割后压缩方式
+COMPRESSION_FORMATS = ("gzip", "zstd")
+
+# 分割文件名的后缀部分：周期时间（不含 "."）、可选的同周期序号、可选的压缩扩展名
+_ROTATED_SUFFIX = re.compile(r"^(?P<period>[^.]+)(?:\.(?P<index>\d+))?(?:\.gz|\.zst)?$")
+
+# 分割模式：在 emit 中同步完成全部工作，或把压缩和清理交给后台线程
+ROTATION_MODES = ("inline", "background")
+
+
+def _compress_file(path: str, compression: str) -> str:
+    """压缩分割出的日志文件，成功后删除原文件，返回压缩文件路径。"""
+    if compression == "gzip":
+        target = path + ".gz"
+        with open(path, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    else:
+        target = path + ".zst"
+        with open(path, "rb") as src, open(target, "wb") as dst:
+            zstandard.ZstdCompressor().copy_stream(src, dst)
+    os.remove(path)
+    return target
+
+
+class _RotationWorker:
+    """串行执行分割后任务（压缩、清理过期文件）的后台线程，首次使用时才启动。"""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, job) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="yai-nexus-logger-rotation", daemon=True
+                )
+                self._thread.start()
+        self._queue.put(job)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job()
+
+    def stop(self) -> None:
+        """等待已提交的任务执行完毕后退出。"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+class OffloadedRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    支持按时间和按大小分割、并可把分割后的重活移出日志热路径的文件 handler。
+
+    分割时在 emit 中只做最少的工作：关闭当前文件、重命名为分割文件（一次元数据操作），
+    然后打开新的文件描述符。压缩（gzip/zstd）和按 backupCount 清理过期文件在
+    rotation="background" 时交给后台线程执行，不再阻塞持有 handler 锁的日志线程。
+
+    max_bytes 大于 0 时，文件超过该大小也会触发分割，与 when/interval 的时间分割同时生效。
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        when: str = "midnight",
+        interval: int = 1,
+        backupCount: int = 0,
+        encoding: str = "utf-8",
+        max_bytes: int = 0,
+        compression: str | None = None,
+        rotation: str = "background",
+    ):
+        if compression is not None and compression not in COMPRESSION_FORMATS:
+            raise ValueError(
+                f"Unsupported compression: {compression!r}. Expected one of {COMPRESSION_FORMATS}."
+            )
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is not installed. Please run 'pip install zstandard' to install it.")
+        if rotation not in ROTATION_MODES:
+            raise ValueError(f"Unsupported rotation mode: {rotation!r}. Expected one of {ROTATION_MODES}.")
+
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.rotation = rotation
+        self._worker = _RotationWorker()
+        # 最近一次分割文件的 (周期文件名, 序号)
+        self._last_rotated = ("", 0)
+        super().__init__(filename, when=when, interval=interval, backupCount=backupCount, encoding=encoding)
+
+    def _current_size(self) -> int:
+        return self.stream.tell()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if super().shouldRollover(record):
+            return True
+        return bool(self.max_bytes > 0 and self.stream is not None and self._current_size() >= self.max_bytes)
+
+    def _rotated_filename(self) -> str:
+        """分割文件名：当前周期的起始时间后缀，同一周期内多次分割时追加序号。"""
+        period_start = self.rolloverAt - self.interval
+        time_tuple = time.gmtime(period_start) if self.utc else time.localtime(period_start)
+        base = self.rotation_filename(self.baseFilename + "." + time.strftime(self.suffix, time_tuple))
+
+        # 同一周期内的序号只增不减：后台清理可能已删除较早的分割文件，复用其序号会让新文件排在最旧的位置
+        last_base, index = self._last_rotated
+        index = index + 1 if last_base == base else 0
+        candidate = f"{base}.{index}" if index else base
+        while any(os.path.exists(candidate + ext) for ext in ("", ".gz", ".zst")):
+            index += 1
+            candidate = f"{base}.{index}"
+        self._last_rotated = (base, index)
+        return candidate
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        if os.path.exists(self.baseFilename):
+            rotated = self._rotated_filename()
+            self.rotate(self.baseFilename, rotated)
+        else:
+            rotated = None
+
+        if not self.delay:
+            self.stream = self._open()
+
+        now = int(time.time())
+        if now >= self.rolloverAt:
+            new_rollover_at = self.computeRollover(now)
+            while new_rollover_at <= now:
+                new_rollover_at += self.interval
+            self.rolloverAt = new_rollover_at
+
+        if self.rotation == "background":
+            self._worker.submit(lambda: self._after_rotation(rotated))
+        else:
+            self._after_rotation(rotated)
+
+    def _after_rotation(self, rotated: str | None) -> None:
+        """分割后的收尾工作：压缩分割文件、清理超出 backupCount 的旧文件。"""
+        try:
+            if rotated is not None and self.compression:
+                _compress_file(rotated, self.compression)
+            if self.backupCount > 0:
+                for path in self._expired_files():
+                    os.remove(path)
+        except OSError:
+            # 后台任务没有对应的 record，这里只报告错误而不打断日志写入
+            if logging.raiseExceptions:
+                traceback.print_exc(file=sys.stderr)
+
+    def _rotated_files(self) -> list[str]:
+        """按“周期时间后缀 + 同周期序号”从旧到新排序的全部分割文件（含已压缩的）。"""
+        dir_name, base_name = os.path.split(self.baseFilename)
+        prefix = base_name + "."
+        rotated = []
+        for name in os.listdir(dir_name):
+            if not name.startswith(prefix):
+                continue
+            match = _ROTATED_SUFFIX.match(name[len(prefix):])
+            # 与 TimedRotatingFileHandler.getFilesToDelete 一致，只处理周期时间后缀合法的文件（跳过 app.log.bak 等）
+            if match and self.extMatch.match(match.group("period")):
+                order = (match.group("period"), int(match.group("index") or 0))
+                rotated.append((order, os.path.join(dir_name, name)))
+        rotated.sort()
+        return [path for _, path in rotated]
+
+    def _expired_files(self) -> list[str]:
+        """返回超出 backupCount 的最旧分割文件。"""
+        rotated = self._rotated_files()
+        if len(rotated) <= self.backupCount:
+            return []
+        return rotated[: len(rotated) - self.backupCount]
+
+    def close(self) -> None:
+        # 等待后台的压缩和清理任务完成
+        self._worker.stop()
+        super().close()
+
+
+class BufferedFileHandler(OffloadedRotatingFileHandler):
+    """
+    带批量写入的文件 handler，支持 OffloadedRotatingFileHandler 的全部分割选项。
+
+    日志编码后先写入预分配的缓冲区，缓冲区达到 buffer_size 字节或距第一条未写出的日志
+    超过 flush_interval_ms 毫秒时，用一次 write 系统调用整体写入文件；空闲时由后台线程
+    负责按时写出，保证日志最多延迟 flush_interval_ms。
+
+    durability 控制 fsync 行为：
+    - "none"：只写入操作系统页缓存，不主动 fsync。
+    - "interval"：写出后如距上次 fsync 超过 fsync_interval_ms，执行一次 fsync。
+    - "error"：ERROR 及以上级别的日志立即写出并 fsync。
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        when: str = "midnight",
+        interval: int = 1,
+        backupCount: int = 0,
+        encoding: str = "utf-8",
+        buffer_size: int = 64 * 1024,
+        flush_interval_ms: int = 200,
+        durability: str = "none",
+        fsync_interval_ms: int = 1000,
+        max_bytes: int = 0,
+        compression: str | None = None,
+        rotation: str = "background",
+    ):
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(
+                f"Unsupported durability policy: {durability!r}. "
+                f"Expected one of {DURABILITY_POLICIES}."
+            )
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be positive.")
+
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.durability = durability
+        self.fsync_interval = fsync_interval_ms / 1000
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._pos = 0
+        self._flush_deadline = 0.0
+        self._last_fsync = time.monotonic()
+        self._terminator = self.terminator.encode(encoding)
+        super().__init__(
+            filename,
+            when=when,
+            interval=interval,
+            backupCount=backupCount,
+            encoding=encoding,
+            max_bytes=max_bytes,
+            compression=compression,
+            rotation=rotation,
+        )
+
+        self._stop_event = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="yai-nexus-logger-file-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _open(self):
+        # 以无缓冲的二进制方式打开，缓冲由本 handler 自己管理
+        return open(self.baseFilename, "ab", buffering=0)
+
+    def _current_size(self) -> int:
+        # 文件中已写入的字节数加上缓冲区中尚未写出的字节数
+        return self.stream.tell() + self._pos
+
+    def _encode(self, record: logging.LogRecord) -> bytes:
+        formatter = self.formatter
+        if self.encoding.lower().replace("-", "") == "utf8" and hasattr(formatter, "format_bytes"):
+            # 复用 formatter 在 record 上缓存的编码结果
+            return formatter.format_bytes(record)
+        return self.format(record).encode(self.encoding)
+
+    def _append(self, data: bytes) -> None:
+        size = len(data)
+        if self._pos + size > self.buffer_size:
+            self._write_buffer()
+            if size > self.buffer_size:
+                # 单条日志超过缓冲区大小，直接写出
+                self._write_all(data)
+                return
+        if self._pos == 0:
+            self._flush_deadline = time.monotonic() + self.flush_interval
+        self._buffer[self._pos:self._pos + size] = data
+        self._pos += size
+
+    def _write_all(self, data) -> None:
+        view = memoryview(data)
+        while view:
+            written = self.stream.write(view)
+            view = view[written:]
+
+    def _write_buffer(self) -> None:
+        """把缓冲区内容一次性写入文件，调用方需持有 handler 锁。"""
+        if self._pos == 0 or self.stream is None:
+            return
+        self._write_all(self._view[:self._pos])
+        self._pos = 0
+        if self.durability == "interval" and time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._fsync()
+
+    def _fsync(self) -> None:
+        os.fsync(self.stream.fileno())
+        self._last_fsync = time.monotonic()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+
+            self._append(self._encode(record))
+            self._append(self._terminator)
+
+            if record.levelno >= logging.ERROR and self.durability == "error":
+                self._write_buffer()
+                self._fsync()
+            elif self._pos >= self.buffer_size or time.monotonic() >= self._flush_deadline:
+                self._write_buffer()
+        except Exception:
+            self.handleError(record)
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            with self.lock:
+                if self._pos and time.monotonic() >= self._flush_deadline:
+                    # 后台写出失败时保留缓冲区，等待下一次 emit/flush 重试
+                    with contextlib.suppress(OSError):
+                        self._write_buffer()
+
+    def doRollover(self) -> None:
+        # 切换文件前先把缓冲区写入旧文件
+        self._write_buffer()
+        super().doRollover()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._write_buffer()
+
+    def close(self) -> None:
+        self._stop_event.set()
+        if self._flusher is not threading.current_thread():
+            self._flusher.join()
+        with self.lock:
+            if self.stream is not None:
+                self._write_buffer()
+                if self.durability != "none":
+                    self._fsync()
+            super().close()
+
+
+class MultiProcessFileHandler(OffloadedRotatingFileHandler):
+    """
+    多进程安全的文件 handler，适用于 uvicorn/gunicorn 多 worker 写同一个日志文件。
+
+    - 写入：每个进程以 O_APPEND 方式打开文件，每条日志一次 write 系统调用，
+      由内核保证追加的原子性，写路径上没有任何跨进程的锁，吞吐随 worker 数线性扩展。
+    - 分割：到达分割时间（或超过 max_bytes）的进程先获取文件锁，只有第一个发现文件
+      尚未被分割的进程执行重命名、压缩和清理，其余进程只是重新打开新文件。
+    - 不丢日志：分割前已打开旧文件的进程继续写入被重命名的旧文件，最多
+      reopen_check_interval 秒后发现文件已被替换并切换到新文件。
+    - 压缩：刚分割出的文件可能仍在被其他进程写入，不会立即压缩；每次分割时只压缩
+      超过两个 reopen_check_interval 没有任何写入的旧分割文件，因此最近一次分割出的
+      文件要到下一次分割时才会被压缩。
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        when: str = "midnight",
+        interval: int = 1,
+        backupCount: int = 0,
+        encoding: str = "utf-8",
+        max_bytes: int = 0,
+        compression: str | None = None,
+        rotation: str = "background",
+        reopen_check_interval: float = 1.0,
+    ):
+        if not FCNTL_AVAILABLE:
+            raise ImportError("Multi-process file logging requires fcntl, which is not available on this platform.")
+
+        dir_name, base_name = os.path.split(os.path.abspath(filename))
+        self._lock_path = os.path.join(dir_name, f".{base_name}.lock")
+        self._compress_lock_path = os.path.join(dir_name, f".{base_name}.compress.lock")
+        self.reopen_check_interval = reopen_check_interval
+        self._next_reopen_check = 0.0
+        self._terminator = self.terminator.encode(encoding)
+        super().__init__(
+            filename,
+            when=when,
+            interval=interval,
+            backupCount=backupCount,
+            encoding=encoding,
+            max_bytes=max_bytes,
+            compression=compression,
+            rotation=rotation,
+        )
+
+    def _open(self):
+        # open(..., "ab") 使用 O_APPEND，无缓冲保证每条日志只有一次 write 调用
+        self._next_reopen_check = time.monotonic() + self.reopen_check_interval
+        return open(self.baseFilename, "ab", buffering=0)
+
+    def _current_size(self) -> int:
+        return os.fstat(self.stream.fileno()).st_size
+
+    def _is_current_file(self) -> bool:
+        """当前打开的文件描述符是否仍指向 baseFilename（即尚未被其他进程分割）。"""
+        try:
+            path_stat = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return False
+        stream_stat = os.fstat(self.stream.fileno())
+        return (path_stat.st_dev, path_stat.st_ino) == (stream_stat.st_dev, stream_stat.st_ino)
+
+    def _reopen(self) -> None:
+        if self.stream:
+            self.stream.close()
+        self.stream = self._open()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            elif time.monotonic() >= self._next_reopen_check:
+                self._next_reopen_check = time.monotonic() + self.reopen_check_interval
+                if not self._is_current_file():
+                    self._reopen()
+
+            if self.shouldRollover(record):
+                self.doRollover()
+
+            data = self.format(record).encode(self.encoding) + self._terminator
+            self.stream.write(data)
+        except Exception:
+            self.handleError(record)
+
+    def computeRollover(self, currentTime: int) -> int:
+        # 按秒/分/时/天分割时对齐到 interval 的整数倍，保证所有进程的分割时间点一致
+        if self.when in ("S", "M", "H", "D"):
+            return (currentTime // self.interval + 1) * self.interval
+        return super().computeRollover(currentTime)
+
+    def doRollover(self) -> None:
+        rotated = None
+        with open(self._lock_path, "a+") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if self.stream is None:
+                    self.stream = self._open()
+
+                # 锁文件中记录最近一次按时间分割的时间点，同一时间点只分割一次
+                lock_file.seek(0)
+                content = lock_file.read().strip()
+                last_boundary = int(content) if content.isdigit() else 0
+                time_due = int(time.time()) >= self.rolloverAt and last_boundary < self.rolloverAt
+                size_due = (
+                    self.max_bytes > 0
+                    and self._is_current_file()
+                    and self._current_size() >= self.max_bytes
+                )
+
+                if (time_due or size_due) and os.path.exists(self.baseFilename):
+                    rotated = self._rotated_filename()
+                    self.rotate(self.baseFilename, rotated)
+                if time_due:
+                    lock_file.seek(0)
+                    lock_file.truncate()
+                    lock_file.write(str(self.rolloverAt))
+                    lock_file.flush()
+                self._reopen()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        now = int(time.time())
+        if now >= self.rolloverAt:
+            new_rollover_at = self.computeRollover(now)
+            while new_rollover_at <= now:
+                new_rollover_at += self.interval
+            self.rolloverAt = new_rollover_at
+
+        if rotated is None:
+            return
+        if self.rotation == "background":
+            self._worker.submit(lambda: self._after_rotation(rotated))
+        else:
+            self._after_rotation(rotated)
+
+    def _after_rotation(self, rotated: str | None) -> None:
+        if self.compression:
+            try:
+                self._compress_settled_files()
+            except OSError:
+                if logging.raiseExceptions:
+                    traceback.print_exc(file=sys.stderr)
+        # 刚分割出的文件不在这里压缩，只清理过期文件
+        super()._after_rotation(None)
+
+    def _compress_settled_files(self) -> None:
+        """压缩已经没有进程写入的分割文件，同一时间只有一个进程执行压缩。"""
+        with open(self._compress_lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # 其他进程正在压缩，剩下的文件留到下一次分割
+                return
+            try:
+                # 重命名和写入都会更新 ctime；超过两个检查周期没有变化，说明所有进程都已切换到新文件
+                settled_before = time.time() - 2 * self.reopen_check_interval
+                for path in self._rotated_files():
+                    if path.endswith((".gz", ".zst")):
+                        continue
+                    with contextlib.suppress(FileNotFoundError):
+                        if os.stat(path).st_ctime <= settled_before:
+                            _compress_file(path, self.compression)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,9 +1,88 @@
 """Internal formatter for the logger, handles trace_id and log record formatting."""
 
 import logging
+import re
+import time
+from collections.abc import Callable
+from typing import NamedTuple
 
-from yai_nexus_logger.trace_context import trace_context
-from .internal_utils import extract_extra_fields
+from .internal_utils import (
+    BINDING_ATTR,
+    RENDER_CACHE_ATTR,
+    extract_extra_fields,
+    inject_trace_id,
+    merge_bound_fields,
+)
+
+# 匹配 %-style 格式串中的字段（如 `%(levelname)-7s`）以及转义的 `%%`
+_FIELD_PATTERN = re.compile(
+    r"%%|%\((?P<key>\w+)\)(?P<spec>[#0+ -]*(?:\*|\d+)?(?:\.(?:\*|\d+))?[diouxefgcrsa%])",
+    re.IGNORECASE,
+)
+
+FieldGetter = Callable[[logging.LogRecord], str]
+
+# 调用点缓存的默认容量，超过后新的调用点不再缓存（仍会正常计算）
+DEFAULT_CALL_SITE_CACHE_SIZE = 8192
+
+# 支持的时间戳格式：本地时间（datefmt）、ISO-8601/RFC3339、纳秒级 Unix 时间戳
+TIMESTAMP_FORMATS = ("local", "iso8601", "epoch_ns")
+
+
+class CallSite(NamedTuple):
+    """一个代码位置（pathname, lineno）上不会变化的派生字段。"""
+
+    module: str
+    func_name: str | None
+
+
+def _make_field_getter(key: str, spec: str) -> FieldGetter:
+    """为单个格式字段生成取值函数，最常见的 `%(key)s` 直接走 str()。"""
+    if spec == "s":
+
+        def getter(record: logging.LogRecord) -> str:
+            return str(record.__dict__[key])
+
+    else:
+        pattern = "%" + spec
+
+        def getter(record: logging.LogRecord) -> str:
+            return pattern % record.__dict__[key]
+
+    return getter
+
+
+def compile_format(fmt: str) -> tuple[list[str], list[tuple[int, FieldGetter]]]:
+    """
+    将 %-style 格式串编译为“模板 + 字段取值函数”的渲染计划。
+
+    Returns:
+        tuple: (parts, fields)。parts 中的字面量已就位，字段所在的位置为占位的空串；
+        fields 为 (位置, 取值函数) 列表，渲染时只需把取值结果填回对应位置再拼接。
+    """
+    parts: list[str] = []
+    fields: list[tuple[int, FieldGetter]] = []
+    literal: list[str] = []
+    last = 0
+
+    for match in _FIELD_PATTERN.finditer(fmt):
+        literal.append(fmt[last:match.start()])
+        last = match.end()
+        if match.group(0) == "%%":
+            literal.append("%")
+            continue
+        if literal:
+            parts.append("".join(literal))
+            literal = []
+        fields.append((len(parts), _make_field_getter(match.group("key"), match.group("spec"))))
+        parts.append("")
+
+    literal.append(fmt[last:])
+    tail = "".join(literal)
+    if tail:
+        parts.append(tail)
+
+    return parts, fields
 
 
 class InternalFormatter(logging.Formatter):
@@ -12,10 +91,72 @@ class InternalFormatter(logging.Formatter):
     1. 在日志记录中自动添加 trace_id。
     2. 缩写模块名称，使日志更紧凑。
     3. 对错误级别以上的日志自动附加堆栈跟踪信息。
+    4. 在末尾附加 `trace_context.bind()` 绑定的字段和 extra 字段。
+
+    默认启用编译模式：格式串在构造时被编译为字段取值计划，
+    每条日志直接按计划拼接，不再经过 `logging.Formatter` 的 %-插值。
+
+    `asctime` 按秒缓存：同一秒内的日志复用已渲染的时间前缀，只拼接毫秒部分。
+    `timestamp_format` 可选 "local"（默认，使用 datefmt）、"iso8601"（RFC3339，
+    带毫秒和时区偏移）或 "epoch_ns"（纳秒级 Unix 时间戳）。
+
+    格式化结果会缓存在 record 上（以 formatter 实例为键），多个 handler 共享同一个
+    formatter 时，每条日志只渲染、只编码一次，模块名缩写等对 record 的修改也只执行一次。
     """
 
-    def __init__(self, fmt: str | None = None, datefmt: str | None = None):
+    def __init__(
+        self,
+        fmt: str | None = None,
+        datefmt: str | None = None,
+        compiled: bool = True,
+        timestamp_format: str = "local",
+        call_site_cache_size: int = DEFAULT_CALL_SITE_CACHE_SIZE,
+    ):
+        if timestamp_format not in TIMESTAMP_FORMATS:
+            raise ValueError(
+                f"Unsupported timestamp_format: {timestamp_format!r}. "
+                f"Expected one of {TIMESTAMP_FORMATS}."
+            )
         super().__init__(fmt, datefmt or "%Y-%m-%d %H:%M:%S")
+        self._compiled = compiled
+        self._parts, self._fields = compile_format(self._fmt)
+        self._timestamp_format = timestamp_format
+        # (秒, datefmt, 已渲染的秒级前缀, 时区后缀)，整体替换以保证线程安全
+        self._time_cache: tuple[int, str | None, str, str] = (-1, None, "", "")
+        # (pathname, lineno) -> CallSite，调用点数量有限，进程生命周期内只计算一次
+        self._call_sites: dict[tuple[str, int], CallSite] = {}
+        self._call_site_cache_size = call_site_cache_size
+        # 渲染缓存的键：使用独立对象而非 id()，跨进程反序列化后的 record 不会误命中
+        self._render_token = object()
+
+    def _render_second(self, seconds: int, datefmt: str | None) -> tuple[str, str]:
+        """渲染秒级时间前缀，返回 (前缀, 时区后缀)。"""
+        ct = self.converter(seconds)
+        if self._timestamp_format == "iso8601":
+            offset = ct.tm_gmtoff or 0
+            sign = "+" if offset >= 0 else "-"
+            hours, minutes = divmod(abs(offset) // 60, 60)
+            return time.strftime("%Y-%m-%dT%H:%M:%S", ct), f"{sign}{hours:02d}:{minutes:02d}"
+        return time.strftime(datefmt or self.default_time_format, ct), ""
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        """
+        渲染 asctime，按秒缓存时间前缀，避免每条日志都调用 strftime/localtime。
+        """
+        if self._timestamp_format == "epoch_ns":
+            return str(int(record.created * 1_000_000_000))
+
+        seconds = int(record.created)
+        cached = self._time_cache
+        if cached[0] != seconds or cached[1] != datefmt:
+            cached = (seconds, datefmt, *self._render_second(seconds, datefmt))
+            self._time_cache = cached
+
+        if self._timestamp_format == "iso8601":
+            return f"{cached[2]}.{int(record.msecs):03d}{cached[3]}"
+        if datefmt:
+            return cached[2]
+        return self.default_msec_format % (cached[2], record.msecs)
 
     def _abbreviate_module_name(self, module_name: str) -> str:
         """
@@ -34,25 +175,114 @@ class InternalFormatter(logging.Formatter):
         abbreviated_parts = [p[0] if p.isalpha() else p for p in parts[:-1]]
         return ".".join(abbreviated_parts) + "." + parts[-1]
 
+    def _make_call_site(self, record: logging.LogRecord) -> CallSite:
+        return CallSite(self._abbreviate_module_name(record.module), getattr(record, "funcName", None))
+
+    def get_call_site(self, record: logging.LogRecord) -> CallSite:
+        """
+        获取日志调用点的派生字段（缩写后的模块名、函数名等）。
+        以 (pathname, lineno) 为键缓存；缓存满后新调用点直接计算，不做淘汰。
+        """
+        pathname = getattr(record, "pathname", None)
+        if pathname is None:
+            # 非标准的 record（缺少代码位置信息），无法缓存
+            return self._make_call_site(record)
+
+        key = (pathname, record.lineno)
+        site = self._call_sites.get(key)
+        if site is None:
+            site = self._make_call_site(record)
+            if len(self._call_sites) < self._call_site_cache_size:
+                self._call_sites[key] = site
+        return site
+
+    def _format_compiled(self, record: logging.LogRecord) -> str:
+        """按编译好的渲染计划格式化日志，语义与 `logging.Formatter.format` 保持一致。"""
+        record.message = record.getMessage()
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+
+        parts = self._parts.copy()
+        try:
+            for index, getter in self._fields:
+                parts[index] = getter(record)
+        except KeyError as e:
+            raise ValueError(f"Formatting field not found in record: {e}") from e
+        s = "".join(parts)
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + record.exc_text
+        if record.stack_info:
+            if s[-1:] != "\n":
+                s = s + "\n"
+            s = s + self.formatStack(record.stack_info)
+        return s
+
     def format(self, record: logging.LogRecord) -> str:
+        # 同一条日志已被本 formatter 渲染过（例如被另一个 handler），直接复用
+        cached = record.__dict__.get(RENDER_CACHE_ATTR)
+        if cached is not None and cached[0] is self._render_token:
+            return cached[1]
+
+        formatted_message = self._render(record)
+        setattr(record, RENDER_CACHE_ATTR, (self._render_token, formatted_message, None))
+        return formatted_message
+
+    def format_bytes(self, record: logging.LogRecord) -> bytes:
+        """
+        返回 UTF-8 编码后的格式化结果，编码结果与渲染结果一同缓存在 record 上。
+        """
+        formatted_message = self.format(record)
+        cached = record.__dict__[RENDER_CACHE_ATTR]
+        if cached[2] is None:
+            cached = (cached[0], formatted_message, formatted_message.encode("utf-8"))
+            setattr(record, RENDER_CACHE_ATTR, cached)
+        return cached[2]
+
+    def _render(self, record: logging.LogRecord) -> str:
+        # 在写入 trace_id、message 等属性之前提取 extra，未携带 extra 的 record 可直接跳过
+        extra_fields = extract_extra_fields(record)
+
         # 注入 trace_id
-        record.trace_id = trace_context.get_trace_id() or "No-Trace-ID"
+        inject_trace_id(record)
 
-        # 缩写模块名
-        record.module = self._abbreviate_module_name(record.module)
+        # 缩写模块名（按调用点缓存）
+        record.module = self.get_call_site(record).module
 
         # 为错误日志添加堆栈信息
         if record.levelno >= logging.ERROR and record.exc_info:
             record.exc_text = self.formatException(record.exc_info)
 
         # 处理 extra 参数
-        formatted_message = super().format(record)
-        
+        if self._compiled:
+            formatted_message = self._format_compiled(record)
+        else:
+            formatted_message = super().format(record)
+
+        # 处于 span 中时附加 span 信息
+        span_id = record.__dict__.get("span_id")
+        if span_id is not None:
+            formatted_message += f" | span_id={span_id}"
+            parent_span_id = record.__dict__.get("parent_span_id")
+            if parent_span_id is not None:
+                formatted_message += f" | parent_span_id={parent_span_id}"
+
+        # 附加 bind() 绑定的字段，后缀在每个 Binding 上只渲染一次；
+        # 与 extra 同名时以 extra 为准（与 JSON 输出一致），合并后整体渲染
+        binding = record.__dict__.get(BINDING_ATTR)
+        if binding is not None:
+            if extra_fields.keys() & binding.fields.keys():
+                extra_fields = merge_bound_fields(record, extra_fields)
+            else:
+                formatted_message += binding.suffix
+
         # 检查是否有 extra 字段需要添加
-        extra_fields = extract_extra_fields(record)
         if extra_fields:
             extra_str = " | ".join([f"{k}={v}" for k, v in extra_fields.items()])
             formatted_message += f" | {extra_str}"
-        
-        return formatted_message
 
+        return formatted_message
@@ -5,6 +5,8 @@ import sys
 from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 
+from .internal_file_handler import BufferedFileHandler, MultiProcessFileHandler, OffloadedRotatingFileHandler
+
 
 def get_console_handler(formatter: logging.Formatter) -> logging.Handler:
     """获取一个控制台输出的 handler"""
@@ -19,18 +21,72 @@ def get_file_handler(
     when: str,
     interval: int,
     backup_count: int,
+    buffered: bool = False,
+    buffer_size: int = 64 * 1024,
+    flush_interval_ms: int = 200,
+    durability: str = "none",
+    max_bytes: int = 0,
+    rotation: str = "inline",
+    compression: str | None = None,
+    multiprocess: bool = False,
 ) -> logging.Handler:
-    """获取一个文件输出的 handler，支持日志分割"""
+    """
+    获取一个文件输出的 handler，支持日志分割。
+    buffered 为 True 时使用批量写入的 BufferedFileHandler，而不是每条日志都 flush。
+    启用按大小分割、压缩或后台分割时使用 OffloadedRotatingFileHandler，
+    multiprocess 为 True 时使用 MultiProcessFileHandler，多个进程可以安全地写同一个文件。
+    否则保持标准的 TimedRotatingFileHandler。
+    """
+    if buffered and multiprocess:
+        raise ValueError("buffered and multiprocess cannot be enabled at the same time.")
+
     file_path = Path(path)
     # 确保日志文件所在的目录存在
     file_path.parent.mkdir(parents=True, exist_ok=True)
 
-    handler = TimedRotatingFileHandler(
-        file_path,
-        when=when,
-        interval=interval,
-        backupCount=backup_count,
-        encoding="utf-8",
-    )
+    if buffered:
+        handler = BufferedFileHandler(
+            str(file_path),
+            when=when,
+            interval=interval,
+            backupCount=backup_count,
+            encoding="utf-8",
+            buffer_size=buffer_size,
+            flush_interval_ms=flush_interval_ms,
+            durability=durability,
+            max_bytes=max_bytes,
+            compression=compression,
+            rotation=rotation,
+        )
+    elif multiprocess:
+        handler = MultiProcessFileHandler(
+            str(file_path),
+            when=when,
+            interval=interval,
+            backupCount=backup_count,
+            encoding="utf-8",
+            max_bytes=max_bytes,
+            compression=compression,
+            rotation=rotation,
+        )
+    elif max_bytes > 0 or compression or rotation != "inline":
+        handler = OffloadedRotatingFileHandler(
+            str(file_path),
+            when=when,
+            interval=interval,
+            backupCount=backup_count,
+            encoding="utf-8",
+            max_bytes=max_bytes,
+            compression=compression,
+            rotation=rotation,
+        )
+    else:
+        handler = TimedRotatingFileHandler(
+            file_path,
+            when=when,
+            interval=interval,
+            backupCount=backup_count,
+            encoding="utf-8",
+        )
     handler.setFormatter(formatter)
     return handler
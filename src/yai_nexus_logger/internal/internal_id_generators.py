@@ -0,0 +1,119 @@
+"""trace_id 生成器：基于预取随机数池，避免每个 id 一次 urandom 系统调用。"""
+
+import os
+import threading
+import time
+from collections.abc import Callable
+
+# 支持的 trace_id 生成器
+ID_GENERATORS = ("uuid4", "hex128", "hex64", "w3c", "ulid", "uuid7")
+
+# 每次从操作系统读取的随机字节数
+_POOL_BYTES = 4096
+
+# ULID 使用的 Crockford Base32 字母表
+_CROCKFORD32 = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+# UUID variant 位为 10xx，对应的十六进制字符
+_VARIANT_CHARS = "89ab89ab89ab89ab"
+
+
+class _HexPool:
+    """
+    预取的 CSPRNG 随机数池，以十六进制字符串形式保存。
+
+    每次从 os.urandom 读取 _POOL_BYTES 字节，之后每个 id 只需一次字符串切片；
+    池耗尽时才再次读取。fork 后子进程会丢弃继承的池，避免与父进程生成相同的 id。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hex = ""
+        self._pos = 0
+
+    def take(self, n_chars: int) -> str:
+        with self._lock:
+            pos = self._pos
+            end = pos + n_chars
+            if end > len(self._hex):
+                self._hex = os.urandom(_POOL_BYTES).hex()
+                pos, end = 0, n_chars
+            self._pos = end
+            return self._hex[pos:end]
+
+    def reset(self) -> None:
+        self._lock = threading.Lock()
+        self._hex = ""
+        self._pos = 0
+
+
+_pool = _HexPool()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_pool.reset)
+
+
+def _format_uuid(h: str) -> str:
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def uuid4_id() -> str:
+    """标准 UUIDv4 字符串（36 个字符），与 str(uuid.uuid4()) 格式一致。"""
+    h = _pool.take(32)
+    return _format_uuid(h[:12] + "4" + h[13:16] + _VARIANT_CHARS[int(h[16], 16)] + h[17:])
+
+
+def hex128_id() -> str:
+    """128 位随机数的十六进制字符串（32 个字符）。"""
+    return _pool.take(32)
+
+
+def hex64_id() -> str:
+    """64 位随机数的十六进制字符串（16 个字符），不会全为 0。"""
+    h = _pool.take(16)
+    while h == "0000000000000000":
+        h = _pool.take(16)
+    return h
+
+
+def w3c_id() -> str:
+    """W3C Trace Context 的 trace-id：32 个小写十六进制字符，不会全为 0。"""
+    h = _pool.take(32)
+    while h == "00000000000000000000000000000000":
+        h = _pool.take(32)
+    return h
+
+
+def ulid_id() -> str:
+    """ULID（26 个字符）：48 位毫秒时间戳 + 80 位随机数，按时间排序。"""
+    value = (time.time_ns() // 1_000_000) << 80 | int(_pool.take(20), 16)
+    chars = []
+    for _ in range(26):
+        chars.append(_CROCKFORD32[value & 0x1F])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def uuid7_id() -> str:
+    """UUIDv7（36 个字符）：48 位毫秒时间戳开头，按时间排序。"""
+    h = _pool.take(19)
+    timestamp = f"{time.time_ns() // 1_000_000 & 0xFFFFFFFFFFFF:012x}"
+    return _format_uuid(timestamp + "7" + h[:3] + _VARIANT_CHARS[int(h[3], 16)] + h[4:])
+
+
+_GENERATORS: dict[str, Callable[[], str]] = {
+    "uuid4": uuid4_id,
+    "hex128": hex128_id,
+    "hex64": hex64_id,
+    "w3c": w3c_id,
+    "ulid": ulid_id,
+    "uuid7": uuid7_id,
+}
+
+
+def get_id_generator(name: str) -> Callable[[], str]:
+    """按名称获取 trace_id 生成器。"""
+    try:
+        return _GENERATORS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported trace id generator: {name!r}. Expected one of {ID_GENERATORS}.") from None
@@ -0,0 +1,124 @@
+"""JSON formatter for the logger, emits one JSON object per log record."""
+
+import json
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from .internal_formatter import InternalFormatter
+from .internal_utils import extract_extra_fields, inject_trace_id, merge_bound_fields
+
+# 尝试导入更快的 JSON 序列化库，按 orjson -> msgspec -> 标准库 json 的顺序选择
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+def _make_orjson_dumps() -> Callable[[dict[str, Any]], str]:
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: dict[str, Any]) -> str:
+        return orjson.dumps(obj, default=str, option=option).decode("utf-8")
+
+    return dumps
+
+
+def _make_msgspec_dumps() -> Callable[[dict[str, Any]], str]:
+    encoder = msgspec.json.Encoder(enc_hook=str)
+
+    def dumps(obj: dict[str, Any]) -> str:
+        return encoder.encode(obj).decode("utf-8")
+
+    return dumps
+
+
+def _make_json_dumps() -> Callable[[dict[str, Any]], str]:
+    def dumps(obj: dict[str, Any]) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    return dumps
+
+
+def get_json_dumps(backend: str | None = None) -> Callable[[dict[str, Any]], str]:
+    """
+    获取 JSON 序列化函数。
+
+    Args:
+        backend (str | None): "orjson"、"msgspec" 或 "json"；为 None 时自动选择已安装的最快实现。
+    """
+    if backend is None:
+        backend = "orjson" if ORJSON_AVAILABLE else "msgspec" if MSGSPEC_AVAILABLE else "json"
+
+    if backend == "orjson":
+        if not ORJSON_AVAILABLE:
+            raise ImportError("orjson is not installed. Please run 'pip install orjson' to install it.")
+        return _make_orjson_dumps()
+    if backend == "msgspec":
+        if not MSGSPEC_AVAILABLE:
+            raise ImportError("msgspec is not installed. Please run 'pip install msgspec' to install it.")
+        return _make_msgspec_dumps()
+    if backend == "json":
+        return _make_json_dumps()
+
+    raise ValueError(f"Unsupported JSON backend: {backend!r}. Expected 'orjson', 'msgspec' or 'json'.")
+
+
+class JsonFormatter(InternalFormatter):
+    """
+    结构化 JSON 格式化程序，每条日志输出一行 JSON 对象。
+
+    字段顺序固定，且每条日志都包含全部字段（缺失时为 null），方便下游按固定 schema 解析：
+    trace_id, span_id, parent_span_id, level, time, logger, module, function, line, message, extra, exception, stack。
+    `trace_context.bind()` 绑定的字段合并到 extra 中，同名时以调用点传入的 extra 为准。
+    复用 InternalFormatter 的时间戳缓存、调用点缓存和按 record 的渲染缓存。
+    """
+
+    def __init__(self, timestamp_format: str = "iso8601", backend: str | None = None):
+        super().__init__("%(message)s", timestamp_format=timestamp_format)
+        self._dumps = get_json_dumps(backend)
+
+    def _format_time(self, record: logging.LogRecord) -> str:
+        """JSON 中的时间始终带毫秒："local" 格式按 datefmt 渲染到秒，再附加毫秒。"""
+        formatted = self.formatTime(record, self.datefmt)
+        if self._timestamp_format == "local":
+            return f"{formatted}.{int(record.msecs):03d}"
+        return formatted
+
+    def _render(self, record: logging.LogRecord) -> str:
+        extra_fields = extract_extra_fields(record)
+
+        inject_trace_id(record)
+        extra_fields = merge_bound_fields(record, extra_fields)
+        call_site = self.get_call_site(record)
+        record.module = call_site.module
+        record.message = record.getMessage()
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        payload = {
+            "trace_id": record.trace_id,
+            "span_id": record.__dict__.get("span_id"),
+            "parent_span_id": record.__dict__.get("parent_span_id"),
+            "level": record.levelname,
+            "time": self._format_time(record),
+            "logger": record.name,
+            "module": call_site.module,
+            "function": call_site.func_name,
+            "line": record.lineno,
+            "message": record.message,
+            "extra": extra_fields,
+            "exception": record.exc_text or None,
+            "stack": self.formatStack(record.stack_info) if record.stack_info else None,
+        }
+        return self._dumps(payload)
@@ -0,0 +1,101 @@
+"""跨进程传递日志时使用的紧凑编码：每条日志一个 JSON 数组，一批日志一个 JSON 数组。"""
+
+import json
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from .internal_json_formatter import ORJSON_AVAILABLE
+from .internal_utils import extract_extra_fields, inject_trace_id, merge_bound_fields
+
+if ORJSON_AVAILABLE:
+    import orjson
+
+    _loads = orjson.loads
+else:
+    _loads = json.loads
+
+# 每条日志编码后的字段顺序，最后一个元素是 extra 字段字典
+WIRE_FIELDS = (
+    "name",
+    "levelno",
+    "pathname",
+    "filename",
+    "module",
+    "lineno",
+    "funcName",
+    "created",
+    "msecs",
+    "process",
+    "processName",
+    "thread",
+    "threadName",
+    "trace_id",
+    "span_id",
+    "parent_span_id",
+    "msg",
+    "exc_text",
+    "stack_info",
+)
+
+# 兜底的异常格式化器，record 上没有 exc_text 时使用
+_exception_formatter = logging.Formatter()
+
+
+def encode_record(record: logging.LogRecord, dumps: Callable[[Any], str]) -> bytes:
+    """
+    在产生日志的进程中把 record 编码为字节串。
+
+    msg/args 合并为最终消息，异常预先渲染为文本，同时捕获 trace_id、span 字段和 extra 字段，
+    接收端无需再访问原始参数或上下文。
+    """
+    extra_fields = extract_extra_fields(record)
+    inject_trace_id(record)
+    # 绑定的字段作为 extra 发送，接收端按普通 extra 字段渲染
+    extra_fields = merge_bound_fields(record, extra_fields)
+    if record.exc_info and not record.exc_text:
+        record.exc_text = _exception_formatter.formatException(record.exc_info)
+
+    values: list[Any] = [
+        record.name,
+        record.levelno,
+        record.pathname,
+        record.filename,
+        record.module,
+        record.lineno,
+        record.funcName,
+        record.created,
+        record.msecs,
+        record.process,
+        record.processName,
+        record.thread,
+        record.threadName,
+        record.trace_id,
+        record.__dict__.get("span_id"),
+        record.__dict__.get("parent_span_id"),
+        record.getMessage(),
+        record.exc_text,
+        record.stack_info,
+        extra_fields,
+    ]
+    return dumps(values).encode("utf-8")
+
+
+def join_records(records: list[bytes]) -> bytes:
+    """把已编码的日志拼接为一个批次。"""
+    return b"[" + b",".join(records) + b"]"
+
+
+def decode_records(payload: bytes) -> list[logging.LogRecord]:
+    """把一个批次还原为 LogRecord 列表。"""
+    records = []
+    for values in _loads(payload):
+        *fields, extra = values
+        attrs = dict(zip(WIRE_FIELDS, fields))
+        attrs["levelname"] = logging.getLevelName(attrs["levelno"])
+        attrs["args"] = None
+        record = logging.makeLogRecord(attrs)
+        if extra:
+            record.__dict__.update(extra)
+        records.append(record)
+    return records
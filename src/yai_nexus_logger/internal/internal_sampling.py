@@ -0,0 +1,80 @@
+"""按链路采样的日志过滤器。"""
+
+import logging
+import zlib
+
+from yai_nexus_logger.trace_context import trace_context
+
+from .internal_utils import NO_TRACE_ID, resolve_level
+
+
+class UpstreamSampledFilter(logging.Filter):
+    """
+    遵循上游 traceparent 中的 sampled 标志：链路未被采样时，丢弃低于 min_level 的日志。
+
+    过滤发生在 handler 格式化之前（异步分发时在入队之前），未采样流量中的 DEBUG/INFO
+    日志不会产生任何格式化或 I/O 开销；WARNING 及以上默认始终保留。
+    """
+
+    def __init__(self, min_level: int | str = logging.WARNING):
+        super().__init__()
+        self.min_level = resolve_level(min_level)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.min_level:
+            return True
+        return trace_context.is_sampled()
+
+
+def _threshold(rate: float) -> int:
+    if not 0 <= rate <= 1:
+        raise ValueError("sample rate must be in [0, 1].")
+    return int(rate * 0x100000000)
+
+
+class TraceSamplingFilter(logging.Filter):
+    """
+    按 trace_id 做确定性采样：对 trace_id 计算 crc32，落在 rate 以内的链路保留全部日志，
+    其余链路中低于 min_level 的日志整体丢弃，不会出现同一请求的日志只剩一半的情况。
+
+    - logger_rates 按 logger 名称设置采样率，匹配最长的名称前缀（"app.db" 同样作用于 "app.db.pool"），
+      未匹配时使用 rate；每个 logger 名称的匹配结果会被缓存。
+    - 没有 trace_id 的日志（例如启动日志、后台任务）不参与采样，全部保留。
+    - 挂在 handler 上，在格式化（异步分发时在入队）之前执行。
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        min_level: int | str = logging.WARNING,
+        logger_rates: dict[str, float] | None = None,
+    ):
+        super().__init__()
+        self.min_level = resolve_level(min_level)
+        self._default_threshold = _threshold(rate)
+        self._logger_thresholds = {name: _threshold(value) for name, value in (logger_rates or {}).items()}
+        self._threshold_cache: dict[str, int] = {}
+
+    def _threshold_for(self, name: str) -> int:
+        threshold = self._threshold_cache.get(name)
+        if threshold is None:
+            threshold = self._default_threshold
+            prefix = name
+            while prefix:
+                if prefix in self._logger_thresholds:
+                    threshold = self._logger_thresholds[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._threshold_cache[name] = threshold
+        return threshold
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.min_level:
+            return True
+        trace_id = record.__dict__.get("trace_id") or trace_context.get_trace_id()
+        if trace_id is None or trace_id == NO_TRACE_ID:
+            return True
+        threshold = self._threshold_for(record.name)
+        if threshold >= 0x100000000:
+            return True
+        return zlib.crc32(trace_id.encode("utf-8")) < threshold
@@ -1,74 +1,253 @@
 """
 Configuration settings for yai-nexus-logger.
 
-This module centralizes all configuration settings that are read from
-environment variables. This provides a single source of truth for configuration.
+This module centralizes all configuration settings. Settings are resolved once into an
+immutable snapshot from defaults, an optional TOML/pyproject file, environment variables
+and explicit overrides, and are only re-read when `settings.reload()` is called.
 """
 
 import os
-
-
-class Settings:
+from collections.abc import Callable, Mapping
+from types import MappingProxyType
+from typing import Any, NamedTuple
+
+# TOML 解析：Python 3.11+ 使用标准库 tomllib，更早的版本需要安装 tomli
+try:
+    import tomllib
+
+    TOML_AVAILABLE = True
+except ImportError:
+    try:
+        import tomli as tomllib
+
+        TOML_AVAILABLE = True
+    except ImportError:
+        TOML_AVAILABLE = False
+
+# 指定配置文件路径的环境变量
+CONFIG_FILE_ENV = "LOG_CONFIG_FILE"
+
+# pyproject.toml 中的配置段
+PYPROJECT_SECTION = ("tool", "yai_nexus_logger")
+
+# handlers 中支持的配置段，分别是 LoggerConfigurator 的 with_file_handler、with_async_dispatch、
+# with_aggregator、with_json_output、with_backpressure、with_tail_buffering 的参数
+HANDLER_OPTION_SECTIONS = ("file", "async_dispatch", "aggregator", "json_output", "backpressure", "tail_buffering")
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+class SettingsSnapshot(NamedTuple):
+    """一次解析得到的全部配置，不可变。"""
+
+    APP_NAME: str = "app"
+    LOG_LEVEL: str = "INFO"
+    CONSOLE_ENABLED: bool = True
+    FILE_ENABLED: bool = False
+    # 为 None 时使用 logs/{APP_NAME}.log
+    FILE_PATH: str | None = None
+    FILE_MULTIPROCESS: bool = False
+    AGGREGATOR_SOCKET: str | None = None
+    JSON_ENABLED: bool = False
+    ASYNC_ENABLED: bool = False
+    TRACE_ID_GENERATOR: str = "uuid4"
+    TRACE_SAMPLE_RATE: float = 1.0
+    SLS_ENABLED: bool = False
+    SLS_ENDPOINT: str | None = None
+    SLS_ACCESS_KEY_ID: str | None = None
+    SLS_ACCESS_KEY_SECRET: str | None = None
+    SLS_PROJECT: str | None = None
+    SLS_LOGSTORE: str | None = None
+    SLS_TOPIC: str | None = None
+    SLS_SOURCE: str | None = None
+    UVICORN_INTEGRATION_ENABLED: bool = False
+    UVICORN_ACCESS_LOG: str = "console"
+    # logger 名称 -> 级别，例如 {"app.db": "WARNING", "httpx": "ERROR"}
+    LOGGER_LEVELS: Mapping[str, str] = _EMPTY
+    # HANDLER_OPTION_SECTIONS 中的配置段 -> 参数
+    HANDLER_OPTIONS: Mapping[str, Mapping[str, Any]] = _EMPTY
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() == "true"
+
+
+def _parse_lower(value: Any) -> str:
+    return str(value).lower()
+
+
+def _parse_logger_levels(value: Any) -> Mapping[str, str]:
+    """解析 {"app.db": "WARNING"} 或环境变量中的 "app.db=WARNING,httpx=ERROR"。"""
+    if isinstance(value, str):
+        pairs = [item.split("=", 1) for item in value.split(",") if item.strip()]
+        if any(len(pair) != 2 for pair in pairs):
+            raise ValueError(f"Invalid logger levels: {value!r}. Expected 'name=LEVEL,name=LEVEL'.")
+        value = {name.strip(): level.strip() for name, level in pairs}
+    return MappingProxyType({str(name): str(level).upper() for name, level in value.items()})
+
+
+def _parse_handler_options(value: Any) -> Mapping[str, Mapping[str, Any]]:
+    unknown = set(value) - set(HANDLER_OPTION_SECTIONS)
+    if unknown:
+        raise ValueError(
+            f"Unsupported handler options: {sorted(unknown)!r}. Expected one of {HANDLER_OPTION_SECTIONS}."
+        )
+    return MappingProxyType({section: MappingProxyType(dict(options)) for section, options in value.items()})
+
+
+# 字段名 -> (环境变量, 解析函数)；环境变量为 None 的字段只能通过配置文件或 overrides 设置
+_FIELD_SOURCES: dict[str, tuple[str | None, Callable[[Any], Any]]] = {
+    "APP_NAME": ("LOG_APP_NAME", str),
+    "LOG_LEVEL": ("LOG_LEVEL", str),
+    "CONSOLE_ENABLED": ("LOG_CONSOLE_ENABLED", _parse_bool),
+    "FILE_ENABLED": ("LOG_FILE_ENABLED", _parse_bool),
+    "FILE_PATH": ("LOG_FILE_PATH", str),
+    "FILE_MULTIPROCESS": ("LOG_FILE_MULTIPROCESS", _parse_bool),
+    "AGGREGATOR_SOCKET": ("LOG_AGGREGATOR_SOCKET", str),
+    "JSON_ENABLED": ("LOG_JSON_ENABLED", _parse_bool),
+    "ASYNC_ENABLED": ("LOG_ASYNC_ENABLED", _parse_bool),
+    "TRACE_ID_GENERATOR": ("LOG_TRACE_ID_GENERATOR", str),
+    "TRACE_SAMPLE_RATE": ("LOG_TRACE_SAMPLE_RATE", float),
+    "SLS_ENABLED": ("SLS_ENABLED", _parse_bool),
+    "SLS_ENDPOINT": ("SLS_ENDPOINT", str),
+    "SLS_ACCESS_KEY_ID": ("SLS_ACCESS_KEY_ID", str),
+    "SLS_ACCESS_KEY_SECRET": ("SLS_ACCESS_KEY_SECRET", str),
+    "SLS_PROJECT": ("SLS_PROJECT", str),
+    "SLS_LOGSTORE": ("SLS_LOGSTORE", str),
+    "SLS_TOPIC": ("SLS_TOPIC", str),
+    "SLS_SOURCE": ("SLS_SOURCE", str),
+    "UVICORN_INTEGRATION_ENABLED": ("LOG_UVICORN_INTEGRATION_ENABLED", _parse_bool),
+    "UVICORN_ACCESS_LOG": ("LOG_UVICORN_ACCESS_LOG", _parse_lower),
+    "LOGGER_LEVELS": ("LOG_LOGGER_LEVELS", _parse_logger_levels),
+    "HANDLER_OPTIONS": (None, _parse_handler_options),
+}
+
+# 配置文件和 overrides 中的键：字段名的小写形式，另外 loggers/handlers 分别对应 LOGGER_LEVELS/HANDLER_OPTIONS
+_KEY_ALIASES = {"loggers": "LOGGER_LEVELS", "handlers": "HANDLER_OPTIONS"}
+
+
+def _normalize(source: Mapping[str, Any], origin: str) -> dict[str, Any]:
+    """把配置文件或 overrides 中的键转换为字段名，并用对应的解析函数校验取值。"""
+    values = {}
+    for key, value in source.items():
+        field = _KEY_ALIASES.get(key, key.upper())
+        if field not in _FIELD_SOURCES:
+            raise ValueError(f"Unsupported setting in {origin}: {key!r}.")
+        values[field] = _FIELD_SOURCES[field][1](value)
+    return values
+
+
+def load_config_file(path: str | os.PathLike) -> dict[str, Any]:
     """
-    Encapsulates all configuration settings for the logger.
-    Settings are read from environment variables when accessed, with sensible defaults.
+    读取 TOML 配置文件。文件中有 [tool.yai_nexus_logger] 段（pyproject.toml）时只读取该段，
+    否则读取整个文件；pyproject.toml 中没有该段时返回空配置。
     """
+    if not TOML_AVAILABLE:
+        raise ImportError(
+            "tomli is not installed. Please run 'pip install tomli' to read TOML config on Python < 3.11."
+        )
+    with open(path, "rb") as f:
+        document = tomllib.load(f)
+
+    section: Any = document
+    for key in PYPROJECT_SECTION:
+        section = section.get(key) if isinstance(section, dict) else None
+    if section is not None:
+        return section
+    if os.path.basename(os.fspath(path)) == "pyproject.toml":
+        return {}
+    return document
+
+
+def resolve_settings(
+    path: str | os.PathLike | None = None,
+    overrides: Mapping[str, Any] | None = None,
+    environ: Mapping[str, str] | None = None,
+) -> SettingsSnapshot:
+    """
+    按优先级从低到高合并配置：默认值 < 配置文件 < 环境变量 < overrides。
 
-    @property
-    def APP_NAME(self) -> str:
-        return os.getenv("LOG_APP_NAME", "app")
-
-    @property
-    def LOG_LEVEL(self) -> str:
-        return os.getenv("LOG_LEVEL", "INFO")
-
-    @property
-    def CONSOLE_ENABLED(self) -> bool:
-        return os.getenv("LOG_CONSOLE_ENABLED", "true").lower() == "true"
-
-    @property
-    def FILE_ENABLED(self) -> bool:
-        return os.getenv("LOG_FILE_ENABLED", "false").lower() == "true"
-
-    @property
-    def FILE_PATH(self) -> str:
-        return os.getenv("LOG_FILE_PATH", f"logs/{self.APP_NAME}.log")
-
-    @property
-    def SLS_ENABLED(self) -> bool:
-        return os.getenv("SLS_ENABLED", "false").lower() == "true"
+    Args:
+        path: TOML/pyproject.toml 配置文件路径；为 None 时使用环境变量 LOG_CONFIG_FILE 指定的文件（如果有）。
+        overrides: 显式指定的配置，键为字段名的小写形式（如 "app_name"），优先级最高。
+        environ: 读取的环境变量，默认为 os.environ。
+    """
+    environ = os.environ if environ is None else environ
+    values: dict[str, Any] = {}
 
-    @property
-    def SLS_ENDPOINT(self) -> str | None:
-        return os.getenv("SLS_ENDPOINT")
+    path = path if path is not None else environ.get(CONFIG_FILE_ENV)
+    if path:
+        values.update(_normalize(load_config_file(path), os.fspath(path)))
 
-    @property
-    def SLS_ACCESS_KEY_ID(self) -> str | None:
-        return os.getenv("SLS_ACCESS_KEY_ID")
+    for field, (env_name, parse) in _FIELD_SOURCES.items():
+        if env_name is not None:
+            raw = environ.get(env_name)
+            if raw is not None:
+                values[field] = parse(raw)
 
-    @property
-    def SLS_ACCESS_KEY_SECRET(self) -> str | None:
-        return os.getenv("SLS_ACCESS_KEY_SECRET")
+    if overrides:
+        values.update(_normalize(overrides, "overrides"))
 
-    @property
-    def SLS_PROJECT(self) -> str | None:
-        return os.getenv("SLS_PROJECT")
+    snapshot = SettingsSnapshot(**values)
+    if snapshot.FILE_PATH is None:
+        snapshot = snapshot._replace(FILE_PATH=f"logs/{snapshot.APP_NAME}.log")
+    return snapshot
 
-    @property
-    def SLS_LOGSTORE(self) -> str | None:
-        return os.getenv("SLS_LOGSTORE")
 
-    @property
-    def SLS_TOPIC(self) -> str | None:
-        return os.getenv("SLS_TOPIC")
+class Settings:
+    """
+    当前生效的配置。
 
-    @property
-    def SLS_SOURCE(self) -> str | None:
-        return os.getenv("SLS_SOURCE")
+    配置在导入时解析一次，之后读取 `settings.APP_NAME` 等字段只是普通的属性访问，
+    不会再读取环境变量；修改环境变量或配置文件后需要调用 `settings.reload()`。
+    字段是只读的，`generation` 在每次 reload 后递增，供依赖配置的缓存判断是否失效。
+    """
 
-    @property
-    def UVICORN_INTEGRATION_ENABLED(self) -> bool:
-        return os.getenv("LOG_UVICORN_INTEGRATION_ENABLED", "false").lower() == "true"
+    def __init__(self):
+        object.__setattr__(self, "_path", None)
+        object.__setattr__(self, "_overrides", None)
+        object.__setattr__(self, "generation", 0)
+        self.reload()
+
+    def resolve(
+        self,
+        path: str | os.PathLike | None = None,
+        overrides: Mapping[str, Any] | None = None,
+    ) -> SettingsSnapshot:
+        """
+        按 reload 的规则解析配置并返回快照，但不替换当前快照，也不记住 path/overrides。
+        """
+        return resolve_settings(
+            path if path is not None else self._path,
+            overrides if overrides is not None else self._overrides,
+        )
+
+    def reload(
+        self,
+        path: str | os.PathLike | None = None,
+        overrides: Mapping[str, Any] | None = None,
+    ) -> SettingsSnapshot:
+        """
+        重新解析配置并替换当前快照。
+
+        传入 path/overrides 时会记住它们，之后不带参数的 reload() 继续使用；
+        不带参数时沿用上次的配置文件和 overrides，并重新读取环境变量。
+        """
+        if path is not None:
+            object.__setattr__(self, "_path", path)
+        if overrides is not None:
+            object.__setattr__(self, "_overrides", dict(overrides))
+        snapshot = resolve_settings(self._path, self._overrides)
+        # 字段直接写入实例字典，读取时与普通属性一样快
+        self.__dict__.update(snapshot._asdict())
+        object.__setattr__(self, "snapshot", snapshot)
+        object.__setattr__(self, "generation", self.generation + 1)
+        return snapshot
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Settings are read-only; use settings.reload() to change {name!r}.")
 
 
 # Create a single instance to be used throughout the application
@@ -0,0 +1,199 @@
+"""通过 Unix domain socket 把日志批量发送给集中的聚合进程。"""
+
+import contextlib
+import logging
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import traceback
+import weakref
+
+from .internal_json_formatter import get_json_dumps
+from .internal_record_codec import encode_record, join_records
+
+# 每个批次前的长度前缀：4 字节无符号整数（网络字节序）
+FRAME_HEADER = struct.Struct("!I")
+
+# 单个批次的最大字节数，超过时聚合端认为数据损坏并断开连接
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def encode_batch(records: list[bytes]) -> bytes:
+    """把已编码的日志拼接为一个带长度前缀的批次。"""
+    payload = join_records(records)
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class SocketShipperHandler(logging.Handler):
+    """
+    把日志编码后按批次发送到聚合进程的 handler。
+
+    每条日志在调用线程中编码一次（合并 msg/args、捕获 trace_id 和 extra），放入待发送列表；
+    达到 batch_size 条或距第一条未发送的日志超过 flush_interval_ms 时，由后台线程拼接成一个
+    带长度前缀的批次，用一次 sendall 发出。发送只在后台线程（以及显式的 flush/close）中进行，
+    并受 send_timeout 限制，聚合进程卡住时不会阻塞产生日志的线程。
+
+    聚合进程不可用时日志保留在内存中，下次发送时重连；待发送日志超过 max_pending 条时
+    丢弃最早的日志并计入 dropped。fork 出的子进程会清空从父进程继承的待发送日志，
+    并建立自己的连接和后台线程。
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        batch_size: int = 256,
+        flush_interval_ms: int = 100,
+        max_pending: int = 10000,
+        reconnect_interval: float = 1.0,
+        send_timeout: float = 1.0,
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive.")
+        if max_pending < batch_size:
+            raise ValueError("max_pending must not be smaller than batch_size.")
+        super().__init__()
+        self.socket_path = socket_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.reconnect_interval = reconnect_interval
+        self.send_timeout = send_timeout
+        self.dropped = 0
+        self._dumps = get_json_dumps()
+        self._start_flusher()
+        _live_handlers.add(self)
+
+    def _start_flusher(self) -> None:
+        """初始化连接和待发送状态，并启动后台发送线程（构造时以及 fork 后的子进程中调用）。"""
+        self._pending: list[bytes] = []
+        self._flush_deadline = 0.0
+        # 锁顺序：handler 锁 -> _send_lock -> _pending_lock；后台线程不会获取 handler 锁
+        self._pending_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._next_connect = 0.0
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="yai-nexus-logger-shipper", daemon=True
+        )
+        self._flusher.start()
+
+    def _after_fork_in_child(self) -> None:
+        # 子进程不能重发父进程的日志，也不能复用父进程的连接，否则多个进程的批次会在同一个连接上交错；
+        # 父进程的后台线程不会出现在子进程中，需要重新启动
+        if self._stop_event.is_set():
+            return
+        self._start_flusher()
+
+    def _encode(self, record: logging.LogRecord) -> bytes:
+        return encode_record(record, self._dumps)
+
+    def _connect(self) -> socket.socket | None:
+        if self._sock is not None:
+            return self._sock
+        now = time.monotonic()
+        if now < self._next_connect:
+            return None
+        self._next_connect = now + self.reconnect_interval
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.send_timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            return None
+        self._sock = sock
+        return sock
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            with contextlib.suppress(OSError):
+                self._sock.close()
+            self._sock = None
+
+    def _trim_pending(self) -> None:
+        """丢弃超出 max_pending 的最早日志，调用方需持有 _pending_lock。"""
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+
+    def _send_pending(self) -> None:
+        """把待发送的日志作为一个批次发出；失败时整批放回，重连后重发。"""
+        with self._send_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            sock = self._connect()
+            if sock is not None:
+                try:
+                    sock.sendall(encode_batch(batch))
+                    return
+                except OSError:
+                    # 包括发送超时：连接上可能残留半个批次，断开后整批重发
+                    self._disconnect()
+                    if logging.raiseExceptions:
+                        traceback.print_exc(file=sys.stderr)
+
+            with self._pending_lock:
+                self._pending[:0] = batch
+                self._trim_pending()
+                self._flush_deadline = time.monotonic() + self.flush_interval
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            data = self._encode(record)
+            with self._pending_lock:
+                if not self._pending:
+                    self._flush_deadline = time.monotonic() + self.flush_interval
+                self._pending.append(data)
+                self._trim_pending()
+                full = len(self._pending) >= self.batch_size
+            if full:
+                self._wake.set()
+        except Exception:
+            self.handleError(record)
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._pending_lock:
+                due = len(self._pending) >= self.batch_size or (
+                    self._pending and time.monotonic() >= self._flush_deadline
+                )
+            if due:
+                self._send_pending()
+
+    def flush(self) -> None:
+        self._send_pending()
+
+    def close(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        if self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self._next_connect = 0.0
+        self._send_pending()
+        with self._send_lock:
+            self._disconnect()
+        _live_handlers.discard(self)
+        super().close()
+
+
+# 仍在使用的 handler，fork 后在子进程中重置
+_live_handlers: weakref.WeakSet[SocketShipperHandler] = weakref.WeakSet()
+
+
+def _reinit_handlers_after_fork() -> None:
+    for handler in list(_live_handlers):
+        handler._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_handlers_after_fork)
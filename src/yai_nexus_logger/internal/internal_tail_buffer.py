@@ -0,0 +1,144 @@
+"""按链路缓冲的尾部采样：只有出错的请求才输出完整的调试日志。"""
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from yai_nexus_logger.trace_context import trace_context
+
+from .internal_utils import NO_TRACE_ID, inject_trace_id, resolve_level
+
+
+class TailBufferHandler(logging.Handler):
+    """
+    把带 trace_id 且低于 buffer_level 的日志按 trace_id 暂存在内存中：
+
+    - 同一链路出现 flush_level（默认 ERROR）及以上的日志时，先按原始顺序写出该链路缓冲的日志，再写出这条日志。
+    - 链路正常结束（`trace_context.reset_trace_id` 离开该 trace_id，或创建该链路的根 span 退出）时，丢弃该链路缓冲的日志。
+    - 所有链路共享 max_records 条的总容量，超出时按 LRU 淘汰最久没有新日志的整条链路；
+      单条链路最多保留 max_records_per_trace 条，超出时丢弃该链路最早的日志。
+
+    没有 trace_id 的日志、buffer_level 及以上的日志，以及来自 exempt_loggers（含其子 logger）的日志直接写出。
+    访问日志（"uvicorn.access"、"<app>.access"）是 INFO 级别且带 trace_id，应放在 exempt_loggers 中，
+    否则正常结束的请求连访问日志也会被丢弃。
+    暂存前会在调用线程中合并 msg/args 并捕获 trace_id，与异步分发的处理方式一致。
+    """
+
+    def __init__(
+        self,
+        handlers: list[logging.Handler],
+        buffer_level: int | str = logging.WARNING,
+        flush_level: int | str = logging.ERROR,
+        max_records: int = 10000,
+        max_records_per_trace: int = 1000,
+        exempt_loggers: Iterable[str] = (),
+    ):
+        if max_records <= 0 or max_records_per_trace <= 0:
+            raise ValueError("max_records and max_records_per_trace must be positive.")
+        super().__init__()
+        self.handlers = list(handlers)
+        self.buffer_level = resolve_level(buffer_level)
+        self.flush_level = resolve_level(flush_level)
+        self.max_records = max_records
+        self.max_records_per_trace = max_records_per_trace
+        self.exempt_loggers = frozenset(exempt_loggers)
+        self._exempt_prefixes = tuple(f"{name}." for name in self.exempt_loggers)
+        self._buffers: OrderedDict[str, list[logging.LogRecord]] = OrderedDict()
+        self._buffered = 0
+        self._buffer_lock = threading.Lock()
+        self.flushed = 0
+        self.discarded = 0
+        self.evicted = 0
+        trace_context.add_trace_end_hook(self._on_trace_end)
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # 不持有 handler 锁，缓冲区由 _buffer_lock 保护，写出由目标 handler 自己加锁
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def _dispatch(self, record: logging.LogRecord) -> None:
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            trace_id = inject_trace_id(record)
+            if trace_id == NO_TRACE_ID:
+                self._dispatch(record)
+                return
+
+            if record.levelno < self.buffer_level and not self._is_exempt(record.name):
+                record.msg = record.getMessage()
+                record.args = None
+                self._buffer(trace_id, record)
+                return
+
+            if record.levelno >= self.flush_level:
+                with self._buffer_lock:
+                    pending = self._buffers.pop(trace_id, None)
+                    if pending:
+                        self._buffered -= len(pending)
+                        self.flushed += len(pending)
+                for buffered in pending or ():
+                    self._dispatch(buffered)
+            self._dispatch(record)
+        except Exception:
+            self.handleError(record)
+
+    def _is_exempt(self, name: str) -> bool:
+        return name in self.exempt_loggers or name.startswith(self._exempt_prefixes)
+
+    def _buffer(self, trace_id: str, record: logging.LogRecord) -> None:
+        with self._buffer_lock:
+            buffers = self._buffers
+            pending = buffers.get(trace_id)
+            if pending is None:
+                pending = buffers[trace_id] = []
+            else:
+                buffers.move_to_end(trace_id)
+
+            pending.append(record)
+            self._buffered += 1
+            if len(pending) > self.max_records_per_trace:
+                del pending[0]
+                self._buffered -= 1
+                self.discarded += 1
+
+            while self._buffered > self.max_records:
+                _, oldest = buffers.popitem(last=False)
+                self._buffered -= len(oldest)
+                self.evicted += len(oldest)
+
+    def _on_trace_end(self, trace_id: str) -> None:
+        with self._buffer_lock:
+            pending = self._buffers.pop(trace_id, None)
+            if pending:
+                self._buffered -= len(pending)
+                self.discarded += len(pending)
+
+    def get_stats(self) -> dict[str, int]:
+        """返回缓冲统计：当前缓冲的链路数和日志数，以及累计写出、丢弃、淘汰的日志数。"""
+        with self._buffer_lock:
+            return {
+                "traces": len(self._buffers),
+                "buffered": self._buffered,
+                "flushed": self.flushed,
+                "discarded": self.discarded,
+                "evicted": self.evicted,
+            }
+
+    def flush(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self) -> None:
+        """停止接收链路结束通知并清空缓冲区，目标 handler 由其创建者负责关闭。"""
+        trace_context.remove_trace_end_hook(self._on_trace_end)
+        with self._buffer_lock:
+            self._buffers.clear()
+            self._buffered = 0
+        super().close()
@@ -2,33 +2,119 @@
 
 import logging
 
+from yai_nexus_logger.trace_context import trace_context
+
+# 上下文中没有 trace_id 时使用的占位值
+NO_TRACE_ID = "No-Trace-ID"
+
+# formatter 渲染缓存在 LogRecord 上使用的属性名
+RENDER_CACHE_ATTR = "_yai_render_cache"
+
+# `trace_context.bind()` 绑定的字段在 LogRecord 上使用的属性名
+BINDING_ATTR = "_yai_binding"
+
+# 格式化过程中才会出现的标准属性，样本 record 上没有，需要手动补充
+_FORMATTING_ATTRS = frozenset({'message', 'asctime', 'getMessage', 'exc_text', 'stack_info', 'taskName'})
+
+# 我们自定义的属性
+_CUSTOM_ATTRS = frozenset({'trace_id', 'span_id', 'parent_span_id', RENDER_CACHE_ATTR, BINDING_ATTR})
+
+
+def inject_trace_id(record: logging.LogRecord) -> str:
+    """
+    为 record 注入 trace_id、span_id、parent_span_id 和绑定的字段（Binding 节点）并返回 trace_id。
+
+    如果 record 上已经带有 trace_id（例如在异步分发前于调用线程中捕获），则保留原值，
+    否则从当前上下文读取。
+    """
+    record_dict = record.__dict__
+    trace_id = record_dict.get("trace_id")
+    if trace_id is None:
+        context = trace_context.get_span_context()
+        if context is None:
+            trace_id = NO_TRACE_ID
+            record_dict["span_id"] = record_dict["parent_span_id"] = None
+        else:
+            trace_id = context.trace_id
+            record_dict["span_id"] = context.span_id
+            record_dict["parent_span_id"] = context.parent_span_id
+        record_dict["trace_id"] = trace_id
+        record_dict[BINDING_ATTR] = trace_context.get_binding()
+    return trace_id
+
+
+def resolve_level(level: int | str) -> int:
+    """把 "INFO"/"warning" 等级别名称或数值统一转换为数值级别。"""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(level.upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown logging level: {level!r}")
+    return value
+
+
+def _sample_record_attrs() -> frozenset[str]:
+    """用当前的 record factory 生成一条样本日志，取其属性名作为基线。"""
+    try:
+        record = logging.getLogRecordFactory()("", logging.INFO, "", 0, "", (), None)
+    except Exception:
+        # 自定义 factory 无法用标准参数构造时，退回标准 LogRecord
+        record = logging.LogRecord("", logging.INFO, "", 0, "", (), None)
+    return frozenset(record.__dict__)
+
+
+_baseline_attrs: frozenset[str] = frozenset()
+_baseline_size = -1
+_reserved_attrs: frozenset[str] = frozenset()
+
+
+def refresh_record_baseline() -> None:
+    """
+    重新计算 LogRecord 的基线属性集合。
+
+    基线在导入时计算一次，会包含已安装的自定义 record factory 添加的属性；
+    如果在导入之后才调用 `logging.setLogRecordFactory`，需要调用此函数刷新。
+    """
+    global _baseline_attrs, _baseline_size, _reserved_attrs
+    _baseline_attrs = _sample_record_attrs()
+    _baseline_size = len(_baseline_attrs)
+    _reserved_attrs = _baseline_attrs | _FORMATTING_ATTRS | _CUSTOM_ATTRS
+
+
+refresh_record_baseline()
+
 
 def extract_extra_fields(record: logging.LogRecord) -> dict:
     """
     从 LogRecord 中提取 extra 字段。
     排除标准的 logging 属性和我们自定义的属性。
-    
+
+    属性数量与基线一致时说明没有 extra，直接返回；
+    否则通过集合差集找出 extra 字段，并保持它们在 record 中的原始顺序。
+
     Args:
         record: logging.LogRecord 实例
-        
+
     Returns:
         dict: 包含所有 extra 字段的字典
     """
-    # 标准 logging 属性
-    standard_attrs = {
-        'name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 'filename',
-        'module', 'lineno', 'funcName', 'created', 'msecs', 'relativeCreated',
-        'thread', 'threadName', 'processName', 'process', 'getMessage', 'exc_info',
-        'exc_text', 'stack_info', 'message', 'asctime', 'taskName'
-    }
-    
-    # 我们自定义的属性
-    custom_attrs = {'trace_id'}
-    
-    # 提取 extra 字段
-    extra_fields = {}
-    for key, value in record.__dict__.items():
-        if key not in standard_attrs and key not in custom_attrs:
-            extra_fields[key] = value
-    
-    return extra_fields
\ No newline at end of file
+    record_dict = record.__dict__
+    if len(record_dict) == _baseline_size:
+        return {}
+
+    extra_keys = record_dict.keys() - _reserved_attrs
+    if not extra_keys:
+        return {}
+
+    return {key: value for key, value in record_dict.items() if key in extra_keys}
+
+
+def merge_bound_fields(record: logging.LogRecord, extra_fields: dict) -> dict:
+    """
+    把 record 上捕获的绑定字段与 extra 字段合并，extra 覆盖同名的绑定字段。
+    需要在 inject_trace_id 之后调用；没有绑定字段时直接返回 extra_fields。
+    """
+    binding = record.__dict__.get(BINDING_ATTR)
+    if binding is None:
+        return extra_fields
+    return {**binding.fields, **extra_fields}
@@ -0,0 +1,187 @@
+# src/yai_nexus_logger/middleware.py
+
+"""
+纯 ASGI 的 trace_id 中间件和访问日志中间件。
+
+不依赖 Starlette 的 BaseHTTPMiddleware，不创建 Request 对象，也不把请求头转换为 dict，
+只在 ASGI scope 的原始请求头中查找配置的 header。
+"""
+
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable, Iterable, MutableMapping, Sequence
+from typing import Any
+
+from .internal.internal_settings import settings
+from .trace_context import SpanContext, trace_context
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+# 默认按顺序从这些请求头读取 trace_id
+DEFAULT_REQUEST_HEADERS = ("x-trace-id", "x-request-id", "traceparent")
+
+
+class TraceIDMiddleware:
+    """
+    为每个请求设置 trace_id 的 ASGI 中间件，可直接用于 FastAPI/Starlette：
+
+        app.add_middleware(TraceIDMiddleware)
+
+    - 按 request_headers 的顺序读取请求头中的 trace_id；traceparent 会还原完整的 SpanContext：
+      沿用上游的 trace-id 和 sampled 标志，上游的 parent-id 作为 parent_span_id。
+    - 请求头中没有合法的 trace_id 时，用 `trace_context.generate_trace_id()` 生成一个新的。
+    - 请求处理期间设置 trace_context，结束后用 token 恢复，不会泄漏到其他请求。
+    - response_header 不为 None 时，在响应头中返回 trace_id。
+
+    请求头中的值只接受字母、数字和 `._:-`，且不超过 max_length 个字符，
+    避免把任意客户端输入写入日志。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        request_headers: Sequence[str] = DEFAULT_REQUEST_HEADERS,
+        response_header: str | None = "x-trace-id",
+        max_length: int = 128,
+    ):
+        self.app = app
+        # ASGI 规范保证请求头名称为小写字节串，预先编码后逐个比较即可
+        self._header_ranks: dict[bytes, int] = {}
+        for rank, name in enumerate(request_headers):
+            self._header_ranks.setdefault(name.lower().encode("latin-1"), rank)
+        self._response_header = response_header.lower().encode("latin-1") if response_header else None
+        self._valid_id = re.compile(rb"^[A-Za-z0-9._:\-]{1,%d}$" % max_length)
+
+    def _parse(self, name: bytes, value: bytes) -> SpanContext | None:
+        if name == b"traceparent":
+            return trace_context.parse_traceparent(value.decode("latin-1"))
+        return SpanContext(value.decode("latin-1")) if self._valid_id.match(value) else None
+
+    def _extract_span_context(self, headers) -> SpanContext | None:
+        ranks = self._header_ranks
+        best: SpanContext | None = None
+        best_rank = len(ranks)
+        for name, value in headers:
+            rank = ranks.get(name)
+            if rank is None or rank >= best_rank:
+                continue
+            context = self._parse(name, value)
+            if context is not None:
+                best, best_rank = context, rank
+                if rank == 0:
+                    break
+        return best
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        scope_type = scope["type"]
+        if scope_type != "http" and scope_type != "websocket":
+            await self.app(scope, receive, send)
+            return
+
+        context = self._extract_span_context(scope.get("headers", ()))
+        if context is None:
+            context = SpanContext(trace_context.generate_trace_id())
+        trace_id = context.trace_id
+        token = trace_context.set_span_context(context)
+        try:
+            if self._response_header is None or scope_type != "http":
+                await self.app(scope, receive, send)
+                return
+
+            header = (self._response_header, trace_id.encode("latin-1"))
+
+            async def send_with_trace_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", ()), header]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            trace_context.reset_trace_id(token)
+
+
+class AccessLogMiddleware:
+    """
+    结构化访问日志的 ASGI 中间件，每个 HTTP 请求结束后记录一条日志：
+
+        app.add_middleware(AccessLogMiddleware)
+        app.add_middleware(TraceIDMiddleware)  # 后添加的在外层，访问日志才能带上 trace_id
+
+    日志消息为 "GET /items/{item_id} 200 3.2ms"，同时以 extra 字段记录
+    method、route（路由模板，未匹配路由时为原始路径）、path、status、bytes、duration_ms 和 client。
+    日志通过普通的 logger 输出，与业务日志共用同一条 handler 管道（异步分发、文件、SLS 等），
+    每条只格式化一次。使用此中间件时应关闭 uvicorn 自带的访问日志（`--no-access-log`）。
+
+    应用抛出异常时以 status=500 和 ERROR 级别记录，异常本身继续向外抛出。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        logger_name: str | None = None,
+        level: int = logging.INFO,
+        exclude_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.logger = logging.getLogger(logger_name or f"{settings.APP_NAME}.access")
+        self.level = level
+        self._exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.logger.isEnabledFor(self.level):
+            await self.app(scope, receive, send)
+            return
+        path = scope.get("path", "")
+        if path in self._exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+
+        async def send_with_stats(message: Message) -> None:
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                response["status"] = message["status"]
+            elif message_type == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        level = self.level
+        try:
+            await self.app(scope, receive, send_with_stats)
+        except Exception:
+            response["status"] = 500
+            level = logging.ERROR
+            raise
+        finally:
+            self._log(scope, path, level, response["status"], response["bytes"], time.perf_counter() - start)
+
+    def _log(self, scope: Scope, path: str, level: int, status: int, size: int, elapsed: float) -> None:
+        # Starlette/FastAPI 在路由匹配后把 route 写入同一个 scope，按模板聚合不会因路径参数而发散
+        route = getattr(scope.get("route"), "path", None) or path
+        method = scope.get("method", "")
+        duration_ms = round(elapsed * 1000, 3)
+        client = scope.get("client")
+        self.logger.log(
+            level,
+            "%s %s %d %.1fms",
+            method,
+            route,
+            status,
+            duration_ms,
+            extra={
+                "method": method,
+                "route": route,
+                "path": path,
+                "status": status,
+                "bytes": size,
+                "duration_ms": duration_ms,
+                "client": f"{client[0]}:{client[1]}" if client else None,
+            },
+        )
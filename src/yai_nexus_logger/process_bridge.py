@@ -0,0 +1,181 @@
+# src/yai_nexus_logger/process_bridge.py
+
+"""
+ProcessPoolExecutor 子进程的日志桥接。
+
+子进程不会继承父进程中 `init_logging` 配置的 handler，也拿不到父进程上下文中的 trace_id、span 和绑定的字段。
+`ProcessLogBridge` 在子进程中安装一个轻量的转发 handler，把日志编码为紧凑的批次放入
+进程间队列，由父进程的后台线程取出后交给已配置的 handler 处理。
+"""
+
+import functools
+import logging
+import multiprocessing
+import sys
+import threading
+import traceback
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from typing import Any
+
+from .internal.internal_json_formatter import get_json_dumps
+from .internal.internal_record_codec import decode_records, encode_record, join_records
+from .internal.internal_settings import settings
+from .trace_context import Captured, _capture, _run_in_span_context
+
+# 通知父进程后台线程退出的哨兵对象
+_SENTINEL = None
+
+# 子进程中安装的转发 handler，任务结束时用它把剩余日志发回父进程
+_worker_handler: "_QueueForwardingHandler | None" = None
+
+
+class _QueueForwardingHandler(logging.Handler):
+    """
+    子进程中的转发 handler：每条日志编码一次，攒够 batch_size 条、超过 flush_interval_ms
+    或任务结束时，以一个 bytes 批次放入队列，降低 pickle 和队列开销。
+    """
+
+    def __init__(self, log_queue, batch_size: int, flush_interval_ms: int):
+        super().__init__()
+        self.queue = log_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._dumps = get_json_dumps()
+        self._pending: list[bytes] = []
+        self._stop_event = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="yai-nexus-logger-bridge-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _send_pending(self) -> None:
+        """调用方需持有 handler 锁。"""
+        if self._pending:
+            self.queue.put(join_records(self._pending))
+            self._pending = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._pending.append(encode_record(record, self._dumps))
+            if len(self._pending) >= self.batch_size:
+                self._send_pending()
+        except Exception:
+            self.handleError(record)
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._send_pending()
+
+
+def _initialize_worker(log_queue, logger_name: str, level: int, batch_size: int, flush_interval_ms: int) -> None:
+    """子进程初始化函数：用转发 handler 替换 logger 上的全部 handler。"""
+    global _worker_handler
+    _worker_handler = _QueueForwardingHandler(log_queue, batch_size, flush_interval_ms)
+    logger = logging.getLogger(logger_name)
+    # fork 出的子进程会继承父进程的 handler（包括无人消费的异步队列），必须全部替换
+    logger.handlers = [_worker_handler]
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def _call_in_captured_context(captured: Captured, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """在子进程中以父进程提交任务时的 SpanContext 和绑定字段执行 fn，结束后把日志发回父进程。"""
+    try:
+        return _run_in_span_context(captured, fn, *args, **kwargs)
+    finally:
+        if _worker_handler is not None:
+            _worker_handler.flush()
+
+
+class ProcessLogBridge:
+    """
+    把 ProcessPoolExecutor 子进程中的日志转发回父进程。
+
+    用法：
+        with ProcessLogBridge() as bridge:
+            with ProcessPoolExecutor(**bridge.executor_kwargs()) as pool:
+                future = bridge.submit(pool, cpu_bound_task, data)
+
+    - executor_kwargs() 提供 initializer/initargs，子进程启动时安装转发 handler。
+    - submit()/wrap() 在提交任务时捕获当前的 SpanContext 和 bind() 绑定的字段，
+      子进程中的日志会带上同样的 trace_id、span_id 和绑定字段。
+    - 父进程的后台线程按批次取出日志，按 logger 名称交给父进程中已配置的 handler。
+    """
+
+    def __init__(
+        self,
+        logger_name: str | None = None,
+        level: int | None = None,
+        batch_size: int = 64,
+        flush_interval_ms: int = 100,
+        mp_context: multiprocessing.context.BaseContext | None = None,
+    ):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive.")
+        self.logger_name = logger_name or settings.APP_NAME
+        logger = logging.getLogger(self.logger_name)
+        self.level = level if level is not None else logger.getEffectiveLevel()
+        self.batch_size = batch_size
+        self.flush_interval_ms = flush_interval_ms
+        self._mp_context = mp_context or multiprocessing.get_context()
+        self.queue = self._mp_context.Queue()
+        self._drain_thread: threading.Thread | None = None
+
+    def start(self) -> "ProcessLogBridge":
+        """启动父进程中的后台线程，开始接收子进程的日志。"""
+        if self._drain_thread is None:
+            self._drain_thread = threading.Thread(
+                target=self._drain_loop, name="yai-nexus-logger-process-bridge", daemon=True
+            )
+            self._drain_thread.start()
+        return self
+
+    def executor_kwargs(self) -> dict[str, Any]:
+        """返回创建 ProcessPoolExecutor 所需的 initializer、initargs 和 mp_context。"""
+        return {
+            "mp_context": self._mp_context,
+            "initializer": _initialize_worker,
+            "initargs": (self.queue, self.logger_name, self.level, self.batch_size, self.flush_interval_ms),
+        }
+
+    def wrap(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """返回一个可 pickle 的包装函数，它会在子进程中恢复当前的 SpanContext 和绑定字段。"""
+        return functools.partial(_call_in_captured_context, _capture(), fn)
+
+    def submit(self, executor: Executor, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """等价于 executor.submit(fn, ...)，并携带当前的 SpanContext 和绑定字段。"""
+        return executor.submit(self.wrap(fn), *args, **kwargs)
+
+    def _drain_loop(self) -> None:
+        q = self.queue
+        while True:
+            payload = q.get()
+            if payload is _SENTINEL:
+                return
+            try:
+                for record in decode_records(payload):
+                    logging.getLogger(record.name).handle(record)
+            except Exception:
+                # 单个批次处理失败不能让后台线程退出
+                if logging.raiseExceptions:
+                    traceback.print_exc(file=sys.stderr)
+
+    def close(self) -> None:
+        """处理完队列中已有的日志后停止后台线程。应在进程池关闭之后调用。"""
+        if self._drain_thread is not None:
+            self.queue.put(_SENTINEL)
+            self._drain_thread.join()
+            self._drain_thread = None
+        self.queue.close()
+        self.queue.join_thread()
+
+    def __enter__(self) -> "ProcessLogBridge":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
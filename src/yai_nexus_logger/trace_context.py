@@ -1,41 +1,182 @@
 # src/yai_nexus_logger/trace_context.py
 
-import uuid
+import asyncio
+import functools
+import logging
+import re
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Mapping
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
 from contextvars import ContextVar, Token
-from typing import Optional
+from itertools import islice
+from types import MappingProxyType
+from typing import Any, NamedTuple, TypeVar
 
-# 使用 ContextVar 来存储 trace_id，确保在异步代码中上下文安全
-# The context variable for storing the trace ID.
+from .internal.internal_id_generators import get_id_generator, hex64_id
+
+
+class SpanContext(NamedTuple):
+    """
+    当前上下文的追踪信息，不可变。
+
+    trace_id 标识整条请求链路，span_id 标识链路中的一个操作，parent_span_id 指向创建它的操作；
+    sampled 对应 W3C traceparent 中的 sampled 标志，为 False 时表示上游决定不采样这条链路。
+    """
+
+    trace_id: str
+    span_id: str | None = None
+    parent_span_id: str | None = None
+    sampled: bool = True
+
+
+class Binding:
+    """
+    通过 `trace_context.bind()` 绑定到上下文的字段，不可变。
+
+    每次 bind 创建一个指向父节点的新节点，父子上下文共享父节点，不复制父级字段。
+    合并后的字段（子节点覆盖父节点的同名字段）和文本日志使用的后缀（" | k=v ..."）
+    在首次使用时计算并缓存在节点上，之后每条日志直接复用。
+    """
+
+    __slots__ = ("parent", "own", "_fields", "_suffix")
+
+    def __init__(self, parent: "Binding | None", own: dict[str, Any]):
+        self.parent = parent
+        self.own = own
+        self._fields: Mapping[str, Any] | None = None
+        self._suffix: str | None = None
+
+    def __reduce__(self):
+        # 缓存的只读视图（MappingProxyType）无法 pickle，只传递父节点和本节点的字段，接收端按需重新计算
+        return Binding, (self.parent, self.own)
+
+    @property
+    def fields(self) -> Mapping[str, Any]:
+        """合并了所有父节点之后的只读字段。"""
+        fields = self._fields
+        if fields is None:
+            merged = dict(self.parent.fields) if self.parent is not None else {}
+            merged.update(self.own)
+            fields = self._fields = MappingProxyType(merged)
+        return fields
+
+    @property
+    def suffix(self) -> str:
+        """预渲染的文本后缀，格式与 extra 字段一致。"""
+        suffix = self._suffix
+        if suffix is None:
+            suffix = self._suffix = "".join(f" | {key}={value}" for key, value in self.fields.items())
+        return suffix
+
+
+_EMPTY_FIELDS: Mapping[str, Any] = MappingProxyType({})
+
+# LogRecord 自身的属性以及日志系统写入 record 的字段，不能作为绑定字段，否则会覆盖 record 的属性
+_RESERVED_FIELDS = frozenset(logging.LogRecord("", logging.INFO, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "trace_id",
+    "span_id",
+    "parent_span_id",
+}
+
+# 使用 ContextVar 来存储追踪信息，确保在异步代码中上下文安全
+# trace_id、span_id、parent_span_id 和 sampled 放在同一个不可变的 SpanContext 中，一次 get 即可全部读取。
 # 使用 None 作为默认值，表示当前上下文中没有设置 trace_id。
-_trace_id_context: ContextVar[Optional[str]] = ContextVar("trace_id_context", default=None)
+_span_context: ContextVar[SpanContext | None] = ContextVar("span_context", default=None)
+
+# bind() 绑定的字段，与 SpanContext 分开存放，互不影响
+_binding: ContextVar[Binding | None] = ContextVar("binding", default=None)
+
+# W3C traceparent: version-trace_id-parent_id-flags
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_HEX32 = re.compile(r"^[0-9a-f]{32}$")
+
+T = TypeVar("T")
+
+
+# 提交任务时捕获的上下文：(SpanContext, Binding)
+Captured = tuple[SpanContext | None, Binding | None]
+
+
+def _capture() -> Captured:
+    return _span_context.get(), _binding.get()
+
+
+def _run_in_span_context(captured: Captured, fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    在捕获的上下文下执行 fn：只切换 SpanContext 和 Binding 这两个 ContextVar，
+    而不是复制并进入整个 Context。
+    """
+    context, binding = captured
+    if _span_context.get() is context and _binding.get() is binding:
+        return fn(*args, **kwargs)
+    token = _span_context.set(context)
+    binding_token = _binding.set(binding)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _binding.reset(binding_token)
+        _span_context.reset(token)
+
+
+def _run_batch_in_span_context(captured: Captured, fn: Callable[..., T], batch: list[tuple]) -> list[T]:
+    """在捕获的上下文下对一批参数依次执行 fn，整批只切换一次上下文。"""
+    context, binding = captured
+    token = _span_context.set(context)
+    binding_token = _binding.set(binding)
+    try:
+        return [fn(*args) for args in batch]
+    finally:
+        _binding.reset(binding_token)
+        _span_context.reset(token)
 
 
 class TraceContext:
     """
     一个用于管理追踪ID（trace_id）的上下文管理器。
-    支持在同步和异步代码中安全地设置、获取和重置 trace_id。
-    使用 `ContextVar[str]` 来简化实现，避免了手动管理堆栈。
+    支持在同步和异步代码中安全地设置、获取和重置 trace_id，以及创建父子 span。
+    使用单个 `ContextVar[SpanContext]` 来简化实现，避免了手动管理堆栈。
     """
 
-    def get_trace_id(self) -> Optional[str]:
+    def __init__(self):
+        self._id_generator: Callable[[], str] = get_id_generator("uuid4")
+        self._trace_end_hooks: list[Callable[[str], None]] = []
+
+    def set_id_generator(self, generator: str | Callable[[], str]) -> None:
+        """
+        设置生成新 trace_id 的方式。
+
+        Args:
+            generator: 内置生成器名称（"uuid4"、"hex128"、"hex64"、"w3c"、"ulid"、"uuid7"），
+                或者一个返回字符串的无参函数。默认为 "uuid4"。
+        """
+        self._id_generator = get_id_generator(generator) if isinstance(generator, str) else generator
+
+    def generate_trace_id(self) -> str:
+        """用当前的生成器生成一个新的 trace_id，不修改上下文。"""
+        return self._id_generator()
+
+    def get_trace_id(self) -> str | None:
         """
         获取当前的 trace_id。
         如果上下文中没有 trace_id，返回 None。
         """
-        return _trace_id_context.get()
+        context = _span_context.get()
+        return context.trace_id if context is not None else None
 
     def get_or_create_trace_id(self) -> str:
         """
         获取当前的 trace_id。
-        如果上下文中没有 trace_id，会自动生成一个新的 UUIDv4 并设置为当前 trace_id。
+        如果上下文中没有 trace_id，会用当前的生成器（默认 UUIDv4）生成一个新的并设置为当前 trace_id。
         """
-        trace_id = _trace_id_context.get()
-        if trace_id is None:
+        context = _span_context.get()
+        if context is None:
             # 如果没有 trace_id, 生成一个新的并设置
-            new_id = str(uuid.uuid4())
-            _trace_id_context.set(new_id)
+            new_id = self._id_generator()
+            _span_context.set(SpanContext(new_id))
             return new_id
-        return trace_id
+        return context.trace_id
 
     def set_trace_id(self, trace_id: str) -> Token:
         """
@@ -47,23 +188,271 @@ class TraceContext:
         Returns:
             Token: 一个令牌，可以用于之后调用 reset_trace_id 来恢复上下文。
         """
-        return _trace_id_context.set(trace_id)
+        return _span_context.set(SpanContext(trace_id))
 
     def reset_trace_id(self, token: Token):
         """
-        使用 set_trace_id 返回的令牌来重置上下文。
+        使用 set_trace_id（或 set_span_context）返回的令牌来重置上下文。
+        如果重置后离开了原来的 trace_id，视为该链路结束，依次调用已注册的结束回调。
 
         Args:
             token (Token): 从 set_trace_id 调用中获取的令牌。
         """
-        _trace_id_context.reset(token)
+        if not self._trace_end_hooks:
+            _span_context.reset(token)
+            return
+
+        ended = _span_context.get()
+        _span_context.reset(token)
+        if ended is None:
+            return
+        current = _span_context.get()
+        if current is None or current.trace_id != ended.trace_id:
+            self._end_trace(ended.trace_id)
+
+    def _end_trace(self, trace_id: str) -> None:
+        for hook in list(self._trace_end_hooks):
+            hook(trace_id)
+
+    def add_trace_end_hook(self, hook: Callable[[str], None]) -> None:
+        """注册链路结束回调，参数为结束的 trace_id。回调在调用 reset_trace_id 的线程中同步执行。"""
+        self._trace_end_hooks.append(hook)
+
+    def remove_trace_end_hook(self, hook: Callable[[str], None]) -> None:
+        """移除已注册的链路结束回调，未注册时忽略。"""
+        if hook in self._trace_end_hooks:
+            self._trace_end_hooks.remove(hook)
+
+    def get_span_context(self) -> SpanContext | None:
+        """获取当前的 SpanContext，没有时返回 None。"""
+        return _span_context.get()
+
+    def set_span_context(self, context: SpanContext) -> Token:
+        """设置完整的 SpanContext，返回的令牌可以传给 reset_trace_id 恢复上下文。"""
+        return _span_context.set(context)
+
+    def is_sampled(self) -> bool:
+        """当前链路是否被采样；没有上下文时视为采样。"""
+        context = _span_context.get()
+        return context is None or context.sampled
+
+    @contextmanager
+    def span(self, sampled: bool | None = None) -> Iterator[SpanContext]:
+        """
+        在当前链路下创建一个子 span，退出时恢复到父 span。
+
+        没有 trace_id 时会先生成一个新的，此时该 span 就是链路的根，退出时与 reset_trace_id 一样
+        调用链路结束回调；子 span 的 parent_span_id 为当前的 span_id，sampled 默认继承父 span。
+
+            with trace_context.span() as span:
+                logger.info("sub-operation")  # 日志中带有 span.span_id
+        """
+        parent = _span_context.get()
+        if parent is None:
+            context = SpanContext(self._id_generator(), hex64_id(), None, True if sampled is None else sampled)
+        else:
+            context = SpanContext(
+                parent.trace_id,
+                hex64_id(),
+                parent.span_id,
+                parent.sampled if sampled is None else sampled,
+            )
+        token = _span_context.set(context)
+        try:
+            yield context
+        finally:
+            _span_context.reset(token)
+            if parent is None:
+                self._end_trace(context.trace_id)
+
+    def parse_traceparent(self, traceparent: str) -> SpanContext | None:
+        """
+        解析 W3C traceparent 请求头，返回本服务的 SpanContext：
+        trace_id 沿用上游，上游的 parent-id 作为 parent_span_id，并生成新的 span_id。
+        格式不合法或 trace-id/parent-id 全为 0 时返回 None。
+        """
+        match = _TRACEPARENT.match(traceparent.strip())
+        if match is None:
+            return None
+        version, trace_id, parent_id, flags = match.groups()
+        if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+            return None
+        return SpanContext(trace_id, hex64_id(), parent_id, bool(int(flags, 16) & 0x01))
+
+    def get_traceparent(self) -> str | None:
+        """
+        按 W3C 格式输出当前上下文，用于向下游服务传递。
+        trace_id 不是 32 位十六进制（例如使用了 uuid4 生成器）时返回 None。
+        """
+        context = _span_context.get()
+        if context is None or not _HEX32.match(context.trace_id):
+            return None
+        span_id = context.span_id or hex64_id()
+        return f"00-{context.trace_id}-{span_id}-{'01' if context.sampled else '00'}"
+
+    def wrap(self, fn: Callable[..., T]) -> Callable[..., T]:
+        """
+        捕获当前的 SpanContext 和绑定的字段，返回在任意线程中都以该上下文执行 fn 的可调用对象。
+
+        适用于 `loop.run_in_executor`、`ThreadPoolExecutor.submit` 等不会自动复制上下文的场景：
+
+            loop.run_in_executor(None, trace_context.wrap(blocking_io), path)
+
+        返回值是 functools.partial，只要 fn 可以 pickle，同样可以提交给 ProcessPoolExecutor。
+        """
+        return functools.partial(_run_in_span_context, _capture(), fn)
+
+    def run_in_executor(self, executor: Executor | None, fn: Callable[..., T], *args) -> Awaitable[T]:
+        """等价于 `asyncio.get_running_loop().run_in_executor(executor, fn, *args)`，并携带当前的 trace_id。"""
+        return asyncio.get_running_loop().run_in_executor(executor, self.wrap(fn), *args)
+
+    def offload(
+        self, executor: Executor | None = None
+    ) -> Callable[[Callable[..., T]], Callable[..., Awaitable[T]]]:
+        """
+        装饰器：把同步函数变为在 executor（默认为事件循环的默认线程池）中执行的协程函数，
+        调用时捕获当前的 trace_id。
+
+            @trace_context.offload()
+            def read_file(path): ...
+
+            content = await read_file("data.txt")  # 线程池中的日志带有当前请求的 trace_id
+        """
+
+        def decorator(fn: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs) -> Awaitable[T]:
+                return self.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+            return wrapper
+
+        return decorator
+
+    def propagate(self, fn: Callable[..., T]) -> Callable[..., Callable[..., T]]:
+        """
+        装饰器：被装饰的函数在调用时不立即执行，而是捕获当前 trace_id 并返回一个可提交给线程池的任务。
+
+            @trace_context.propagate
+            def handle(item): ...
+
+            pool.submit(handle(item))
+        """
+
+        @functools.wraps(fn)
+        def bind(*args, **kwargs) -> Callable[[], T]:
+            return functools.partial(_run_in_span_context, _capture(), fn, *args, **kwargs)
+
+        return bind
+
+    def bind(self, **fields: Any) -> Token:
+        """
+        把字段绑定到当前上下文，之后的日志都会带上这些字段，调用点无需再传 extra：
+
+            token = trace_context.bind(user_id=42, tenant="acme")
+            ...
+            trace_context.reset_bindings(token)
+
+        嵌套绑定会覆盖外层的同名字段；与 trace_id 一样随上下文传递，在异步代码中互不干扰。
+        不能绑定 LogRecord 的属性名（如 name、msg、levelname）以及 message、trace_id 等保留字段。
+
+        Returns:
+            Token: 一个令牌，可以用于之后调用 reset_bindings 来恢复上下文。
+        """
+        reserved = _RESERVED_FIELDS.intersection(fields)
+        if reserved:
+            raise ValueError(f"Cannot bind reserved LogRecord attributes: {sorted(reserved)!r}.")
+        return _binding.set(Binding(_binding.get(), fields))
+
+    def reset_bindings(self, token: Token) -> None:
+        """使用 bind 返回的令牌恢复绑定前的字段。"""
+        _binding.reset(token)
+
+    @contextmanager
+    def bound(self, **fields: Any) -> Iterator[Mapping[str, Any]]:
+        """
+        在 with 块内绑定字段，退出时恢复：
+
+            with trace_context.bound(user_id=42):
+                logger.info("order created")  # ... | user_id=42
+        """
+        token = self.bind(**fields)
+        try:
+            yield _binding.get().fields
+        finally:
+            _binding.reset(token)
+
+    def get_binding(self) -> Binding | None:
+        """获取当前的 Binding 节点，没有绑定字段时返回 None。"""
+        return _binding.get()
+
+    def get_bound_fields(self) -> Mapping[str, Any]:
+        """获取当前绑定的全部字段（只读）。"""
+        binding = _binding.get()
+        return binding.fields if binding is not None else _EMPTY_FIELDS
 
     def clear(self):
         """
-        完全清空当前的 trace_id 上下文。
+        完全清空当前的 trace_id 上下文和绑定的字段。
         这在测试环境中尤其有用，可以确保不同测试用例之间的隔离。
         """
-        _trace_id_context.set(None)
+        _span_context.set(None)
+        _binding.set(None)
+
+
+class ContextPropagatingExecutor(Executor):
+    """
+    包装一个 Executor（ThreadPoolExecutor/ProcessPoolExecutor），提交任务时捕获当前的 SpanContext 和绑定的字段，
+    任务在工作线程中以该上下文执行，日志中的 trace_id/span_id 与提交方一致。
+
+        with ContextPropagatingExecutor(ThreadPoolExecutor(8)) as pool:
+            pool.submit(fn, arg)
+            results = list(pool.map_batched(fn, items, batch_size=100))
+
+    bind() 绑定的字段同样会被带到工作线程中。
+    每个任务只在工作线程中切换一次 SpanContext 和 Binding，而不是复制整个 contextvars.Context。
+    """
+
+    def __init__(self, executor: Executor):
+        self.executor = executor
+
+    def submit(self, fn: Callable[..., T], /, *args, **kwargs) -> Future:
+        return self.executor.submit(_run_in_span_context, _capture(), fn, *args, **kwargs)
+
+    def map(
+        self, fn: Callable[..., T], *iterables: Iterable[Any], timeout: float | None = None, chunksize: int = 1
+    ) -> Iterator[T]:
+        # 上下文在调用 map 时只捕获一次，所有任务共享
+        return self.executor.map(
+            functools.partial(_run_in_span_context, _capture(), fn),
+            *iterables,
+            timeout=timeout,
+            chunksize=chunksize,
+        )
+
+    def map_batched(self, fn: Callable[..., T], *iterables: Iterable[Any], batch_size: int = 64) -> Iterator[T]:
+        """
+        把参数按 batch_size 分批，每批作为一个任务提交，按输入顺序返回结果。
+        适合大量短任务的扇出：减少任务提交和上下文切换的次数。
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive.")
+        captured = _capture()
+        arguments = zip(*iterables)
+        futures = []
+        while True:
+            batch = list(islice(arguments, batch_size))
+            if not batch:
+                break
+            futures.append(self.executor.submit(_run_batch_in_span_context, captured, fn, batch))
+
+        def results() -> Iterator[T]:
+            for future in futures:
+                yield from future.result()
+
+        return results()
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
 
 
 # 创建一个单例，供整个应用使用
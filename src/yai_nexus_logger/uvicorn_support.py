@@ -1,7 +1,12 @@
 """Provides support for integrating the logger with Uvicorn's logging system."""
 
+import bisect
+import fnmatch
+import io
 import logging
-from typing import List
+import re
+import threading
+from collections.abc import Iterable, Sequence
 
 try:
     from uvicorn.logging import AccessFormatter
@@ -10,8 +15,17 @@ except ImportError:
     UVICORN_AVAILABLE = False
     AccessFormatter = None
 
+from yai_nexus_logger.middleware import AccessLogMiddleware, ASGIApp, Message, Receive, Scope, Send
 from yai_nexus_logger.trace_context import trace_context
 
+# uvicorn 访问日志的处理方式：
+# - "console": 复制控制台/文件 handler 的 stream，用 UvicornAccessFormatter 输出（旧行为）
+# - "pipeline": 直接挂载应用已配置的 handler 管道（异步分发、文件分割、SLS 等）
+UVICORN_ACCESS_LOG_MODES = ("console", "pipeline")
+
+# uvicorn 访问日志的名称
+UVICORN_ACCESS_LOGGER = "uvicorn.access"
+
 
 class UvicornAccessFormatter(logging.Formatter):
     """
@@ -37,30 +51,105 @@ class UvicornAccessFormatter(logging.Formatter):
         return f"{trace_id_str} | {access_log}"
 
 
+class UvicornAccessFilter(logging.Filter):
+    """
+    把 uvicorn 的访问日志整理为结构化字段，替代 uvicorn 自带的 AccessFormatter。
+
+    uvicorn 以 `'%s - "%s %s HTTP/%s" %d'` 和 (client_addr, method, path, http_version, status_code)
+    记录访问日志。此过滤器把参数写入 method、path、status、client、http_version 字段，
+    消息改为 "GET /items?page=2 200"，之后由应用的 formatter 按普通日志格式化一次。
+    字段名与 `AccessLogMiddleware` 一致。
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        args = record.args
+        if isinstance(args, tuple) and len(args) == 5:
+            client, method, path, http_version, status = args
+            record.msg = "%s %s %d"
+            record.args = (method, path, status)
+            record_dict = record.__dict__
+            record_dict["method"] = method
+            record_dict["path"] = path
+            record_dict["status"] = status
+            record_dict["client"] = client
+            record_dict["http_version"] = http_version
+        return True
+
+
+def _remove_access_filters(uvicorn_access_logger: logging.Logger) -> None:
+    """移除之前挂载的 UvicornAccessFilter，重复配置时不会叠加。"""
+    for log_filter in list(uvicorn_access_logger.filters):
+        if isinstance(log_filter, UvicornAccessFilter):
+            uvicorn_access_logger.removeFilter(log_filter)
+
+
+def _has_binary_stream(handler: logging.StreamHandler) -> bool:
+    """handler 的 stream 是否只接受 bytes，这类 stream 不能交给复制出的 StreamHandler 写入文本。"""
+    return isinstance(handler.stream, io.RawIOBase | io.BufferedIOBase)
+
+
+def attach_uvicorn_access_logger(handlers: list[logging.Handler], level: str = "INFO") -> None:
+    """
+    让 uvicorn 的访问日志直接使用应用已配置的 handler（包括异步分发队列、SLS 队列和尾部缓冲）。
+
+    挂载的是同一批 handler 对象而不是复制的 StreamHandler，因此访问日志同样会经过文件分割、
+    SLS 上报和异步写入，也不会产生第二次阻塞的控制台写入。
+    不依赖 uvicorn 是否已安装：未安装时 "uvicorn.access" 只是一个不会被使用的 logger。
+
+    Args:
+        handlers (List[logging.Handler]): 应用 logger 上挂载的 handler 管道。
+        level (str): uvicorn 访问日志的级别。
+    """
+    uvicorn_access_logger = logging.getLogger(UVICORN_ACCESS_LOGGER)
+    uvicorn_access_logger.handlers.clear()
+    uvicorn_access_logger.propagate = False
+    _remove_access_filters(uvicorn_access_logger)
+    # 过滤器挂在 logger 上，只作用于 uvicorn 直接记录的访问日志，不影响共享 handler 上的其他日志
+    uvicorn_access_logger.addFilter(UvicornAccessFilter())
+    for handler in handlers:
+        uvicorn_access_logger.addHandler(handler)
+    uvicorn_access_logger.setLevel(level.upper())
+
+
 def configure_uvicorn_logging(
-    handlers: List[logging.Handler], level: str = "INFO"
+    handlers: list[logging.Handler], level: str = "INFO", access_log: str = "console"
 ) -> None:
     """
     为 Uvicorn 的访问日志添加 trace_id 支持。
-    只处理控制台输出的访问日志，不强制重定向到文件或 SLS。
-    这样既保留了 trace_id 追踪的核心价值，又避免了复杂的 handler 兼容性问题。
+
+    access_log 为 "console"（默认）时只处理控制台输出的访问日志，不强制重定向到文件或 SLS；
+    为 "pipeline" 时见 `attach_uvicorn_access_logger`，此时 handlers 应为应用 logger 上的 handler 管道。
 
     Args:
         handlers (List[logging.Handler]): A list of logging handlers to check for console output.
         level (str): The logging level to set for the Uvicorn access logger.
+        access_log (str): "console" or "pipeline".
     """
+    if access_log not in UVICORN_ACCESS_LOG_MODES:
+        raise ValueError(
+            f"Unsupported uvicorn access log mode: {access_log!r}. Expected one of {UVICORN_ACCESS_LOG_MODES}."
+        )
+    if access_log == "pipeline":
+        attach_uvicorn_access_logger(handlers, level)
+        return
+
     if not UVICORN_AVAILABLE:
         return  # Silently skip if uvicorn is not available
 
     # 只处理 uvicorn.access，为其添加 trace_id 支持
-    uvicorn_access_logger = logging.getLogger("uvicorn.access")
+    uvicorn_access_logger = logging.getLogger(UVICORN_ACCESS_LOGGER)
     uvicorn_access_logger.handlers.clear()
     uvicorn_access_logger.propagate = False  # Prevent logs from propagating to the root logger
+    _remove_access_filters(uvicorn_access_logger)
 
     # 只为 StreamHandler 类型的 handler 添加 trace_id，避免复杂的 handler 兼容性问题
     # 这包括 StreamHandler 和 FileHandler（FileHandler 继承自 StreamHandler）
-    # 但排除 QueuedLogHandler 等其他类型的 handler
-    stream_handlers = [h for h in handlers if isinstance(h, logging.StreamHandler)]
+    # 但排除 QueuedLogHandler 等其他类型的 handler，
+    # 以及自己管理二进制 stream 的 handler（BufferedFileHandler、MultiProcessFileHandler），
+    # 这些文件需要访问日志时应使用 "pipeline" 模式
+    stream_handlers = [
+        h for h in handlers if isinstance(h, logging.StreamHandler) and not _has_binary_stream(h)
+    ]
     for handler in stream_handlers:
         handler_copy = logging.StreamHandler(handler.stream)
         handler_copy.setFormatter(UvicornAccessFormatter())
@@ -70,3 +159,166 @@ def configure_uvicorn_logging(
 
     # 不处理 uvicorn 和 uvicorn.error，让它们保持默认行为
     # 这样可以避免日志混乱，并保持各自的职责分离
+
+
+# 汇总访问日志使用的默认耗时分桶上界（毫秒），最后还有一个超出所有上界的桶
+DEFAULT_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _RouteStats:
+    """一个 (route, method, status) 在当前汇总周期内的计数和耗时分布。"""
+
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self, n_buckets: int):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * n_buckets
+
+    def quantile(self, q: float, bounds: Sequence[float]) -> float:
+        """按分桶估算分位数，取目标所在桶的上界；落在最后一个桶时取最大值。"""
+        target = q * self.count
+        seen = 0
+        for index, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                return float(bounds[index]) if index < len(bounds) else self.max_ms
+        return self.max_ms
+
+
+class AccessLogAggregator(AccessLogMiddleware):
+    """
+    汇总访问日志的 ASGI 中间件：不再每个请求一条日志，而是在进程内按 (route, method, status)
+    累计请求数和耗时分布，每 interval 秒为每个键输出一条汇总日志：
+
+        app.add_middleware(AccessLogAggregator, interval=60, drop_patterns=("/health", "/metrics*"))
+        app.add_middleware(TraceIDMiddleware)
+
+    - status 不低于 error_status 或耗时不低于 slow_ms 的请求仍然单独输出一条完整的访问日志
+      （与 `AccessLogMiddleware` 相同，级别至少为 WARNING，不会被默认的采样设置丢弃），同时计入汇总。
+    - 匹配 drop_patterns（fnmatch 通配符）的路径直接透传，不计时、不计数，也不创建任何日志记录。
+    - 汇总日志的消息为 "GET /items/{item_id} 200 count=1200 avg=3.1ms p95=10ms max=42.0ms"，
+      并以 extra 字段记录 count、duration_ms_avg/p50/p95/p99/max 和各耗时分桶的计数。
+
+    汇总由后台线程定时输出。应用关闭时（ASGI lifespan 的 shutdown 完成后）或调用 close() 时，
+    会停止线程并立即输出剩余的汇总；服务器未启用 lifespan 时需要自行调用 close()。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        logger_name: str | None = None,
+        level: int = logging.INFO,
+        interval: float = 60.0,
+        slow_ms: float = 1000.0,
+        error_status: int = 500,
+        drop_patterns: Iterable[str] = (),
+        latency_buckets_ms: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS,
+    ):
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        super().__init__(app, logger_name=logger_name, level=level)
+        self.interval = interval
+        self.slow_ms = slow_ms
+        self.error_status = error_status
+        self._bounds = tuple(sorted(latency_buckets_ms))
+        self._bucket_labels = [f"le_{bound:g}ms" for bound in self._bounds] + ["inf"]
+
+        # 不含通配符的模式用集合精确匹配，其余合并为一个正则
+        patterns = list(drop_patterns)
+        self._drop_exact = frozenset(p for p in patterns if not any(c in p for c in "*?["))
+        globs = [fnmatch.translate(p) for p in patterns if p not in self._drop_exact]
+        self._drop_regex = re.compile("|".join(globs)) if globs else None
+
+        self._stats: dict[tuple[str, str, int], _RouteStats] = {}
+        self._stats_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="yai-nexus-logger-access-aggregator", daemon=True
+        )
+        self._flusher.start()
+
+    def _is_dropped(self, path: str) -> bool:
+        if path in self._drop_exact:
+            return True
+        return self._drop_regex is not None and self._drop_regex.match(path) is not None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self.app(scope, receive, self._wrap_lifespan_send(send))
+            return
+        if scope["type"] == "http" and self._is_dropped(scope.get("path", "")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+    def _wrap_lifespan_send(self, send: Send) -> Send:
+        async def send_with_shutdown(message: Message) -> None:
+            # 应用自己的关闭逻辑已执行完毕，此时输出最后一个周期的汇总，再通知服务器退出
+            if message["type"] in ("lifespan.shutdown.complete", "lifespan.shutdown.failed"):
+                self.close()
+            await send(message)
+
+        return send_with_shutdown
+
+    def _log(self, scope: Scope, path: str, level: int, status: int, size: int, elapsed: float) -> None:
+        route = getattr(scope.get("route"), "path", None) or path
+        duration_ms = elapsed * 1000
+        key = (route, scope.get("method", ""), status)
+        with self._stats_lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _RouteStats(len(self._bounds) + 1)
+            stats.count += 1
+            stats.total_ms += duration_ms
+            if duration_ms > stats.max_ms:
+                stats.max_ms = duration_ms
+            stats.buckets[bisect.bisect_left(self._bounds, duration_ms)] += 1
+
+        if level >= logging.ERROR or status >= self.error_status or duration_ms >= self.slow_ms:
+            super()._log(scope, path, max(level, logging.WARNING), status, size, elapsed)
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """立即为当前周期内的每个键输出一条汇总日志，并开始新的周期。"""
+        with self._stats_lock:
+            stats, self._stats = self._stats, {}
+        bounds = self._bounds
+        for (route, method, status), entry in stats.items():
+            avg = entry.total_ms / entry.count
+            p95 = entry.quantile(0.95, bounds)
+            self.logger.log(
+                self.level,
+                "%s %s %d count=%d avg=%.1fms p95=%gms max=%.1fms",
+                method,
+                route,
+                status,
+                entry.count,
+                avg,
+                p95,
+                entry.max_ms,
+                extra={
+                    "method": method,
+                    "route": route,
+                    "status": status,
+                    "count": entry.count,
+                    "interval_s": self.interval,
+                    "duration_ms_avg": round(avg, 3),
+                    "duration_ms_p50": entry.quantile(0.5, bounds),
+                    "duration_ms_p95": p95,
+                    "duration_ms_p99": entry.quantile(0.99, bounds),
+                    "duration_ms_max": round(entry.max_ms, 3),
+                    "latency_buckets": dict(zip(self._bucket_labels, entry.buckets)),
+                },
+            )
+
+    def close(self) -> None:
+        """停止后台线程并输出剩余的汇总。"""
+        self._stop_event.set()
+        if self._flusher.is_alive() and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        self.flush()
@@ -0,0 +1,12 @@
+# tests/conftest.py
+
+import pytest
+
+from yai_nexus_logger.internal.internal_settings import settings
+
+
+@pytest.fixture(autouse=True)
+def reload_settings():
+    """配置只在 reload 时读取环境变量；每个测试结束后（环境变量已被 monkeypatch 恢复）重新解析，避免影响其他测试。"""
+    yield
+    settings.reload()
@@ -0,0 +1,140 @@
+# tests/yai_nexus_logger/unit/test_aggregator.py
+
+import logging
+from pathlib import Path
+
+from yai_nexus_logger import LoggerConfigurator
+from yai_nexus_logger.aggregator import LogAggregator
+from yai_nexus_logger.internal.internal_formatter import InternalFormatter
+from yai_nexus_logger.internal.internal_record_codec import decode_records
+from yai_nexus_logger.internal.internal_socket_handler import SocketShipperHandler, encode_batch
+
+
+def test_batch_round_trip_preserves_record_fields():
+    """测试日志编码为批次再解码后，保留消息、级别、调用位置（含 module/filename）、trace_id 和 extra。"""
+    shipper = SocketShipperHandler("/nonexistent.sock")
+    record = logging.LogRecord("app.worker", logging.WARNING, "/srv/app/worker.py", 42, "hello %s", ("world",), None)
+    record.funcName = "handle"
+    record.trace_id = "trace-1"
+    record.user_id = 7
+    frame = encode_batch([shipper._encode(record)])
+    shipper.close()
+
+    (decoded,) = decode_records(frame[4:])
+    assert decoded.getMessage() == "hello world"
+    assert decoded.levelname == "WARNING"
+    assert (decoded.name, decoded.pathname, decoded.lineno, decoded.funcName) == (
+        "app.worker",
+        "/srv/app/worker.py",
+        42,
+        "handle",
+    )
+    assert (decoded.module, decoded.filename) == ("worker", "worker.py")
+    assert decoded.trace_id == "trace-1"
+    assert decoded.user_id == 7
+    assert decoded.created == record.created
+
+    formatter = InternalFormatter("%(module)s:%(lineno)d | %(message)s")
+    assert formatter.format(decoded) == "worker:42 | hello world | user_id=7"
+
+
+def test_aggregator_writes_records_from_workers(tmp_path: Path):
+    """测试 worker 通过 socket 发送的日志由聚合进程写入文件。"""
+    socket_path = str(tmp_path / "agg.sock")
+    log_file = tmp_path / "agg.log"
+    aggregator_config = LoggerConfigurator().with_file_handler(path=str(log_file))
+
+    with LogAggregator(socket_path, aggregator_config):
+        shipper = SocketShipperHandler(socket_path, batch_size=10, flush_interval_ms=10)
+        logger = logging.getLogger("test_aggregator_worker")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.handlers = [shipper]
+
+        for i in range(25):
+            logger.info("message %d", i, extra={"seq": i})
+        shipper.close()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 25
+    assert "message 0 | seq=0" in lines[0]
+    assert "message 24 | seq=24" in lines[-1]
+
+
+def test_shipper_keeps_records_until_aggregator_is_available(tmp_path: Path):
+    """测试聚合进程不可用时日志保留在内存中，超过 max_pending 时丢弃最早的日志。"""
+    shipper = SocketShipperHandler(str(tmp_path / "missing.sock"), batch_size=2, max_pending=4)
+    logger = logging.getLogger("test_aggregator_unavailable")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.handlers = [shipper]
+
+    for i in range(6):
+        logger.info("message %d", i)
+    # 等待后台线程可能正在进行的发送尝试结束
+    shipper.flush()
+
+    assert len(shipper._pending) == 4
+    assert shipper.dropped == 2
+    shipper.close()
+
+
+def _log_from_forked_child(logger_name: str) -> None:
+    logger = logging.getLogger(logger_name)
+    (shipper,) = logger.handlers
+    assert shipper._flusher.is_alive()
+    logger.info("from child")
+    shipper.close()
+
+
+def test_shipper_in_forked_child_does_not_resend_parent_records(tmp_path: Path):
+    """测试 fork 出的子进程不会重发父进程尚未发送的日志，并能通过自己的后台线程发送日志。"""
+    import multiprocessing
+
+    socket_path = str(tmp_path / "fork.sock")
+    log_file = tmp_path / "fork.log"
+    aggregator_config = LoggerConfigurator().with_file_handler(path=str(log_file))
+
+    with LogAggregator(socket_path, aggregator_config):
+        shipper = SocketShipperHandler(socket_path, batch_size=100, flush_interval_ms=10_000)
+        logger = logging.getLogger("test_aggregator_fork")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.handlers = [shipper]
+
+        logger.info("from parent")
+        child = multiprocessing.get_context("fork").Process(target=_log_from_forked_child, args=(logger.name,))
+        child.start()
+        child.join(timeout=30)
+        assert child.exitcode == 0
+        shipper.close()
+
+    lines = log_file.read_text().splitlines()
+    assert sorted(line.rsplit(" | ", 1)[-1] for line in lines) == ["from child", "from parent"]
+
+
+def test_shipper_emit_does_not_block_on_stalled_aggregator(tmp_path: Path):
+    """测试聚合进程不读取数据时，产生日志的线程不会被 sendall 阻塞。"""
+    import socket
+    import time
+
+    socket_path = str(tmp_path / "stalled.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+    shipper = SocketShipperHandler(socket_path, batch_size=1, max_pending=100, send_timeout=0.2)
+    logger = logging.getLogger("test_aggregator_stalled")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.handlers = [shipper]
+
+    payload = "x" * 64 * 1024
+    started = time.monotonic()
+    for _ in range(500):
+        logger.info(payload)
+    elapsed = time.monotonic() - started
+    shipper.close()
+    server.close()
+
+    assert elapsed < 2.0
+    assert shipper.dropped > 0
@@ -0,0 +1,104 @@
+"""Unit tests for BoundLogger."""
+
+import inspect
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from yai_nexus_logger import BoundLogger
+
+
+@pytest.fixture
+def captured():
+    """返回 (logger, records)，records 收集该 logger 输出的日志。"""
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("bound_logger_test")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    yield logger, records
+    logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+
+
+def test_disabled_levels_skip_record_creation(captured):
+    """测试未启用的级别直接返回，不会进入 Logger._log。"""
+    logger, records = captured
+    bound = BoundLogger(logger)
+
+    with patch.object(logger, "_log", wraps=logger._log) as log:
+        bound.debug("hidden %s", 1)
+        assert log.call_count == 0
+        bound.info("shown %s", 2)
+        assert log.call_count == 1
+
+    assert [r.getMessage() for r in records] == ["shown 2"]
+
+
+def test_bound_logger_reports_caller_location(captured):
+    """测试修正 stacklevel 后，日志的文件名、行号和函数名指向调用方。"""
+    logger, records = captured
+    bound = BoundLogger(logger)
+
+    line = inspect.currentframe().f_lineno + 1
+    bound.warning("here")
+
+    (record,) = records
+    assert record.filename == "test_bound_logger.py"
+    assert record.lineno == line
+    assert record.funcName == "test_bound_logger_reports_caller_location"
+
+
+def test_bound_logger_follows_level_changes(captured):
+    """测试 setLevel 和 logging.disable 之后重新计算各级别是否启用。"""
+    logger, records = captured
+    bound = BoundLogger(logger)
+
+    bound.debug("before")
+    logger.setLevel(logging.DEBUG)
+    bound.debug("after")
+
+    logging.disable(logging.CRITICAL)
+    try:
+        bound.error("disabled")
+    finally:
+        logging.disable(logging.NOTSET)
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        bound.exception("failed")
+
+    assert [r.getMessage() for r in records] == ["after", "failed"]
+    assert records[1].exc_info[0] is ValueError
+
+
+def test_bound_logger_follows_logging_disable(captured):
+    """测试 logging.disable 使预计算的级别失效，恢复后重新启用；父 logger 的级别变化同样生效。"""
+    logger, records = captured
+    logger.setLevel(logging.NOTSET)
+    parent = logging.getLogger("bound_logger_parent")
+    child = logging.getLogger("bound_logger_parent.child")
+    child.handlers = list(logger.handlers)
+    child.propagate = False
+    parent.setLevel(logging.WARNING)
+    bound = BoundLogger(child)
+
+    bound.warning("enabled")
+    logging.disable(logging.WARNING)
+    try:
+        bound.warning("disabled")
+        bound.error("still enabled")
+    finally:
+        logging.disable(logging.NOTSET)
+    bound.warning("re-enabled")
+
+    parent.setLevel(logging.ERROR)
+    bound.warning("filtered by parent")
+    parent.setLevel(logging.NOTSET)
+    child.handlers = []
+
+    assert [r.getMessage() for r in records] == ["enabled", "still enabled", "re-enabled"]
+
@@ -153,4 +153,38 @@ class TestExtraParams:
         # 验证字段之间用 | 分隔
         extra_part = formatted.split("测试 | ")[1]
         fields = extra_part.split(" | ")
-        assert len(fields) == 3
\ No newline at end of file
+        assert len(fields) == 3
+
+def test_extract_extra_fields_keeps_insertion_order():
+    """测试 extra 字段按写入顺序返回，格式化过程中添加的属性不算 extra"""
+    record = logging.LogRecord("test", logging.INFO, "test.py", 1, "msg", (), None)
+    assert extract_extra_fields(record) == {}
+
+    record.zeta = 1
+    record.alpha = 2
+    record.message = "msg"
+    record.asctime = "2025-01-01 00:00:00"
+    assert list(extract_extra_fields(record)) == ["zeta", "alpha"]
+
+
+def test_extract_extra_fields_respects_custom_record_factory():
+    """测试自定义 record factory 添加的属性在刷新基线后不被视为 extra"""
+    from yai_nexus_logger.internal.internal_utils import refresh_record_baseline
+
+    original_factory = logging.getLogRecordFactory()
+
+    def factory(*args, **kwargs):
+        record = original_factory(*args, **kwargs)
+        record.hostname = "host-1"
+        return record
+
+    logging.setLogRecordFactory(factory)
+    try:
+        refresh_record_baseline()
+        record = factory("test", logging.INFO, "test.py", 1, "msg", (), None)
+        assert extract_extra_fields(record) == {}
+        record.user_id = "42"
+        assert extract_extra_fields(record) == {"user_id": "42"}
+    finally:
+        logging.setLogRecordFactory(original_factory)
+        refresh_record_baseline()
@@ -0,0 +1,89 @@
+"""Unit tests for the AsyncDispatchHandler."""
+
+import io
+import logging
+import threading
+
+from yai_nexus_logger import LoggerConfigurator, trace_context
+from yai_nexus_logger.internal.internal_async_handler import AsyncDispatchHandler
+from yai_nexus_logger.internal.internal_formatter import InternalFormatter
+from yai_nexus_logger.internal.internal_settings import settings
+
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return logger
+
+
+def test_async_dispatch_writes_in_background_thread():
+    """测试日志由后台线程写出，close 时会排空队列。"""
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(InternalFormatter("%(message)s"))
+    threads = []
+    target.addFilter(lambda record: threads.append(threading.current_thread().name) or True)
+
+    handler = AsyncDispatchHandler([target], queue_size=100)
+    logger = make_logger("async_dispatch_test", handler)
+    for i in range(50):
+        logger.info("message %d", i)
+    handler.close()
+
+    lines = stream.getvalue().splitlines()
+    assert lines == [f"message {i}" for i in range(50)]
+    assert set(threads) == {"yai-nexus-logger-dispatch-0"}
+
+
+def test_async_dispatch_captures_trace_id_at_call_time():
+    """测试 trace_id 在调用线程中捕获，而不是在后台线程格式化时读取。"""
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(InternalFormatter("[%(trace_id)s] %(message)s"))
+    handler = AsyncDispatchHandler([target])
+    logger = make_logger("async_trace_test", handler)
+
+    token = trace_context.set_trace_id("caller-trace-id")
+    logger.info("hello")
+    trace_context.reset_trace_id(token)
+    handler.flush()
+    handler.close()
+
+    assert stream.getvalue() == "[caller-trace-id] hello\n"
+
+
+def test_async_dispatch_respects_target_handler_level():
+    """测试后台分发时仍遵守目标 handler 的级别。"""
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setLevel(logging.WARNING)
+    handler = AsyncDispatchHandler([target], workers=2)
+    logger = make_logger("async_level_test", handler)
+
+    logger.info("dropped")
+    logger.warning("kept")
+    handler.close()
+
+    assert stream.getvalue() == "kept\n"
+
+
+def test_configurator_with_async_dispatch_wraps_handlers(tmp_path, monkeypatch):
+    """测试 with_async_dispatch 把非 SLS handler 放到队列后面。"""
+    monkeypatch.setenv("LOG_APP_NAME", "async_configurator_app")
+    settings.reload()
+    logger = (
+        LoggerConfigurator()
+        .with_console_handler()
+        .with_file_handler(path=str(tmp_path / "app.log"))
+        .with_async_dispatch(queue_size=10)
+        .configure()
+    )
+
+    assert len(logger.handlers) == 1
+    dispatcher = logger.handlers[0]
+    assert isinstance(dispatcher, AsyncDispatchHandler)
+    assert len(dispatcher.handlers) == 2
+    dispatcher.close()
@@ -0,0 +1,112 @@
+"""Unit tests for the queue backpressure policies."""
+
+import logging
+import queue
+import threading
+import time
+
+import pytest
+
+from yai_nexus_logger import LoggerConfigurator
+from yai_nexus_logger.internal.internal_async_handler import AsyncDispatchHandler
+from yai_nexus_logger.internal.internal_backpressure import BackpressurePolicy
+from yai_nexus_logger.internal.internal_settings import settings
+
+
+def make_record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("bp", level, "bp.py", 1, msg, (), None)
+
+
+def full_queue() -> queue.Queue:
+    q = queue.Queue(maxsize=1)
+    q.put_nowait(make_record("old"))
+    return q
+
+
+def test_drop_newest_keeps_queued_record():
+    """测试 drop_newest 丢弃新日志并计数。"""
+    policy = BackpressurePolicy("drop_newest")
+    q = full_queue()
+    policy.offer(q, make_record("new"))
+    assert q.get_nowait().msg == "old"
+    assert policy.stats() == {"policy": "drop_newest", "dropped": 1, "blocked": 0}
+
+
+def test_drop_oldest_replaces_queued_record():
+    """测试 drop_oldest 丢弃队列中最早的日志。"""
+    policy = BackpressurePolicy("drop_oldest")
+    q = full_queue()
+    policy.offer(q, make_record("new"))
+    assert q.get_nowait().msg == "new"
+    assert policy.dropped == 1
+
+
+def test_drop_oldest_keeps_sentinel_when_slot_is_taken():
+    """测试取到停止哨兵后空位被其他线程抢占时，新日志计为丢弃且哨兵不会丢失。"""
+
+    class RacingQueue(queue.Queue):
+        def get_nowait(self):
+            item = super().get_nowait()
+            # 模拟另一个线程在哨兵被取出后立即占用空位
+            super().put_nowait(make_record("racer"))
+            return item
+
+    def drain():
+        time.sleep(0.05)
+        q.get()
+
+    policy = BackpressurePolicy("drop_oldest")
+    q = RacingQueue(maxsize=1)
+    q.put_nowait(None)
+    consumer = threading.Thread(target=drain)
+    consumer.start()
+    policy.offer(q, make_record("new"))
+    consumer.join()
+
+    assert q.get_nowait() is None
+    assert policy.dropped == 1
+
+
+def test_block_with_timeout_counts_blocked_and_dropped():
+    """测试 block 策略在超时后丢弃日志，并同时记录阻塞和丢弃次数。"""
+    policy = BackpressurePolicy("block", timeout=0.01)
+    policy.offer(full_queue(), make_record("new"))
+    assert policy.stats() == {"policy": "block", "dropped": 1, "blocked": 1}
+
+
+def test_drop_below_level_only_drops_low_levels():
+    """测试 drop_below_level 只丢弃低级别日志，高级别日志按阻塞处理。"""
+    policy = BackpressurePolicy("drop_below_level", timeout=0.01, min_level="ERROR")
+    q = full_queue()
+    policy.offer(q, make_record("info"))
+    policy.offer(q, make_record("error", logging.ERROR))
+    assert policy.stats() == {"policy": "drop_below_level", "dropped": 2, "blocked": 1}
+
+
+def test_sample_keeps_a_fraction_under_pressure():
+    """测试 sample 策略在队列满时按比例保留日志。"""
+    policy = BackpressurePolicy("sample", timeout=0, sample_rate=0.25)
+    q = full_queue()
+    for i in range(8):
+        policy.offer(q, make_record(str(i)))
+    # 8 条中 2 条尝试入队（队列仍满、超时后丢弃），6 条直接丢弃
+    assert policy.blocked == 2
+    assert policy.dropped == 8
+
+
+def test_invalid_policy_raises():
+    """测试未知策略会抛出 ValueError。"""
+    with pytest.raises(ValueError, match="Unsupported backpressure policy"):
+        BackpressurePolicy("explode")
+
+
+def test_configurator_with_backpressure_enables_async_dispatch(monkeypatch):
+    """测试 with_backpressure 会启用异步分发，且每个队列 handler 有独立计数器。"""
+    monkeypatch.setenv("LOG_APP_NAME", "backpressure_app")
+    settings.reload()
+    logger = LoggerConfigurator().with_console_handler().with_backpressure("drop_newest").configure()
+
+    dispatcher = logger.handlers[0]
+    assert isinstance(dispatcher, AsyncDispatchHandler)
+    assert dispatcher.get_stats() == {"policy": "drop_newest", "dropped": 0, "blocked": 0, "queued": 0}
+    dispatcher.close()
@@ -1,5 +1,6 @@
 """Unit tests for the InternalFormatter."""
 
+import copy
 import io
 import logging
 
@@ -101,3 +102,184 @@ def test_formatter_abbreviates_module_name():
     record = MockRecord("main")
     formatter.format(record)
     assert record.module == "main"
+
+
+def test_compiled_format_matches_standard_format():
+    """
+    测试编译模式的输出与标准 %-插值模式完全一致。
+    """
+    from yai_nexus_logger.configurator import LOGGING_FORMAT
+
+    fmt = LOGGING_FORMAT + " | %(name)s | 100%% | %(lineno)5d"
+    compiled = InternalFormatter(fmt)
+    standard = InternalFormatter(fmt, compiled=False)
+
+    record = logging.LogRecord(
+        name="compiled_test",
+        level=logging.WARNING,
+        pathname="/src/app/api/v1/handlers.py",
+        lineno=42,
+        msg="value=%s",
+        args=("abc",),
+        exc_info=None,
+    )
+
+    token = trace_context.set_trace_id("compiled-trace-id")
+    try:
+        assert compiled.format(copy.copy(record)) == standard.format(copy.copy(record))
+    finally:
+        trace_context.reset_trace_id(token)
+
+
+def test_compile_format_plan():
+    """
+    测试格式串被编译为字面量与字段交替的渲染计划。
+    """
+    from yai_nexus_logger.internal.internal_formatter import compile_format
+
+    parts, fields = compile_format("[%(levelname)s] 50%% %(message)s")
+    assert parts == ["[", "", "] 50% ", ""]
+    assert [index for index, _ in fields] == [1, 3]
+
+
+def test_formatter_caches_second_prefix():
+    """
+    测试同一秒内的日志复用缓存的时间前缀，且输出与 strftime 一致。
+    """
+    import time
+
+    formatter = InternalFormatter("%(asctime)s.%(msecs)03d | %(message)s")
+    record = logging.LogRecord("ts", logging.INFO, "ts.py", 1, "first", (), None)
+    expected = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created))
+
+    assert formatter.format(record).startswith(f"{expected}.{int(record.msecs):03d} | first")
+    cached = formatter._time_cache
+
+    same_second = logging.LogRecord("ts", logging.INFO, "ts.py", 1, "second", (), None)
+    same_second.created = record.created
+    formatter.format(same_second)
+    assert formatter._time_cache is cached
+
+
+def test_formatter_iso8601_and_epoch_ns_timestamps():
+    """
+    测试 iso8601 与 epoch_ns 两种时间戳模式。
+    """
+    import re
+
+    record = logging.LogRecord("ts", logging.INFO, "ts.py", 1, "msg", (), None)
+
+    iso = InternalFormatter("%(asctime)s", timestamp_format="iso8601").format(record)
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}[+-]\d{2}:\d{2}", iso)
+
+    epoch_ns = InternalFormatter("%(asctime)s", timestamp_format="epoch_ns").format(record)
+    assert int(epoch_ns) // 1_000_000_000 == int(record.created)
+
+
+def test_call_site_cache_is_keyed_by_location():
+    """
+    测试调用点缓存：同一 (pathname, lineno) 只计算一次，且容量有上限。
+    """
+    formatter = InternalFormatter(call_site_cache_size=2)
+
+    def make_record(lineno):
+        record = logging.LogRecord("cs", logging.INFO, "/src/app/x.py", lineno, "m", (), None)
+        record.module = "src.app.api.v1.endpoints"
+        return record
+
+    first = formatter.get_call_site(make_record(1))
+    assert first.module == "s.a.a.v1.endpoints"
+    assert formatter.get_call_site(make_record(1)) is first
+
+    formatter.get_call_site(make_record(2))
+    formatter.get_call_site(make_record(3))
+    assert len(formatter._call_sites) == 2
+
+
+def test_formatter_renders_once_for_multiple_handlers():
+    """
+    测试多个 handler 共享同一个 formatter 时，每条日志只渲染一次。
+    """
+    from unittest.mock import patch
+
+    formatter = InternalFormatter("%(levelname)s | %(message)s")
+    streams = [io.StringIO(), io.StringIO()]
+    logger = logging.getLogger("render_once_test")
+    logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    for stream in streams:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+
+    with patch.object(formatter, "_render", wraps=formatter._render) as render:
+        logger.info("shared message", extra={"user_id": 7})
+
+    assert render.call_count == 1
+    assert streams[0].getvalue() == streams[1].getvalue() == "INFO | shared message | user_id=7\n"
+
+
+def test_format_bytes_is_cached_per_formatter():
+    """
+    测试 format_bytes 复用同一份编码结果，不同 formatter 之间互不干扰。
+    """
+    record = logging.LogRecord("b", logging.INFO, "b.py", 1, "你好", (), None)
+    first = InternalFormatter("%(message)s")
+    second = InternalFormatter("[%(levelname)s] %(message)s")
+
+    encoded = first.format_bytes(record)
+    assert encoded == "你好".encode()
+    assert first.format_bytes(record) is encoded
+    assert second.format(record) == "[INFO] 你好"
+
+
+def test_formatter_appends_span_fields():
+    """
+    测试处于 span 中时，输出附带 span_id 和 parent_span_id，并排在 extra 之前。
+    """
+    log_stream = io.StringIO()
+    logger = create_test_logger(log_stream)
+    token = trace_context.set_trace_id("span-trace")
+    try:
+        with trace_context.span() as outer, trace_context.span() as inner:
+            logger.info("inside span", extra={"user_id": 1})
+    finally:
+        trace_context.reset_trace_id(token)
+
+    line = log_stream.getvalue().strip()
+    assert line.endswith(
+        f"[span-trace] | inside span | span_id={inner.span_id} | parent_span_id={outer.span_id} | user_id=1"
+    )
+
+
+def test_formatter_appends_bound_fields_before_extra():
+    """
+    测试 bind() 绑定的字段以预渲染的后缀附加在 extra 之前，且后缀在 Binding 上只渲染一次。
+    """
+    log_stream = io.StringIO()
+    logger = create_test_logger(log_stream)
+    with trace_context.bound(tenant="acme"), trace_context.bound(user_id=7, route="/orders"):
+        logger.info("first")
+        logger.info("second", extra={"order_id": 3})
+        binding = trace_context.get_binding()
+    logger.info("after")
+
+    lines = log_stream.getvalue().strip().splitlines()
+    assert lines[0].endswith("| first | tenant=acme | user_id=7 | route=/orders")
+    assert lines[1].endswith("| second | tenant=acme | user_id=7 | route=/orders | order_id=3")
+    assert lines[2].endswith("| after")
+    assert binding.suffix is binding.suffix
+
+
+def test_formatter_extra_overrides_bound_field_with_same_name():
+    """
+    测试同一字段既被绑定又通过 extra 传入时只输出一次，且以 extra 的值为准。
+    """
+    log_stream = io.StringIO()
+    logger = create_test_logger(log_stream)
+    with trace_context.bound(user_id=7, tenant="acme"):
+        logger.info("override", extra={"user_id": 8, "order_id": 3})
+
+    line = log_stream.getvalue().strip()
+    assert line.endswith("| override | user_id=8 | tenant=acme | order_id=3")
@@ -3,6 +3,8 @@
 import logging
 from pathlib import Path
 
+import pytest
+
 from yai_nexus_logger.internal.internal_handlers import (
     get_console_handler,
     get_file_handler,
@@ -46,3 +48,274 @@ def test_get_file_handler(tmp_path: Path):
 
     assert log_file.exists()
     assert test_message in log_file.read_text()
+
+
+def test_get_file_handler_buffered_groups_writes(tmp_path: Path):
+    """测试批量写入模式：日志先进入缓冲区，flush 后才写入文件。"""
+    from yai_nexus_logger.internal.internal_file_handler import BufferedFileHandler
+
+    log_file = tmp_path / "buffered.log"
+    handler = get_file_handler(
+        formatter=formatter,
+        path=str(log_file),
+        when="D",
+        interval=1,
+        backup_count=1,
+        buffered=True,
+        flush_interval_ms=60_000,
+    )
+    assert isinstance(handler, BufferedFileHandler)
+    logger = logging.getLogger("test_buffered_file")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+
+    for i in range(3):
+        logger.info("buffered %d", i)
+    assert log_file.read_text() == ""
+
+    handler.flush()
+    assert log_file.read_text() == "buffered 0\nbuffered 1\nbuffered 2\n"
+    handler.close()
+
+
+def test_buffered_file_handler_flushes_when_buffer_is_full(tmp_path: Path):
+    """测试缓冲区写满时自动写出，超过缓冲区大小的单条日志直接写入。"""
+    from yai_nexus_logger.internal.internal_file_handler import BufferedFileHandler
+
+    log_file = tmp_path / "full.log"
+    handler = BufferedFileHandler(str(log_file), buffer_size=16, flush_interval_ms=60_000)
+    handler.setFormatter(formatter)
+    logger = logging.getLogger("test_buffered_full")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+
+    logger.info("0123456789")
+    assert log_file.read_text() == ""
+    logger.info("abcdefghij")
+    assert log_file.read_text() == "0123456789\n"
+    logger.info("x" * 40)
+    assert log_file.read_text() == "0123456789\nabcdefghij\n" + "x" * 40
+    handler.close()
+    assert log_file.read_text().endswith("x" * 40 + "\n")
+
+
+def test_buffered_file_handler_error_durability(tmp_path: Path):
+    """测试 durability="error" 时 ERROR 日志立即写出。"""
+    from yai_nexus_logger.internal.internal_file_handler import BufferedFileHandler
+
+    log_file = tmp_path / "durable.log"
+    handler = BufferedFileHandler(str(log_file), flush_interval_ms=60_000, durability="error")
+    handler.setFormatter(formatter)
+    logger = logging.getLogger("test_buffered_durable")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+
+    logger.info("info")
+    logger.error("error")
+    assert log_file.read_text() == "info\nerror\n"
+    handler.close()
+
+
+def test_buffered_file_handler_background_flush(tmp_path: Path):
+    """测试空闲时后台线程会在 flush_interval_ms 内写出缓冲区。"""
+    import time
+
+    from yai_nexus_logger.internal.internal_file_handler import BufferedFileHandler
+
+    log_file = tmp_path / "timer.log"
+    handler = BufferedFileHandler(str(log_file), flush_interval_ms=20)
+    handler.setFormatter(formatter)
+    logger = logging.getLogger("test_buffered_timer")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+
+    logger.info("idle")
+    deadline = time.monotonic() + 2
+    while log_file.read_text() != "idle\n" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert log_file.read_text() == "idle\n"
+    handler.close()
+
+
+def test_offloaded_rotation_by_size_with_gzip(tmp_path: Path):
+    """测试按大小分割：分割文件在后台被 gzip 压缩，并按 backup_count 清理。"""
+    import gzip
+
+    log_file = tmp_path / "size.log"
+    handler = get_file_handler(
+        formatter=formatter,
+        path=str(log_file),
+        when="D",
+        interval=1,
+        backup_count=2,
+        max_bytes=20,
+        rotation="background",
+        compression="gzip",
+    )
+    logger = logging.getLogger("test_size_rotation")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+
+    for i in range(5):
+        logger.info("line-%02d-abcdefghijk", i)
+    handler.close()  # 等待后台压缩与清理完成
+
+    rotated = sorted(p.name for p in tmp_path.iterdir() if p.name != "size.log")
+    # 同一周期内的第 3、4 次分割（序号 .2、.3）被保留
+    assert [name.split(".")[-2:] for name in rotated] == [["2", "gz"], ["3", "gz"]]
+    assert log_file.read_text() == "line-04-abcdefghijk\n"
+    newest = tmp_path / rotated[-1]
+    assert gzip.decompress(newest.read_bytes()) == b"line-03-abcdefghijk\n"
+
+
+def test_offloaded_rotation_runs_cleanup_off_the_logging_thread(tmp_path: Path):
+    """测试 rotation="background" 时压缩和清理不在日志线程中执行。"""
+    import threading
+
+    from yai_nexus_logger.internal.internal_file_handler import OffloadedRotatingFileHandler
+
+    threads = []
+    handler = OffloadedRotatingFileHandler(str(tmp_path / "bg.log"), max_bytes=1, backupCount=1)
+    original = handler._after_rotation
+    handler._after_rotation = lambda rotated: (threads.append(threading.current_thread().name), original(rotated))
+    handler.setFormatter(formatter)
+    logger = logging.getLogger("test_background_rotation")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+
+    logger.info("first")
+    logger.info("second")
+    handler.close()
+
+    assert threads == ["yai-nexus-logger-rotation"]
+    assert (tmp_path / "bg.log").read_text() == "second\n"
+
+
+def test_offloaded_rotation_cleanup_ignores_unrelated_files(tmp_path: Path):
+    """测试按 backupCount 清理时只删除分割文件，不会删除 app.log.bak 等同名前缀的文件。"""
+    from yai_nexus_logger.internal.internal_file_handler import OffloadedRotatingFileHandler
+
+    (tmp_path / "keep.log.bak").write_text("backup")
+    (tmp_path / "keep.log.old.gz").write_text("old")
+    handler = OffloadedRotatingFileHandler(str(tmp_path / "keep.log"), max_bytes=1, backupCount=1, rotation="inline")
+    handler.setFormatter(formatter)
+    logger = logging.getLogger("test_rotation_ignores_unrelated")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+
+    for i in range(3):
+        logger.info("line-%d", i)
+    handler.close()
+
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert "keep.log.bak" in names
+    assert "keep.log.old.gz" in names
+    assert len([name for name in names if name not in ("keep.log", "keep.log.bak", "keep.log.old.gz")]) == 1
+
+
+def _write_from_worker(path: str, worker: int, count: int) -> None:
+    handler = get_file_handler(
+        formatter=formatter,
+        path=path,
+        when="D",
+        interval=1,
+        backup_count=0,
+        max_bytes=2000,
+        multiprocess=True,
+    )
+    logger = logging.getLogger(f"test_multiprocess_{worker}")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+    for i in range(count):
+        logger.info("worker-%d-line-%04d", worker, i)
+    handler.close()
+
+
+def test_multiprocess_file_handler_rotation_loses_no_records(tmp_path: Path):
+    """测试多个进程写同一个文件并按大小分割时，没有日志丢失或重复。"""
+    import multiprocessing
+
+    from yai_nexus_logger.internal.internal_file_handler import FCNTL_AVAILABLE
+
+    if not FCNTL_AVAILABLE:
+        pytest.skip("fcntl is not available on this platform")
+
+    log_file = tmp_path / "mp.log"
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_write_from_worker, args=(str(log_file), w, 300)) for w in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    files = [p for p in tmp_path.iterdir() if p.name.startswith("mp.log")]
+    lines = [line for p in files for line in p.read_text().splitlines()]
+    assert len(files) > 1
+    assert sorted(lines) == sorted(f"worker-{w}-line-{i:04d}" for w in range(4) for i in range(300))
+
+
+def _write_compressed_from_worker(path: str, worker: int, count: int) -> None:
+    import time
+
+    from yai_nexus_logger.internal.internal_file_handler import MultiProcessFileHandler
+
+    handler = MultiProcessFileHandler(
+        path, when="D", max_bytes=2000, compression="gzip", reopen_check_interval=0.05
+    )
+    handler.setFormatter(formatter)
+    logger = logging.getLogger(f"test_multiprocess_gzip_{worker}")
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+    for i in range(count):
+        logger.info("worker-%d-line-%04d", worker, i)
+        # 写入速度放慢，让分割出的文件在其他进程仍在写入期间就满足压缩的时间条件
+        time.sleep(0.002)
+    handler.close()
+
+
+def test_multiprocess_file_handler_compression_loses_no_records(tmp_path: Path):
+    """测试多进程写同一个文件、分割并压缩时，其他进程仍在写入的分割文件不会被压缩删除。"""
+    import gzip
+    import multiprocessing
+
+    from yai_nexus_logger.internal.internal_file_handler import FCNTL_AVAILABLE
+
+    if not FCNTL_AVAILABLE:
+        pytest.skip("fcntl is not available on this platform")
+
+    log_file = tmp_path / "mpgz.log"
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_write_compressed_from_worker, args=(str(log_file), w, 300)) for w in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    lines = []
+    compressed = 0
+    for p in tmp_path.iterdir():
+        if not p.name.startswith("mpgz.log"):
+            continue
+        if p.name.endswith(".gz"):
+            compressed += 1
+            lines.extend(gzip.decompress(p.read_bytes()).decode().splitlines())
+        else:
+            lines.extend(p.read_text().splitlines())
+    assert compressed > 0
+    assert sorted(lines) == sorted(f"worker-{w}-line-{i:04d}" for w in range(4) for i in range(300))
+
+
+def test_multiprocess_file_handler_rejects_buffered(tmp_path: Path):
+    """测试 multiprocess 不能与 buffered 同时启用。"""
+    with pytest.raises(ValueError):
+        get_file_handler(
+            formatter=formatter,
+            path=str(tmp_path / "mp.log"),
+            when="D",
+            interval=1,
+            backup_count=0,
+            buffered=True,
+            multiprocess=True,
+        )
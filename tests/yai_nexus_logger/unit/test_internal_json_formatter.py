@@ -0,0 +1,101 @@
+"""Unit tests for the JsonFormatter."""
+
+import json
+import logging
+import sys
+
+import pytest
+
+from yai_nexus_logger import LoggerConfigurator, trace_context
+from yai_nexus_logger.internal.internal_json_formatter import (
+    ORJSON_AVAILABLE,
+    JsonFormatter,
+)
+
+
+def make_record(**kwargs) -> logging.LogRecord:
+    defaults = dict(
+        name="json_test",
+        level=logging.INFO,
+        pathname="/app/service.py",
+        lineno=12,
+        msg="用户 %s 登录",
+        args=("alice",),
+        exc_info=None,
+    )
+    defaults.update(kwargs)
+    return logging.LogRecord(**defaults)
+
+
+@pytest.mark.parametrize("backend", ["json", pytest.param("orjson", marks=pytest.mark.skipif(
+    not ORJSON_AVAILABLE, reason="orjson not installed"))])
+def test_json_formatter_emits_stable_keys(backend):
+    """测试 JSON 输出包含固定顺序的全部字段，extra 被保留为结构化数据。"""
+    formatter = JsonFormatter(backend=backend)
+    record = make_record()
+    record.user_id = 42
+    record.tags = ["a", "b"]
+
+    token = trace_context.set_trace_id("json-trace-id")
+    try:
+        payload = json.loads(formatter.format(record))
+    finally:
+        trace_context.reset_trace_id(token)
+
+    assert list(payload) == [
+        "trace_id", "span_id", "parent_span_id", "level", "time", "logger", "module", "function",
+        "line", "message", "extra", "exception", "stack",
+    ]
+    assert payload["trace_id"] == "json-trace-id"
+    assert payload["span_id"] is None
+    assert payload["level"] == "INFO"
+    assert payload["message"] == "用户 alice 登录"
+    assert payload["line"] == 12
+    assert payload["extra"] == {"user_id": 42, "tags": ["a", "b"]}
+    assert payload["exception"] is None
+
+
+def test_json_formatter_local_time_keeps_milliseconds():
+    """测试 timestamp_format="local" 时 JSON 中的时间仍带毫秒。"""
+    record = make_record()
+    record.created = 1_700_000_000.123
+    record.msecs = 123.0
+    payload = json.loads(JsonFormatter(timestamp_format="local", backend="json").format(record))
+    assert payload["time"].endswith(":20.123")
+
+
+def test_json_formatter_includes_exception():
+    """测试异常信息被写入 exception 字段，且输出仍是单行。"""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(level=logging.ERROR, exc_info=sys.exc_info())
+
+    output = JsonFormatter(backend="json").format(record)
+    assert "\n" not in output
+    assert "ValueError: boom" in json.loads(output)["exception"]
+
+
+def test_json_formatter_serializes_unknown_types_with_str():
+    """测试无法直接序列化的 extra 值会退化为 str()。"""
+    record = make_record()
+    record.obj = object()
+    payload = json.loads(JsonFormatter(backend="json").format(record))
+    assert payload["extra"]["obj"].startswith("<object object")
+
+
+def test_configurator_with_json_output_replaces_formatter():
+    """测试 with_json_output 会替换已添加 handler 的 formatter。"""
+    configurator = LoggerConfigurator().with_console_handler().with_json_output()
+    assert all(isinstance(h.formatter, JsonFormatter) for h in configurator._handlers)
+
+
+def test_json_formatter_merges_bound_fields_into_extra():
+    """测试 bind() 绑定的字段合并到 extra 中，同名时以 extra 为准。"""
+    formatter = JsonFormatter(backend="json")
+    with trace_context.bound(user_id=1, tenant="acme"):
+        record = make_record()
+        record.user_id = 2
+        payload = json.loads(formatter.format(record))
+
+    assert payload["extra"] == {"user_id": 2, "tenant": "acme"}
@@ -0,0 +1,90 @@
+# tests/yai_nexus_logger/unit/test_internal_sampling.py
+
+import logging
+
+from yai_nexus_logger import LoggerConfigurator, trace_context
+from yai_nexus_logger.internal.internal_sampling import TraceSamplingFilter, UpstreamSampledFilter
+from yai_nexus_logger.internal.internal_settings import settings
+from yai_nexus_logger.trace_context import SpanContext
+
+
+def make_record(level: int) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, "message", None, None)
+
+
+def test_upstream_sampled_filter_drops_low_levels_for_unsampled_traces():
+    """测试 sampled=0 的链路中低于 min_level 的日志被丢弃，WARNING 及以上保留。"""
+    log_filter = UpstreamSampledFilter()
+    token = trace_context.set_span_context(SpanContext("t", "s", None, sampled=False))
+    try:
+        assert not log_filter.filter(make_record(logging.INFO))
+        assert log_filter.filter(make_record(logging.WARNING))
+    finally:
+        trace_context.reset_trace_id(token)
+
+    # 采样的链路以及没有上下文时全部保留
+    assert log_filter.filter(make_record(logging.DEBUG))
+    token = trace_context.set_span_context(SpanContext("t", "s", None, sampled=True))
+    try:
+        assert log_filter.filter(make_record(logging.DEBUG))
+    finally:
+        trace_context.reset_trace_id(token)
+
+
+def test_configurator_applies_upstream_sampling_to_child_loggers(monkeypatch, capsys):
+    """测试 with_upstream_sampling 对子 logger 传播上来的日志同样生效。"""
+    monkeypatch.setenv("LOG_APP_NAME", "sampling_app")
+    settings.reload()
+    logger = LoggerConfigurator(level="DEBUG").with_console_handler().with_upstream_sampling().configure()
+
+    token = trace_context.set_span_context(SpanContext("t", "s", None, sampled=False))
+    try:
+        logging.getLogger("sampling_app.child").info("dropped")
+        logging.getLogger("sampling_app.child").error("kept")
+    finally:
+        trace_context.reset_trace_id(token)
+    logger.handlers.clear()
+
+    output = capsys.readouterr().out
+    assert "kept" in output
+    assert "dropped" not in output
+
+
+def test_trace_sampling_keeps_or_drops_whole_traces():
+    """测试同一 trace_id 的判定始终一致，整体保留比例接近 rate，WARNING 及以上始终保留。"""
+    log_filter = TraceSamplingFilter(rate=0.25)
+    kept = 0
+    for i in range(2000):
+        token = trace_context.set_trace_id(f"trace-{i}")
+        try:
+            decisions = {log_filter.filter(make_record(level)) for level in (logging.DEBUG, logging.INFO)}
+            assert len(decisions) == 1
+            assert log_filter.filter(make_record(logging.WARNING))
+            kept += decisions.pop()
+        finally:
+            trace_context.reset_trace_id(token)
+    assert 400 < kept < 600
+
+    # 没有 trace_id 的日志不参与采样
+    assert log_filter.filter(make_record(logging.DEBUG))
+
+
+def test_trace_sampling_uses_longest_logger_prefix():
+    """测试 logger_rates 按最长前缀匹配，子 logger 继承父 logger 的采样率。"""
+    log_filter = TraceSamplingFilter(rate=1.0, logger_rates={"app.db": 0.0, "app.db.audit": 1.0})
+
+    def keep(name):
+        record = make_record(logging.INFO)
+        record.name = name
+        return log_filter.filter(record)
+
+    token = trace_context.set_trace_id("trace-prefix")
+    try:
+        assert keep("app.api")
+        assert not keep("app.db")
+        assert not keep("app.db.pool")
+        assert keep("app.db.audit.writer")
+        # 名称前缀按 "." 分段匹配，"app.dbx" 不属于 "app.db"
+        assert keep("app.dbx")
+    finally:
+        trace_context.reset_trace_id(token)
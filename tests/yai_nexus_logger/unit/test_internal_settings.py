@@ -0,0 +1,111 @@
+"""Unit tests for the settings snapshot."""
+
+import logging
+
+import pytest
+
+from yai_nexus_logger import init_logging
+from yai_nexus_logger.internal.internal_settings import resolve_settings, settings
+
+
+def write_pyproject(tmp_path, body: str):
+    path = tmp_path / "pyproject.toml"
+    path.write_text("[project]\nname = \"demo\"\n\n" + body, encoding="utf-8")
+    return path
+
+
+def test_resolve_settings_precedence(tmp_path):
+    """测试优先级：默认值 < 配置文件 < 环境变量 < overrides。"""
+    path = write_pyproject(
+        tmp_path,
+        '[tool.yai_nexus_logger]\napp_name = "from_file"\nlog_level = "DEBUG"\njson_enabled = true\n',
+    )
+    environ = {"LOG_APP_NAME": "from_env", "LOG_ASYNC_ENABLED": "true"}
+
+    snapshot = resolve_settings(path, overrides={"log_level": "ERROR"}, environ=environ)
+
+    assert snapshot.APP_NAME == "from_env"
+    assert snapshot.LOG_LEVEL == "ERROR"
+    assert snapshot.JSON_ENABLED is True
+    assert snapshot.ASYNC_ENABLED is True
+    assert snapshot.CONSOLE_ENABLED is True
+    assert snapshot.FILE_PATH == "logs/from_env.log"
+    assert snapshot.UVICORN_ACCESS_LOG == "console"
+
+
+def test_resolve_settings_reads_loggers_and_handlers(tmp_path):
+    """测试从配置文件读取 logger 级别和 handler 参数，环境变量中的 logger 级别覆盖文件。"""
+    path = write_pyproject(
+        tmp_path,
+        "[tool.yai_nexus_logger.loggers]\n"
+        '"app.db" = "warning"\n'
+        "[tool.yai_nexus_logger.handlers.file]\n"
+        'when = "H"\n'
+        "backup_count = 48\n",
+    )
+
+    snapshot = resolve_settings(path, environ={})
+    assert dict(snapshot.LOGGER_LEVELS) == {"app.db": "WARNING"}
+    assert dict(snapshot.HANDLER_OPTIONS["file"]) == {"when": "H", "backup_count": 48}
+
+    snapshot = resolve_settings(path, environ={"LOG_LOGGER_LEVELS": "httpx=ERROR, app.db=INFO"})
+    assert dict(snapshot.LOGGER_LEVELS) == {"httpx": "ERROR", "app.db": "INFO"}
+
+
+def test_resolve_settings_rejects_unknown_keys(tmp_path):
+    """测试未知的配置项和 handler 配置段会报错。"""
+    with pytest.raises(ValueError, match="Unsupported setting"):
+        resolve_settings(overrides={"colour": True}, environ={})
+    with pytest.raises(ValueError, match="Unsupported handler options"):
+        resolve_settings(overrides={"handlers": {"syslog": {}}}, environ={})
+
+
+def test_pyproject_without_section_is_ignored(tmp_path):
+    """测试没有 [tool.yai_nexus_logger] 段的 pyproject.toml 不会被当作配置。"""
+    path = write_pyproject(tmp_path, "")
+    assert resolve_settings(path, environ={}).APP_NAME == "app"
+
+
+def test_settings_are_read_only_and_reload_bumps_generation(monkeypatch):
+    """测试配置是只读快照：修改环境变量后需要 reload 才生效，且 reload 会递增 generation。"""
+    generation = settings.generation
+    monkeypatch.setenv("LOG_APP_NAME", "snapshot_app")
+    assert settings.APP_NAME != "snapshot_app"
+
+    settings.reload()
+    assert settings.APP_NAME == "snapshot_app"
+    assert settings.snapshot.APP_NAME == "snapshot_app"
+    assert settings.generation == generation + 1
+
+    with pytest.raises(AttributeError, match="read-only"):
+        settings.APP_NAME = "other"
+
+
+def test_init_logging_applies_declarative_config(tmp_path, monkeypatch):
+    """测试 init_logging 应用配置中的 logger 级别和 handler 参数。"""
+    monkeypatch.delenv("LOG_CONFIG_FILE", raising=False)
+    # root logger 上的 handler（例如 pytest 的日志捕获）会让 init_logging 认为已经配置过
+    monkeypatch.setattr(logging.root, "handlers", [])
+    log_path = tmp_path / "app.log"
+    init_logging(
+        overrides={
+            "app_name": "declarative_app",
+            "console_enabled": False,
+            "file_enabled": True,
+            "file_path": str(log_path),
+            "loggers": {"declarative_app.db": "ERROR"},
+            "handlers": {"file": {"backup_count": 3}},
+        }
+    )
+    logger = logging.getLogger("declarative_app")
+    try:
+        assert logger.level == logging.INFO
+        assert logging.getLogger("declarative_app.db").level == logging.ERROR
+        (handler,) = logger.handlers
+        assert handler.backupCount == 3
+        assert handler.baseFilename == str(log_path)
+    finally:
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers.clear()
+        settings.reload(overrides={})
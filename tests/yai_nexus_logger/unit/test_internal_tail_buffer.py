@@ -0,0 +1,161 @@
+# tests/yai_nexus_logger/unit/test_internal_tail_buffer.py
+
+import contextvars
+import logging
+
+import pytest
+
+from yai_nexus_logger import LoggerConfigurator, trace_context
+from yai_nexus_logger.internal.internal_settings import settings
+from yai_nexus_logger.internal.internal_tail_buffer import TailBufferHandler
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def tail_logger():
+    trace_context.clear()
+    target = ListHandler()
+    tail = TailBufferHandler([target], max_records=6, max_records_per_trace=4)
+    logger = logging.getLogger("test_tail_buffer")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.handlers = [tail]
+    yield logger, tail, target
+    tail.close()
+    logger.handlers = []
+
+
+def test_tail_buffer_flushes_trace_on_error(tail_logger):
+    """测试链路出现 ERROR 时，按原始顺序写出该链路缓冲的日志。"""
+    logger, tail, target = tail_logger
+    token = trace_context.set_trace_id("failing")
+    try:
+        logger.debug("step %d", 1)
+        logger.info("step %d", 2)
+        logger.warning("warned")
+        assert target.messages == ["warned"]
+        logger.error("boom")
+    finally:
+        trace_context.reset_trace_id(token)
+
+    assert target.messages == ["warned", "step 1", "step 2", "boom"]
+    assert tail.get_stats()["flushed"] == 2
+
+
+def test_tail_buffer_discards_trace_when_it_ends(tail_logger):
+    """测试链路正常结束时丢弃缓冲的日志；span 结束不算链路结束。"""
+    logger, tail, target = tail_logger
+    token = trace_context.set_trace_id("healthy")
+    with trace_context.span():
+        logger.info("inside span")
+    assert tail.get_stats()["buffered"] == 1
+    trace_context.reset_trace_id(token)
+
+    assert target.messages == []
+    assert tail.get_stats() == {"traces": 0, "buffered": 0, "flushed": 0, "discarded": 1, "evicted": 0}
+
+    # 没有 trace_id 的日志直接写出
+    logger.info("no trace")
+    assert target.messages == ["no trace"]
+
+
+def test_tail_buffer_evicts_least_recently_used_trace(tail_logger):
+    """测试超过总容量时淘汰最久没有新日志的整条链路，单条链路超限时丢弃最早的日志。"""
+    logger, tail, target = tail_logger
+
+    def log_in_open_trace(trace_id, count):
+        # 在独立的上下文中设置 trace_id 且不重置，模拟仍在处理中的请求
+        trace_context.set_trace_id(trace_id)
+        for i in range(count):
+            logger.info("%s-%d", trace_id, i)
+
+    contextvars.copy_context().run(log_in_open_trace, "a", 3)
+    contextvars.copy_context().run(log_in_open_trace, "b", 3)
+
+    token = trace_context.set_trace_id("c")
+    try:
+        logger.info("c-0")
+        assert tail.get_stats()["evicted"] == 3  # 链路 a 被整体淘汰
+        for i in range(1, 5):
+            logger.info("c-%d", i)
+        logger.error("c failed")
+    finally:
+        trace_context.reset_trace_id(token)
+
+    assert target.messages == ["c-1", "c-2", "c-3", "c-4", "c failed"]
+
+
+def test_configurator_with_tail_buffering(monkeypatch, capsys):
+    """测试 with_tail_buffering 把尾部缓冲放在 handler 之前。"""
+    monkeypatch.setenv("LOG_APP_NAME", "tail_app")
+    settings.reload()
+    logger = LoggerConfigurator(level="DEBUG").with_console_handler().with_tail_buffering().configure()
+    try:
+        token = trace_context.set_trace_id("ok-request")
+        logging.getLogger("tail_app.api").info("quiet")
+        trace_context.reset_trace_id(token)
+
+        token = trace_context.set_trace_id("bad-request")
+        logging.getLogger("tail_app.api").info("detail")
+        logging.getLogger("tail_app.api").error("failed")
+        trace_context.reset_trace_id(token)
+    finally:
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers.clear()
+
+    output = capsys.readouterr().out
+    assert "quiet" not in output
+    assert output.index("detail") < output.index("failed")
+
+
+def test_tail_buffering_keeps_access_logs(monkeypatch, capsys):
+    """测试访问日志不参与尾部缓冲，正常结束的请求也会输出访问日志。"""
+    monkeypatch.setenv("LOG_APP_NAME", "tail_access_app")
+    settings.reload()
+    logger = (
+        LoggerConfigurator(level="DEBUG")
+        .with_console_handler()
+        .with_tail_buffering(exempt_loggers=("custom.access",))
+        .with_uvicorn_integration(access_log="pipeline")
+        .configure()
+    )
+    uvicorn_access = logging.getLogger("uvicorn.access")
+    custom_access = logging.getLogger("custom.access")
+    custom_access.setLevel(logging.INFO)
+    custom_access.addHandler(logger.handlers[0])
+    try:
+        token = trace_context.set_trace_id("ok-request")
+        logging.getLogger("tail_access_app.api").info("quiet")
+        logging.getLogger("tail_access_app.access").info("GET /items 200")
+        custom_access.info("custom access")
+        uvicorn_access.info('%s - "%s %s HTTP/%s" %d', "127.0.0.1:5000", "GET", "/health", "1.1", 200)
+        trace_context.reset_trace_id(token)
+    finally:
+        custom_access.handlers.clear()
+        uvicorn_access.handlers.clear()
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers.clear()
+
+    output = capsys.readouterr().out
+    assert "quiet" not in output
+    assert "GET /items 200" in output
+    assert "custom access" in output
+    assert "GET /health 200" in output
+
+
+def test_with_tail_buffering_validates_arguments():
+    """测试 with_tail_buffering 直接校验参数。"""
+    with pytest.raises(ValueError):
+        LoggerConfigurator().with_tail_buffering(max_records=0)
+    with pytest.raises(ValueError):
+        LoggerConfigurator().with_tail_buffering(flush_level="LOUD")
@@ -1,15 +1,18 @@
 """Unit tests for the yai_nexus_logger configuration and retrieval functions."""
 
 import logging
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
 from yai_nexus_logger import (
+    BoundLogger,
     LoggerConfigurator,
+    get_bound_logger,
     get_logger,
     init_logging,
 )
+from yai_nexus_logger.internal.internal_settings import settings
 
 
 def clean_logging_environment():
@@ -24,6 +27,7 @@ def test_get_logger_returns_correct_logger(monkeypatch):
     """Test that get_logger returns the correct root or child logger."""
     clean_logging_environment()
     monkeypatch.setenv("LOG_APP_NAME", "my_app")
+    settings.reload()
 
     root_logger = get_logger()
     child_logger = get_logger("child")
@@ -63,6 +67,21 @@ def test_init_logging_with_builder(monkeypatch):
     assert isinstance(logger.handlers[0], logging.handlers.TimedRotatingFileHandler)
 
 
+def test_builder_created_before_app_name_is_set(monkeypatch):
+    """Test that a builder created before LOG_APP_NAME is set configures the logger get_logger returns."""
+    clean_logging_environment()
+    monkeypatch.delenv("LOG_APP_NAME", raising=False)
+    settings.reload()
+    builder = LoggerConfigurator().with_console_handler()
+
+    monkeypatch.setenv("LOG_APP_NAME", "late_app")
+    init_logging(builder)
+
+    assert logging.getLogger("late_app").handlers
+    assert get_logger("x").name == "late_app.x"
+    assert get_logger("x").parent is logging.getLogger("late_app")
+
+
 def test_init_logging_avoids_reconfiguration(monkeypatch):
     """Test that init_logging does not re-configure an already configured logger."""
     clean_logging_environment()
@@ -73,8 +92,13 @@ def test_init_logging_avoids_reconfiguration(monkeypatch):
     logger.addHandler(logging.StreamHandler())
 
     # Attempt to re-configure, and assert that a warning is raised
+    generation = settings.generation
     with pytest.warns(UserWarning, match="seems to be already configured"):
-        init_logging()
+        init_logging(overrides={"log_level": "DEBUG"})
+
+    # The early return leaves the active settings untouched
+    assert settings.generation == generation
+    assert settings.LOG_LEVEL != "DEBUG"
 
 
 def test_init_logging_sls_missing_vars_warning(monkeypatch):
@@ -112,3 +136,32 @@ def test_configurator_with_sls_handler_raises_importerror(monkeypatch):
             logstore="fake_logstore",
         )
 
+
+
+def test_get_logger_is_cached_until_settings_reload(monkeypatch):
+    """Test that get_logger caches by name and is invalidated by settings.reload()."""
+    monkeypatch.setenv("LOG_APP_NAME", "cached_app")
+    settings.reload()
+
+    first = get_logger("api")
+    with patch("yai_nexus_logger.core.logging.getLogger") as mock_get_logger:
+        assert get_logger("api") is first
+        mock_get_logger.assert_not_called()
+    assert first.name == "cached_app.api"
+
+    # The hot path never reads the environment: only an explicit reload invalidates the cache
+    monkeypatch.setenv("LOG_APP_NAME", "renamed_app")
+    assert get_logger("api") is first
+    settings.reload()
+    assert get_logger("api").name == "renamed_app.api"
+
+
+def test_get_bound_logger_wraps_cached_logger(monkeypatch):
+    """Test that get_bound_logger returns a cached BoundLogger around get_logger(name)."""
+    monkeypatch.setenv("LOG_APP_NAME", "bound_app")
+    settings.reload()
+
+    bound = get_bound_logger("worker")
+    assert isinstance(bound, BoundLogger)
+    assert bound.logger is get_logger("worker")
+    assert get_bound_logger("worker") is bound
@@ -0,0 +1,183 @@
+# tests/yai_nexus_logger/unit/test_middleware.py
+
+import asyncio
+import logging
+
+import pytest
+
+from yai_nexus_logger import AccessLogMiddleware, TraceIDMiddleware, trace_context
+
+
+@pytest.fixture(autouse=True)
+def cleanup_trace_context():
+    trace_context.clear()
+    yield
+    trace_context.clear()
+
+
+def run_request(middleware, headers=(), scope_type="http"):
+    """用最小的 ASGI 调用驱动中间件，返回应用看到的 trace_id 和发送的消息。"""
+    seen = {}
+    sent = []
+
+    async def app(scope, receive, send):
+        seen["trace_id"] = trace_context.get_trace_id()
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": scope_type, "headers": list(headers)}
+    asyncio.run(middleware(app)(scope, receive, send))
+    return seen.get("trace_id"), sent
+
+
+def response_headers(sent):
+    return dict(sent[0]["headers"])
+
+
+def test_middleware_generates_and_echoes_trace_id():
+    """测试请求头中没有 trace_id 时生成一个新的，并在响应头中返回，请求结束后恢复上下文。"""
+    trace_id, sent = run_request(TraceIDMiddleware)
+
+    assert trace_id
+    assert response_headers(sent)[b"x-trace-id"] == trace_id.encode()
+    assert response_headers(sent)[b"content-type"] == b"text/plain"
+    assert trace_context.get_trace_id() is None
+
+
+def test_middleware_prefers_headers_in_configured_order():
+    """测试按 request_headers 的顺序选择 trace_id，与请求头出现的顺序无关。"""
+    headers = [(b"x-request-id", b"req-1"), (b"x-trace-id", b"trace-1")]
+    trace_id, _ = run_request(TraceIDMiddleware, headers)
+    assert trace_id == "trace-1"
+
+    trace_id, _ = run_request(TraceIDMiddleware, [(b"x-request-id", b"req-1")])
+    assert trace_id == "req-1"
+
+
+def test_middleware_extracts_trace_id_from_traceparent():
+    """测试从 W3C traceparent 中只取 trace-id 部分，全 0 的 trace-id 视为无效。"""
+    traceparent = b"00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    trace_id, _ = run_request(TraceIDMiddleware, [(b"traceparent", traceparent)])
+    assert trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+
+    zero = b"00-00000000000000000000000000000000-00f067aa0ba902b7-01"
+    trace_id, _ = run_request(TraceIDMiddleware, [(b"traceparent", zero)])
+    assert trace_id != "00000000000000000000000000000000"
+
+
+def test_middleware_rejects_unsafe_header_values():
+    """测试包含非法字符或过长的请求头不会被当作 trace_id。"""
+    trace_id, _ = run_request(TraceIDMiddleware, [(b"x-trace-id", b"bad id\nINJECTED")])
+    assert "INJECTED" not in trace_id
+
+    trace_id, _ = run_request(TraceIDMiddleware, [(b"x-trace-id", b"a" * 129)])
+    assert trace_id != "a" * 129
+
+
+def test_middleware_custom_headers_and_no_echo():
+    """测试自定义读取的请求头，并可以关闭响应头回写。"""
+
+    def middleware(app):
+        return TraceIDMiddleware(app, request_headers=("X-Correlation-ID",), response_header=None)
+
+    trace_id, sent = run_request(middleware, [(b"x-correlation-id", b"corr-1")])
+    assert trace_id == "corr-1"
+    assert b"x-trace-id" not in response_headers(sent)
+
+
+def test_middleware_passes_through_lifespan():
+    """测试非 http/websocket 的 scope 直接透传，不设置 trace_id。"""
+    trace_id, _ = run_request(TraceIDMiddleware, scope_type="lifespan")
+    assert trace_id is None
+
+
+def test_middleware_restores_span_from_traceparent():
+    """测试 traceparent 还原为 SpanContext：上游 parent-id 作为 parent_span_id，保留 sampled 标志。"""
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["context"] = trace_context.get_span_context()
+
+    traceparent = b"00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00"
+    scope = {"type": "http", "headers": [(b"traceparent", traceparent)]}
+    asyncio.run(TraceIDMiddleware(app, response_header=None)(scope, None, None))
+
+    context = seen["context"]
+    assert context.parent_span_id == "00f067aa0ba902b7"
+    assert context.span_id is not None
+    assert context.sampled is False
+
+
+class _Route:
+    path = "/items/{item_id}"
+
+
+@pytest.fixture
+def access_records():
+    """收集 AccessLogMiddleware 输出的日志。"""
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("access_test")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    yield records
+    logger.removeHandler(handler)
+
+
+def test_access_log_records_structured_fields(access_records):
+    """测试访问日志记录路由模板、状态码、字节数、耗时和 trace_id。"""
+
+    async def app(scope, receive, send):
+        scope["route"] = _Route()
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"hello", "more_body": True})
+        await send({"type": "http.response.body", "body": b"!"})
+
+    async def send(message):
+        pass
+
+    middleware = TraceIDMiddleware(AccessLogMiddleware(app, logger_name="access_test"))
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/items/42",
+        "headers": [(b"x-trace-id", b"access-trace")],
+        "client": ("10.0.0.1", 5000),
+    }
+    asyncio.run(middleware(scope, None, send))
+
+    (record,) = access_records
+    assert record.getMessage().startswith("POST /items/{item_id} 201 ")
+    assert record.route == "/items/{item_id}"
+    assert record.path == "/items/42"
+    assert record.status == 201
+    assert record.bytes == 6
+    assert record.duration_ms >= 0
+    assert record.client == "10.0.0.1:5000"
+    assert trace_context.get_trace_id() is None
+    assert record.levelno == logging.INFO
+
+
+def test_access_log_records_errors_and_skips_excluded_paths(access_records):
+    """测试应用抛出异常时记录 500 并继续抛出；exclude_paths 中的路径不记录。"""
+
+    async def failing_app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    middleware = AccessLogMiddleware(failing_app, logger_name="access_test", exclude_paths=("/healthz",))
+    with pytest.raises(RuntimeError):
+        asyncio.run(middleware({"type": "http", "method": "GET", "path": "/fail"}, None, None))
+    with pytest.raises(RuntimeError):
+        asyncio.run(middleware({"type": "http", "method": "GET", "path": "/healthz"}, None, None))
+
+    (record,) = access_records
+    assert record.status == 500
+    assert record.route == "/fail"
+    assert record.levelno == logging.ERROR
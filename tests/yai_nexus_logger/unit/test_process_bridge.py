@@ -0,0 +1,66 @@
+# tests/yai_nexus_logger/unit/test_process_bridge.py
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from yai_nexus_logger import trace_context
+from yai_nexus_logger.process_bridge import ProcessLogBridge
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def square(value: int) -> int:
+    logging.getLogger("test_bridge.worker").info("squaring %d", value, extra={"value": value})
+    return value * value
+
+
+@pytest.fixture
+def parent_logger():
+    handler = ListHandler()
+    logger = logging.getLogger("test_bridge")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.handlers = [handler]
+    yield handler
+    logger.handlers = []
+
+
+def test_bridge_forwards_worker_logs_with_trace_context(parent_logger):
+    """测试子进程中的日志带着提交任务时的 trace_id、span 和绑定字段回到父进程的 handler。"""
+    token = trace_context.set_trace_id("bridge-trace")
+    try:
+        with trace_context.span() as span, trace_context.bound(tenant="acme", job="squares"):
+            with ProcessLogBridge(logger_name="test_bridge", mp_context=multiprocessing.get_context("fork")) as bridge:
+                with ProcessPoolExecutor(max_workers=2, **bridge.executor_kwargs()) as pool:
+                    futures = [bridge.submit(pool, square, i) for i in range(5)]
+                    assert [f.result() for f in futures] == [0, 1, 4, 9, 16]
+    finally:
+        trace_context.reset_trace_id(token)
+
+    records = sorted(parent_logger.records, key=lambda r: r.value)
+    assert [r.getMessage() for r in records] == [f"squaring {i}" for i in range(5)]
+    assert {r.trace_id for r in records} == {"bridge-trace"}
+    assert {r.span_id for r in records} == {span.span_id}
+    assert {(r.tenant, r.job) for r in records} == {("acme", "squares")}
+    assert {r.name for r in records} == {"test_bridge.worker"}
+
+
+def test_bridge_respects_worker_level(parent_logger):
+    """测试子进程按 bridge 的级别过滤日志。"""
+    with ProcessLogBridge(
+        logger_name="test_bridge", level=logging.WARNING, mp_context=multiprocessing.get_context("fork")
+    ) as bridge:
+        with ProcessPoolExecutor(max_workers=1, **bridge.executor_kwargs()) as pool:
+            assert bridge.submit(pool, square, 3).result() == 9
+
+    assert parent_logger.records == []
@@ -105,3 +105,317 @@ def test_clear_context():
     # 清除后，获取ID应该返回 None
     new_id = trace_context.get_trace_id()
     assert new_id is None
+
+
+@pytest.mark.parametrize(
+    "name, pattern",
+    [
+        ("hex128", r"^[0-9a-f]{32}$"),
+        ("hex64", r"^[0-9a-f]{16}$"),
+        ("w3c", r"^[0-9a-f]{32}$"),
+        ("ulid", r"^[0-9A-HJKMNP-TV-Z]{26}$"),
+    ],
+)
+def test_set_id_generator_by_name(name, pattern):
+    """
+    测试 set_id_generator 切换内置生成器后，新 trace_id 符合对应格式且互不重复。
+    """
+    import re
+
+    trace_context.set_id_generator(name)
+    try:
+        ids = {trace_context.generate_trace_id() for _ in range(1000)}
+        assert len(ids) == 1000
+        assert all(re.match(pattern, trace_id) for trace_id in ids)
+        assert re.match(pattern, trace_context.get_or_create_trace_id())
+    finally:
+        trace_context.set_id_generator("uuid4")
+
+
+def test_uuid_generators_set_version_bits():
+    """
+    测试 uuid4/uuid7 生成器输出合法的 UUID 版本和 variant。
+    """
+    from yai_nexus_logger.internal.internal_id_generators import uuid4_id, uuid7_id
+
+    for _ in range(1000):
+        assert uuid.UUID(uuid4_id()).version == 4
+        parsed = uuid.UUID(uuid7_id())
+        assert parsed.version == 7
+        assert parsed.variant == uuid.RFC_4122
+
+
+def test_time_ordered_ids_sort_by_creation_time():
+    """
+    测试 ulid/uuid7 按生成时间排序。
+    """
+    import time
+
+    from yai_nexus_logger.internal.internal_id_generators import ulid_id, uuid7_id
+
+    for generate in (ulid_id, uuid7_id):
+        first = generate()
+        time.sleep(0.002)
+        assert generate() > first
+
+
+def test_set_id_generator_accepts_callable_and_rejects_unknown_name():
+    """
+    测试 set_id_generator 接受自定义函数，并拒绝未知的生成器名称。
+    """
+    trace_context.set_id_generator(lambda: "custom-id")
+    try:
+        assert trace_context.get_or_create_trace_id() == "custom-id"
+    finally:
+        trace_context.set_id_generator("uuid4")
+
+    with pytest.raises(ValueError):
+        trace_context.set_id_generator("snowflake")
+
+
+def test_span_creates_child_and_restores_parent():
+    """
+    测试 span() 创建子 span：沿用 trace_id，parent_span_id 指向外层 span，退出后恢复。
+    """
+    token = trace_context.set_trace_id("span-trace")
+    try:
+        with trace_context.span() as outer:
+            assert outer.trace_id == "span-trace"
+            assert outer.parent_span_id is None
+            with trace_context.span() as inner:
+                assert inner.trace_id == "span-trace"
+                assert inner.parent_span_id == outer.span_id
+                assert inner.span_id != outer.span_id
+                assert trace_context.get_span_context() is inner
+            assert trace_context.get_span_context() is outer
+        assert trace_context.get_span_context().span_id is None
+    finally:
+        trace_context.reset_trace_id(token)
+
+
+def test_root_span_fires_trace_end_hooks():
+    """
+    测试没有 trace_id 时创建的根 span 退出时视为链路结束；子 span 退出不算链路结束。
+    """
+    ended = []
+    trace_context.add_trace_end_hook(ended.append)
+    try:
+        with trace_context.span() as root:
+            with trace_context.span():
+                pass
+            assert ended == []
+        assert ended == [root.trace_id]
+        assert trace_context.get_span_context() is None
+
+        token = trace_context.set_trace_id("outer-trace")
+        with trace_context.span():
+            pass
+        assert ended == [root.trace_id]
+        trace_context.reset_trace_id(token)
+        assert ended == [root.trace_id, "outer-trace"]
+    finally:
+        trace_context.remove_trace_end_hook(ended.append)
+
+
+def test_span_context_is_isolated_between_tasks():
+    """
+    测试并发任务中的 span 互不影响。
+    """
+    import asyncio
+
+    async def worker(results, index):
+        with trace_context.span() as span:
+            await asyncio.sleep(0)
+            results[index] = (span.span_id, trace_context.get_span_context().span_id)
+
+    async def main():
+        results = {}
+        with trace_context.span():
+            await asyncio.gather(*(worker(results, i) for i in range(5)))
+        return results
+
+    results = asyncio.run(main())
+    assert all(own == seen for own, seen in results.values())
+    assert len({own for own, _ in results.values()}) == 5
+
+
+def test_parse_and_format_traceparent():
+    """
+    测试解析 W3C traceparent：沿用 trace-id 和 sampled 标志，上游 parent-id 成为 parent_span_id。
+    """
+    context = trace_context.parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00")
+    assert context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert context.parent_span_id == "00f067aa0ba902b7"
+    assert context.sampled is False
+
+    token = trace_context.set_span_context(context)
+    try:
+        assert trace_context.is_sampled() is False
+        assert trace_context.get_traceparent() == f"00-{context.trace_id}-{context.span_id}-00"
+    finally:
+        trace_context.reset_trace_id(token)
+
+    assert trace_context.parse_traceparent("00-00000000000000000000000000000000-00f067aa0ba902b7-01") is None
+    assert trace_context.parse_traceparent("not-a-traceparent") is None
+
+
+def test_wrap_and_executor_propagate_trace_id_to_worker_threads():
+    """
+    测试 wrap() 和 ContextPropagatingExecutor 把提交时的 trace_id 带到线程池中。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from yai_nexus_logger.trace_context import ContextPropagatingExecutor
+
+    with ThreadPoolExecutor(max_workers=2) as raw_pool:
+        token = trace_context.set_trace_id("pool-trace")
+        try:
+            # 普通 submit 不会携带 trace_id
+            assert raw_pool.submit(trace_context.get_trace_id).result() is None
+            assert raw_pool.submit(trace_context.wrap(trace_context.get_trace_id)).result() == "pool-trace"
+
+            pool = ContextPropagatingExecutor(raw_pool)
+            assert pool.submit(trace_context.get_trace_id).result() == "pool-trace"
+            assert list(pool.map(lambda x: (x, trace_context.get_trace_id()), [1, 2])) == [
+                (1, "pool-trace"),
+                (2, "pool-trace"),
+            ]
+            def add(x, y):
+                return x + y, trace_context.get_trace_id()
+
+            results = list(pool.map_batched(add, range(10), range(10), batch_size=3))
+            assert results == [(2 * i, "pool-trace") for i in range(10)]
+        finally:
+            trace_context.reset_trace_id(token)
+
+        # 工作线程执行完任务后恢复原来的上下文
+        assert raw_pool.submit(trace_context.get_trace_id).result() is None
+
+
+def test_run_in_executor_and_offload_carry_trace_id():
+    """
+    测试 run_in_executor() 和 offload() 装饰器在事件循环的线程池中携带 trace_id。
+    """
+    import asyncio
+
+    @trace_context.offload()
+    def current_trace(suffix, sep="-"):
+        return f"{trace_context.get_trace_id()}{sep}{suffix}"
+
+    async def main():
+        token = trace_context.set_trace_id("loop-trace")
+        try:
+            direct = await trace_context.run_in_executor(None, trace_context.get_trace_id)
+            decorated = await current_trace("x", sep=":")
+        finally:
+            trace_context.reset_trace_id(token)
+        return direct, decorated
+
+    assert asyncio.run(main()) == ("loop-trace", "loop-trace:x")
+
+
+def test_propagate_decorator_binds_trace_id_at_call_time():
+    """
+    测试 propagate 装饰器在调用时捕获 trace_id，返回的任务之后在其他线程中执行。
+    """
+    import threading
+
+    @trace_context.propagate
+    def task(value):
+        return value, trace_context.get_trace_id()
+
+    token = trace_context.set_trace_id("bound-trace")
+    bound = task(5)
+    trace_context.reset_trace_id(token)
+
+    result = []
+    thread = threading.Thread(target=lambda: result.append(bound()))
+    thread.start()
+    thread.join()
+    assert result == [(5, "bound-trace")]
+
+
+def test_bind_and_bound_nest_and_restore_fields():
+    """
+    测试 bind()/bound() 嵌套绑定时子节点覆盖父节点的同名字段，退出后恢复，且父节点被共享而不是复制。
+    """
+    assert dict(trace_context.get_bound_fields()) == {}
+
+    token = trace_context.bind(user_id=1, tenant="acme")
+    parent = trace_context.get_binding()
+    try:
+        with trace_context.bound(user_id=2, route="/items") as fields:
+            assert dict(fields) == {"user_id": 2, "tenant": "acme", "route": "/items"}
+            assert trace_context.get_binding().parent is parent
+            with pytest.raises(TypeError):
+                fields["user_id"] = 3
+        assert dict(trace_context.get_bound_fields()) == {"user_id": 1, "tenant": "acme"}
+    finally:
+        trace_context.reset_bindings(token)
+
+    assert trace_context.get_binding() is None
+
+
+def test_bound_fields_propagate_to_executor_threads():
+    """
+    测试绑定的字段与 trace_id 一起被 ContextPropagatingExecutor 带到工作线程中。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from yai_nexus_logger.trace_context import ContextPropagatingExecutor
+
+    with ContextPropagatingExecutor(ThreadPoolExecutor(max_workers=1)) as pool:
+        with trace_context.bound(user_id=9):
+            future = pool.submit(lambda: dict(trace_context.get_bound_fields()))
+        assert future.result() == {"user_id": 9}
+        assert pool.submit(lambda: dict(trace_context.get_bound_fields())).result() == {}
+
+
+def test_bind_rejects_reserved_record_attributes():
+    """
+    测试 bind() 拒绝 LogRecord 的属性名和保留字段，避免覆盖 record 的属性。
+    """
+    for name in ("name", "msg", "levelname", "message", "trace_id"):
+        with pytest.raises(ValueError):
+            trace_context.bind(**{name: "alice"})
+    assert trace_context.get_binding() is None
+
+
+def test_captured_binding_survives_pickle_round_trip():
+    """
+    测试已计算过缓存的 Binding 可以被 pickle（例如通过 ProcessPoolExecutor 传给子进程）。
+    """
+    import pickle
+
+    with trace_context.bound(tenant="acme"), trace_context.bound(user_id=7):
+        binding = trace_context.get_binding()
+        assert binding.suffix == " | tenant=acme | user_id=7"
+        wrapped = trace_context.wrap(dict)
+
+    restored = pickle.loads(pickle.dumps(binding))  # noqa: S301
+    assert dict(restored.fields) == {"tenant": "acme", "user_id": 7}
+    assert restored.suffix == binding.suffix
+    assert restored.parent.own == {"tenant": "acme"}
+    assert pickle.loads(pickle.dumps(wrapped)).args[0][1].own == {"user_id": 7}  # noqa: S301
+
+
+def _bound_fields_in_worker() -> dict:
+    return dict(trace_context.get_bound_fields())
+
+
+def test_bound_fields_propagate_to_process_pool():
+    """
+    测试 ContextPropagatingExecutor 包装 ProcessPoolExecutor 时，绑定的字段被带到子进程中。
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from yai_nexus_logger.trace_context import ContextPropagatingExecutor
+
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork"))
+    with ContextPropagatingExecutor(pool) as executor:
+        with trace_context.bound(user_id=9):
+            # 先渲染一次后缀，使 Binding 上带有缓存
+            assert trace_context.get_binding().suffix == " | user_id=9"
+            future = executor.submit(_bound_fields_in_worker)
+        assert future.result(timeout=30) == {"user_id": 9}
@@ -1,12 +1,18 @@
 """Unit tests for the yai_nexus_logger.uvicorn_support module."""
 
+import asyncio
+import io
 import logging
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from yai_nexus_logger import LoggerConfigurator
+from yai_nexus_logger.internal.internal_file_handler import BufferedFileHandler, MultiProcessFileHandler
 from yai_nexus_logger.trace_context import trace_context
 from yai_nexus_logger.uvicorn_support import (
+    AccessLogAggregator,
+    UvicornAccessFilter,
     UvicornAccessFormatter,
     configure_uvicorn_logging,
 )
@@ -143,3 +149,203 @@ def test_configure_uvicorn_logging_with_queued_handler(mock_getLogger):
 
     # Check propagation is set to False for uvicorn.access
     assert mock_uvicorn_access.propagate is False
+
+
+def test_access_filter_structures_uvicorn_record(mock_record):
+    """
+    Test that UvicornAccessFilter rewrites uvicorn's access record into structured fields.
+    """
+    mock_record.args = ("127.0.0.1:12345", "GET", "/items?page=2", "1.1", 404)
+
+    assert UvicornAccessFilter().filter(mock_record) is True
+
+    assert mock_record.getMessage() == "GET /items?page=2 404"
+    assert mock_record.method == "GET"
+    assert mock_record.path == "/items?page=2"
+    assert mock_record.status == 404
+    assert mock_record.client == "127.0.0.1:12345"
+    assert mock_record.http_version == "1.1"
+
+
+def test_pipeline_mode_shares_configured_handlers():
+    """
+    Test that pipeline mode attaches the app's own handler objects (including async dispatch)
+    to uvicorn.access, so access logs are formatted by the app formatter and keep the trace_id.
+    """
+    stream = io.StringIO()
+    configurator = (
+        LoggerConfigurator(level="INFO")
+        .with_async_dispatch()
+        .with_uvicorn_integration(access_log="pipeline")
+    )
+    configurator._handlers.append(logging.StreamHandler(stream))
+    configurator._handlers[0].setFormatter(configurator._formatter)
+    app_logger = configurator.configure()
+    access_logger = logging.getLogger("uvicorn.access")
+    try:
+        assert access_logger.handlers == app_logger.handlers
+        assert access_logger.propagate is False
+
+        token = trace_context.set_trace_id("access-trace")
+        access_logger.info('%s - "%s %s HTTP/%s" %d', "127.0.0.1:1", "GET", "/ping", "1.1", 200)
+        trace_context.reset_trace_id(token)
+        for handler in app_logger.handlers:
+            handler.flush()
+    finally:
+        for handler in app_logger.handlers:
+            handler.close()
+        app_logger.handlers.clear()
+        access_logger.handlers.clear()
+
+    output = stream.getvalue()
+    assert "[access-trace] | GET /ping 200 | method=GET | path=/ping | status=200" in output
+
+
+def test_console_mode_skips_binary_stream_handlers(tmp_path):
+    """
+    Test that console mode does not copy handlers that write bytes (BufferedFileHandler,
+    MultiProcessFileHandler), so access logs don't fail with a TypeError on every request.
+    """
+    stream = io.StringIO()
+    console = logging.StreamHandler(stream)
+    buffered = BufferedFileHandler(str(tmp_path / "app.log"))
+    multiprocess = MultiProcessFileHandler(str(tmp_path / "worker.log"))
+    access_logger = logging.getLogger("uvicorn.access")
+    try:
+        with (
+            patch("yai_nexus_logger.uvicorn_support.UVICORN_AVAILABLE", True),
+            patch("yai_nexus_logger.uvicorn_support.UvicornAccessFormatter", logging.Formatter),
+            patch.object(logging.Handler, "handleError", side_effect=AssertionError("handler error")),
+        ):
+            configure_uvicorn_logging(handlers=[console, buffered, multiprocess], access_log="console")
+            assert len(access_logger.handlers) == 1
+            access_logger.info("GET /ping 200")
+    finally:
+        access_logger.handlers.clear()
+        buffered.close()
+        multiprocess.close()
+
+    assert stream.getvalue() == "GET /ping 200\n"
+
+
+def test_uvicorn_integration_defaults_to_console_mode():
+    """Test that the shared handler pipeline is opt-in and console mode stays the default."""
+    configurator = LoggerConfigurator()
+    with patch("yai_nexus_logger.configurator.configure_uvicorn_logging") as mock_configure:
+        logger = configurator.with_uvicorn_integration().configure()
+    try:
+        assert mock_configure.call_args.kwargs["access_log"] == "console"
+    finally:
+        logger.handlers.clear()
+
+
+def test_configure_uvicorn_logging_rejects_unknown_mode():
+    """Test that an unknown access log mode is rejected."""
+    with pytest.raises(ValueError, match="Unsupported uvicorn access log mode"):
+        configure_uvicorn_logging(handlers=[], access_log="stdout")
+
+
+class _Route:
+    path = "/items/{item_id}"
+
+
+def drive(aggregator, path, status=200, with_route=True):
+    """用最小的 ASGI 应用驱动 aggregator 处理一个请求。"""
+
+    async def app(scope, receive, send):
+        if with_route:
+            scope["route"] = _Route()
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def send(message):
+        pass
+
+    aggregator.app = app
+    asyncio.run(aggregator({"type": "http", "method": "GET", "path": path}, None, send))
+
+
+@pytest.fixture
+def aggregator_records():
+    """收集 AccessLogAggregator 输出的日志。"""
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("aggregator_test")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    yield records
+    logger.removeHandler(handler)
+
+
+def test_access_log_aggregator_rolls_up_requests(aggregator_records):
+    """
+    Test that AccessLogAggregator emits one summary per (route, method, status)
+    and full lines only for error responses.
+    """
+    aggregator = AccessLogAggregator(None, logger_name="aggregator_test", interval=3600)
+    for path in ("/items/1", "/items/2", "/items/3"):
+        drive(aggregator, path)
+    drive(aggregator, "/items/4", status=503)
+
+    # 503 立即输出一条完整的访问日志，其余请求只计入汇总
+    assert [r.status for r in aggregator_records] == [503]
+    assert aggregator_records[0].levelno == logging.WARNING
+
+    aggregator.close()
+    summaries = {r.status: r for r in aggregator_records[1:]}
+    assert set(summaries) == {200, 503}
+    ok = summaries[200]
+    assert ok.route == "/items/{item_id}"
+    assert ok.count == 3
+    assert sum(ok.latency_buckets.values()) == 3
+    assert ok.getMessage().startswith("GET /items/{item_id} 200 count=3 ")
+
+
+def test_access_log_aggregator_drops_patterns_before_logging(aggregator_records):
+    """Test that drop_patterns are matched before any timing or record creation."""
+    aggregator = AccessLogAggregator(
+        None, logger_name="aggregator_test", interval=3600, drop_patterns=("/health", "/metrics*")
+    )
+    for path in ("/health", "/metrics", "/metrics/prometheus"):
+        drive(aggregator, path, status=500, with_route=False)
+    drive(aggregator, "/healthz", with_route=False)
+
+    aggregator.close()
+    assert [(r.route, r.count) for r in aggregator_records] == [("/healthz", 1)]
+
+
+def test_access_log_aggregator_flushes_on_lifespan_shutdown(aggregator_records):
+    """Test that ASGI lifespan shutdown stops the flusher thread and emits the pending window."""
+    aggregator = AccessLogAggregator(None, logger_name="aggregator_test", interval=3600)
+    drive(aggregator, "/items/1")
+    assert aggregator_records == []
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def run_lifespan():
+        incoming = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            # 服务器收到 shutdown.complete 时，汇总必须已经输出
+            sent.append((message["type"], len(aggregator_records)))
+
+        aggregator.app = app
+        await aggregator({"type": "lifespan"}, receive, send)
+        return sent
+
+    sent = asyncio.run(run_lifespan())
+    assert sent == [("lifespan.startup.complete", 0), ("lifespan.shutdown.complete", 1)]
+    assert aggregator_records[0].count == 1
+    assert not aggregator._flusher.is_alive()